@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+alert_rules.py - Alert engine throughput benchmark
+Feeds synthetic node reports through AlertEngine and reports rule
+evaluations per second (threshold, rate and absence rules).
+
+    python3 benchmarks/alert_rules.py [--nodes 1000] [--rules 20] [--reports 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "backend")
+sys.path.insert(0, BACKEND)
+
+from models import AlertRule  # noqa: E402
+from services.alerting import AlertEngine  # noqa: E402
+
+METRICS = ["cpu_usage", "memory_usage", "disk_usage", "network_in", "network_out"]
+
+
+def make_rules(count: int):
+    rules = []
+    for i in range(count):
+        metric = METRICS[i % len(METRICS)]
+        if i % 5 == 4:
+            rules.append(AlertRule(name=f"absent-{i}", kind="absence", value=30 + i))
+        elif i % 3 == 2:
+            rules.append(AlertRule(name=f"rate-{i}", kind="rate", metric=metric, value=5 + i % 7))
+        else:
+            rules.append(AlertRule(name=f"threshold-{i}", metric=metric, value=70 + i % 25,
+                                   clear=60 + i % 25, for_seconds=i % 3 * 10))
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--rules", type=int, default=20)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--min-rate", type=float, default=0,
+                        help="exit non-zero below this many evaluations per second")
+    args = parser.parse_args()
+
+    random.seed(42)
+    engine = AlertEngine(make_rules(args.rules))
+    nodes = [f"node-{i:04d}" for i in range(args.nodes)]
+    reports = [
+        (nodes[i % args.nodes], {m: random.uniform(0, 100) for m in METRICS})
+        for i in range(args.reports)
+    ]
+
+    now = time.time()
+    start = time.perf_counter()
+    for i, (node, metrics) in enumerate(reports):
+        engine.observe(node, metrics, now=now + i * 0.01)
+    elapsed = time.perf_counter() - start
+
+    rate = engine.evaluations / elapsed
+    print(f"{args.reports} reports x {args.rules} rules over {args.nodes} nodes")
+    print(f"evaluations: {engine.evaluations}  elapsed: {elapsed:.3f}s")
+    print(f"throughput:  {rate:,.0f} rule evaluations/s  ({args.reports / elapsed:,.0f} reports/s)")
+    print(f"firing:      {engine.active_count()}  transitions: {len(engine.drain_events())}")
+    if args.min_rate and rate < args.min_rate:
+        print(f"FAIL: below {args.min_rate:,.0f} evaluations/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+cli_startup.py - Start-up time budget for nexus.py
+Measures the import cost nexus.py adds on top of a bare interpreter with
+`python -X importtime` and fails when it exceeds the budget.
+
+    python3 benchmarks/cli_startup.py                  # --help, 15 ms budget
+    python3 benchmarks/cli_startup.py --budget-ms 25 -- exec --help
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NEXUS = os.path.join(ROOT, "nexus.py")
+
+
+def import_times(cmd):
+    """Returns {top-level module: cumulative µs} from -X importtime output."""
+    env = dict(os.environ, NEXUS_AGENT="0")
+    proc = subprocess.run([sys.executable, "-X", "importtime", *cmd],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only top-level entries add up without double counting
+        if not name.startswith("  ", 1):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def wall_time(cmd):
+    env = dict(os.environ, NEXUS_AGENT="0")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *cmd], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=15.0, help="Allowed import time added by nexus.py")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("nexus_args", nargs="*", default=["--help"])
+    args = parser.parse_args()
+
+    cmd = [NEXUS, *args.nexus_args]
+    samples, worst = [], {}
+    for _ in range(args.runs):
+        baseline = import_times(["-c", "pass"])
+        modules = import_times(cmd)
+        added = {m: us for m, us in modules.items() if m not in baseline}
+        samples.append(sum(added.values()) / 1000)
+        for m, us in added.items():
+            worst[m] = max(worst.get(m, 0), us)
+
+    median = statistics.median(samples)
+    walls = [wall_time(cmd) * 1000 for _ in range(args.runs)]
+    baseline_wall = [wall_time(["-c", "pass"]) * 1000 for _ in range(args.runs)]
+
+    print(f"nexus.py {' '.join(args.nexus_args)}")
+    print(f"  added imports : {median:.1f} ms median (budget {args.budget_ms:.1f} ms)")
+    print(f"  wall time     : {statistics.median(walls):.1f} ms (bare interpreter {statistics.median(baseline_wall):.1f} ms)")
+    for m, us in sorted(worst.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"    {us / 1000:7.2f} ms  {m}")
+
+    if median > args.budget_ms:
+        print("FAIL: start-up import budget exceeded")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+consul_outage.py - Cluster snapshot behaviour through Consul outages
+Drives ClusterState against a local fake Consul (see fake_consul.py) through
+outage scenarios and checks that the last good snapshot is kept (and marked
+stale) instead of being replaced by partial data, and that refreshes fail
+fast while the circuit is open. Exits non-zero when a scenario fails.
+
+    python3 benchmarks/consul_outage.py [--nodes 50]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "backend")
+
+
+def make_state(fake, reset_timeout: float = 0.2):
+    from services.breaker import CircuitBreaker
+    from services.cluster_state import ClusterState
+    from services.consul_service import ConsulService
+
+    breaker = CircuitBreaker("consul outage check", failure_threshold=1, reset_timeout=reset_timeout,
+                             max_reset_timeout=reset_timeout)
+    consul = ConsulService(host=fake.host, port=fake.port, timeout=5, breaker=breaker)
+    return ClusterState(consul, ttl=0)
+
+
+def scenario_outage(fake, nodes: int) -> list:
+    """Every request fails: the refresh keeps the last snapshot, and refreshes while open skip Consul"""
+    state = make_state(fake, reset_timeout=30)
+    good = state.refresh()
+    fake.failure_rate = 1.0
+    try:
+        kept = state.refresh()
+        fake.requests.clear()
+        start = time.perf_counter()
+        again = state.refresh()
+        open_ms = (time.perf_counter() - start) * 1000
+        open_requests = sum(fake.requests.values())
+    finally:
+        fake.failure_rate = 0.0
+    print(f"  outage: kept version {kept.version}/{good.version}, stale={state.stale}, "
+          f"refresh while open {open_ms:.2f} ms with {open_requests} Consul requests")
+    errors = []
+    if kept is not good or again is not good or len(kept.nodes) != nodes:
+        errors.append("outage: the last good snapshot was replaced")
+    if not state.stale:
+        errors.append("outage: snapshot not marked stale")
+    if open_requests:
+        errors.append("outage: refresh with the circuit open reached Consul")
+    return errors
+
+
+def scenario_half_open(fake, nodes: int) -> list:
+    """
+    A refresh overlapping another thread's half-open probe: every call it
+    makes is refused by the breaker, so it must keep the last snapshot
+    """
+    state = make_state(fake)
+    good = state.refresh()
+    fake.failure_rate = 1.0
+    state.refresh()  # opens the circuit
+    fake.failure_rate = 0.0
+    time.sleep(state.consul.breaker.reset_timeout + 0.05)
+
+    fake.latency = 0.5
+    probe = threading.Thread(target=state.consul.get_leader)
+    probe.start()
+    try:
+        time.sleep(0.1)  # the probe is in flight; the circuit is half-open
+        during = state.refresh()
+        stale_during = state.stale
+    finally:
+        probe.join()
+        fake.latency = 0.0
+    after = state.refresh()
+    print(f"  half-open: refresh during the probe kept {len(during.nodes)}/{nodes} nodes "
+          f"(version {during.version}/{good.version}, stale={stale_during}); "
+          f"after the probe {len(after.nodes)} nodes, stale={state.stale}")
+    errors = []
+    if during is not good or not stale_during:
+        errors.append("half-open: a refresh during the probe replaced the last good snapshot")
+    if len(after.nodes) != nodes or state.stale:
+        errors.append("half-open: the snapshot did not recover after the probe succeeded")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, BACKEND)
+    import logging
+    logging.disable(logging.CRITICAL)
+    from fake_consul import FakeCluster, FakeConsul
+
+    fake = FakeConsul(FakeCluster(args.nodes)).start()
+    print(f"Consul outage scenarios with {args.nodes} nodes")
+    try:
+        errors = scenario_outage(fake, args.nodes) + scenario_half_open(fake, args.nodes)
+    finally:
+        fake.stop()
+    for error in errors:
+        print(f"FAIL: {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
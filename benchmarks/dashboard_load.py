@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+dashboard_load.py - Dashboard backend benchmark against a simulated cluster
+Runs the FastAPI app in-process against a local fake Consul (see
+fake_consul.py) at each cluster size and measures p50/p99 latency and
+throughput of the polled API endpoints and the /ws/realtime fan-out. Each
+size runs in a fresh interpreter so caches and singletons do not carry over.
+Results go to a JSON file; --compare prints the change against an earlier
+run and fails on regressions.
+
+    python3 benchmarks/dashboard_load.py [--nodes 10,100,1000] [--requests 200] [--concurrency 8]
+    python3 benchmarks/dashboard_load.py --latency-ms 1 --failure-rate 0.01 --no-cache
+    python3 benchmarks/dashboard_load.py --compare benchmarks/results/before.json --max-regression 25
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "dashboard", "backend")
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "dashboard.json")
+
+ENDPOINTS = [
+    "/api/workers/",
+    "/api/managers/",
+    "/api/nodes/?include_overview=true",
+    "/api/analytics/overview",
+    "/api/analytics/performance",
+    "/api/analytics/percentiles?window=15m",
+    "/api/analytics/top/nodes",
+    "/api/analytics/top/services",
+    "/api/analytics/timeseries/cpu",
+]
+WS_ENDPOINT = "/ws/realtime"
+
+
+def summarize(latencies, elapsed: float, errors: int):
+    """Latency percentiles in ms plus throughput for one endpoint"""
+    ordered = sorted(latencies)
+
+    def pct(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3) if ordered else None
+
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else None,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else None,
+    }
+
+
+# -- one cluster size (child process) ----------------------------------------
+
+def seed_reports(client, nodes: int, services_per_node: int, managers: int):
+    """Pushes one metrics report per node so aggregates, percentiles and top-K have data"""
+    rng = random.Random(7)
+    for i in range(nodes):
+        services = {} if i < managers else {
+            f"app-{j}": {"cpu_usage": round(rng.uniform(0, 50), 2), "memory_mb": round(rng.uniform(50, 800), 1)}
+            for j in range(services_per_node)
+        }
+        client.post(f"/api/analytics/nodes/node-{i:04d}/metrics", json={
+            "cpu_usage": round(rng.uniform(5, 95), 2), "memory_usage": round(rng.uniform(10, 90), 2),
+            "disk_usage": round(rng.uniform(10, 90), 2), "network_in": round(rng.uniform(0, 50), 2),
+            "network_out": round(rng.uniform(0, 50), 2), "services": services,
+        })
+
+
+def check_projection(client) -> list:
+    """`fields=` rows must carry the same values as the full worker models"""
+    full = {w["id"]: w for w in client.get("/api/workers/").json()}
+    errors = []
+    for row in client.get("/api/workers/?fields=id,services,healthy_services").json():
+        worker = full.get(row["id"])
+        if worker is None or any(row[f] != worker[f] for f in ("services", "healthy_services")):
+            errors.append(f"fields=services for {row['id']} differs from the full response")
+    return errors[:5]
+
+
+def bench_endpoint(client, path: str, requests: int, concurrency: int):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def bench_fanout(client, clients: int, messages: int):
+    """
+    Publishes `messages` metrics updates to the shared update stream and times
+    how long until every connected /ws/realtime client has received each one
+    """
+    from services import get_update_stream
+
+    stream = get_update_stream()
+    sessions, contexts = [], []
+    for _ in range(clients):
+        ctx = client.websocket_connect(WS_ENDPOINT)
+        sessions.append(ctx.__enter__())
+        contexts.append(ctx)
+
+    def publish(seq: int):
+        client.portal.call(stream.publish, "metrics", {
+            "type": "metrics_update", "timestamp": datetime.utcnow().isoformat(),
+            "data": {"cpu_usage": 0.0, "memory_usage": 0.0, "bench_seq": seq},
+        })
+
+    def wait_for(session, seq: int):
+        while True:
+            message = session.receive_json()
+            if message.get("data", {}).get("bench_seq") == seq:
+                return
+
+    try:
+        publish(-1)  # also drains the snapshot messages sent on connect
+        for session in sessions:
+            wait_for(session, -1)
+        latencies = []
+        start = time.perf_counter()
+        for seq in range(messages):
+            sent = time.perf_counter()
+            publish(seq)
+            for session in sessions:
+                wait_for(session, seq)
+            latencies.append(time.perf_counter() - sent)
+        elapsed = time.perf_counter() - start
+    finally:
+        for ctx in contexts:
+            ctx.__exit__(None, None, None)
+
+    result = summarize(latencies, elapsed, 0)
+    result["clients"] = clients
+    result["deliveries_per_s"] = round(clients * messages / elapsed, 1) if elapsed else None
+    return result
+
+
+def run_size(args, nodes: int):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fake_consul import FakeCluster, FakeConsul
+
+    cluster = FakeCluster(nodes, args.managers, args.services_per_node)
+    fake = FakeConsul(cluster, latency_ms=args.latency_ms, failure_rate=args.failure_rate).start()
+
+    os.environ.update({
+        "NEXUS_CONSUL_HOST": fake.host,
+        "NEXUS_CONSUL_PORT": str(fake.port),
+        "NEXUS_LOG_LEVEL": "ERROR",
+        "NEXUS_RESPONSE_CACHE_ENABLED": "false" if args.no_cache else "true",
+    })
+    os.chdir(BACKEND)  # the app resolves .env and the frontend path from its working directory
+    sys.path.insert(0, BACKEND)
+    import logging
+    logging.disable(logging.WARNING)
+    from fastapi.testclient import TestClient
+    from app import app
+
+    result = {"nodes": nodes, "endpoints": {}}
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        seed_reports(client, nodes, args.services_per_node, args.managers)
+        result["seed_reports_s"] = round(time.perf_counter() - start, 3)
+        result["check_errors"] = check_projection(client)
+
+        fake.requests.clear()
+        for path in ENDPOINTS:
+            client.get(path)  # warm-up (first snapshot refresh, lazy singletons)
+            result["endpoints"][path] = bench_endpoint(client, path, args.requests, args.concurrency)
+        if args.ws_clients:
+            result["endpoints"][WS_ENDPOINT] = bench_fanout(client, args.ws_clients, args.ws_messages)
+        result["consul_requests"] = dict(fake.requests)
+    fake.stop()
+    return result
+
+
+# -- driver ----------------------------------------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, max_regression: float) -> bool:
+    """Prints p50/p99 changes per size and endpoint; False when one regressed past the limit"""
+    ok = True
+    print(f"\nvs {baseline.get('commit') or 'baseline'} ({baseline.get('created_at', '?')}):")
+    for size, run in current["runs"].items():
+        base_run = baseline.get("runs", {}).get(size)
+        if not base_run:
+            continue
+        for path, stats in run["endpoints"].items():
+            base = base_run["endpoints"].get(path)
+            if not base:
+                continue
+            changes = []
+            for key in ("p50_ms", "p99_ms"):
+                if stats.get(key) and base.get(key):
+                    change = (stats[key] - base[key]) / base[key] * 100
+                    changes.append(f"{key[:3]} {change:+6.1f}%")
+                    if max_regression and change > max_regression:
+                        ok = False
+            print(f"  {size:>5} nodes  {path:<40} {'  '.join(changes)}")
+    return ok
+
+
+def print_run(run):
+    print(f"\n{run['nodes']} nodes (seeded in {run['seed_reports_s']}s, "
+          f"{sum(run['consul_requests'].values())} Consul requests while measuring)")
+    print(f"  {'endpoint':<40} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+    for path, stats in run["endpoints"].items():
+        print(f"  {path:<40} {stats['p50_ms']:>9} {stats['p99_ms']:>9} {stats['throughput_rps']:>9} {stats['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", default="10,100,1000", help="comma-separated cluster sizes")
+    parser.add_argument("--managers", type=int, default=3)
+    parser.add_argument("--services-per-node", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ws-clients", type=int, default=50, help="0 skips the WebSocket fan-out")
+    parser.add_argument("--ws-messages", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected latency per Consul request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of Consul requests failing with 500")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0,
+                        help="with --compare, exit non-zero when a p50/p99 grows by more than this percent")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="exit non-zero when more than this fraction of requests fail")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        json.dump(run_size(args, args.child), sys.stdout)
+        return
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "child")},
+        "runs": {},
+    }
+    argv = sys.argv[1:]
+    for size in [int(n) for n in args.nodes.split(",") if n.strip()]:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), *argv, "--child", str(size)],
+                              stdout=subprocess.PIPE, text=True)
+        if proc.returncode != 0:
+            print(f"FAIL: {size}-node run exited with {proc.returncode}")
+            sys.exit(1)
+        run = json.loads(proc.stdout)
+        results["runs"][str(size)] = run
+        print_run(run)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    ok = True
+    if args.compare:
+        with open(args.compare) as f:
+            ok = compare(results, json.load(f), args.max_regression)
+        if not ok:
+            print(f"FAIL: latency regressed by more than {args.max_regression:g}%")
+
+    total = sum(s["count"] for r in results["runs"].values() for s in r["endpoints"].values())
+    failed = sum(s["errors"] for r in results["runs"].values() for s in r["endpoints"].values())
+    for run in results["runs"].values():
+        for error in run.get("check_errors", ()):
+            print(f"FAIL: {run['nodes']} nodes: {error}")
+            ok = False
+    if total and failed / total > args.max_error_rate:
+        print(f"FAIL: {failed} of {total} requests failed")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
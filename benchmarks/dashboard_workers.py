@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+dashboard_workers.py - Dashboard read throughput by number of API workers
+Starts the dashboard with `python app.py` and NEXUS_WORKERS set to each
+count, against a local fake Consul (see fake_consul.py), and drives GET
+requests over real HTTP from several client processes. One worker is the
+standalone single-process mode; above that, a collector process serves
+NEXUS_WORKERS API workers. Prints requests per second, latency and the
+Consul requests made while measuring (these should not grow with workers).
+
+    python3 benchmarks/dashboard_workers.py [--workers 1,2,4] [--nodes 200] [--duration 10] [--clients 8]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "dashboard", "backend")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/health/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"dashboard on port {port} not ready after {timeout}s")
+
+
+def seed_reports(port: int, nodes: int):
+    """One metrics report per node, so aggregates and worker details have data"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    for i in range(nodes):
+        body = json.dumps({"cpu_usage": i % 100, "memory_usage": 50.0, "disk_usage": 40.0})
+        conn.request("POST", f"/api/analytics/nodes/node-{i:04d}/metrics", body=body,
+                     headers={"Content-Type": "application/json"})
+        conn.getresponse().read()
+
+
+def client(args):
+    """One client process: keep-alive GETs until the deadline; returns (latencies, errors)"""
+    port, path, deadline = args
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    latencies, errors = [], 0
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def run(args, workers: int, fake) -> dict:
+    port = free_port()
+    env = dict(os.environ, NEXUS_CONSUL_HOST=fake.host, NEXUS_CONSUL_PORT=str(fake.port),
+               NEXUS_PORT=str(port), NEXUS_WORKERS=str(workers), NEXUS_LOG_LEVEL="ERROR",
+               NEXUS_COLLECTOR_DIR=tempfile.mkdtemp(prefix="nexus-bench-"))
+    app = subprocess.Popen([sys.executable, "app.py"], cwd=BACKEND, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port)
+        seed_reports(port, args.nodes)
+        with Pool(args.clients) as pool:
+            # Warm every worker's cache, then measure
+            pool.map(client, [(port, args.path, time.time() + 1)] * args.clients)
+            fake.requests.clear()
+            deadline = time.time() + args.duration
+            results = pool.map(client, [(port, args.path, deadline)] * args.clients)
+        consul_requests = sum(fake.requests.values())
+    finally:
+        app.send_signal(signal.SIGINT)
+        try:
+            app.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            app.kill()
+            app.wait()
+
+    latencies = sorted(l for ls, _ in results for l in ls)
+    errors = sum(e for _, e in results)
+
+    def pct(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2) if latencies else None
+
+    return {"workers": workers, "requests": len(latencies), "errors": errors,
+            "rps": round(len(latencies) / args.duration, 1), "p50_ms": pct(0.5), "p99_ms": pct(0.99),
+            "consul_requests": consul_requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated API worker counts")
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--path", default="/api/workers/", help="endpoint to read")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per worker count")
+    parser.add_argument("--clients", type=int, default=8, help="client processes")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fake_consul import FakeCluster, FakeConsul
+
+    fake = FakeConsul(FakeCluster(args.nodes)).start()
+    print(f"{args.path} with {args.nodes} nodes, {args.clients} clients, {os.cpu_count()} CPUs")
+    print(f"  {'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'consul req':>10}")
+    try:
+        for workers in (int(w) for w in args.workers.split(",")):
+            r = run(args, workers, fake)
+            print(f"  {r['workers']:>7} {r['rps']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+                  f"{r['errors']:>7} {r['consul_requests']:>10}")
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
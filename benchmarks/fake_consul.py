@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+fake_consul.py - Local stand-in for the Consul HTTP API
+Serves a synthetic cluster (managers running `consul`, workers running
+`nexus-worker` plus app services) on the endpoints the dashboard reads, with
+optional per-request latency and failure injection. Used by the dashboard
+benchmarks; can also be run on its own to point a dev dashboard at:
+
+    python3 benchmarks/fake_consul.py --nodes 1000 --port 8500 [--latency-ms 2] [--failure-rate 0.01]
+    NEXUS_CONSUL_PORT=8500 python3 dashboard/backend/app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+POOLS = ["web", "api", "database", "worker"]
+
+
+class FakeCluster:
+    """Synthetic catalog: node-0000.. with the first `managers` nodes as Consul servers"""
+
+    def __init__(self, nodes: int, managers: int = 3, services_per_node: int = 3, unhealthy: float = 0.0,
+                 degraded: float = 0.0, seed: int = 42):
+        rng = random.Random(seed)
+        self.nodes: List[Dict] = []
+        self.services: Dict[str, Dict[str, Dict]] = {}
+        self.checks: Dict[str, List[Dict]] = {}
+        for i in range(nodes):
+            name = f"node-{i:04d}"
+            address = f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+            self.nodes.append({"ID": f"{i:08x}-0000-0000-0000-000000000000", "Node": name,
+                               "Address": address, "Datacenter": "krutrim-dc1"})
+            if i < managers:
+                services = {"consul": {"ID": "consul", "Service": "consul", "Port": 8300, "Tags": []}}
+            else:
+                pool = POOLS[i % len(POOLS)]
+                services = {"nexus-worker": {"ID": "nexus-worker", "Service": "nexus-worker",
+                                             "Port": 9100, "Tags": [pool]}}
+                for j in range(services_per_node):
+                    sid = f"app-{j}"
+                    services[sid] = {"ID": sid, "Service": sid, "Port": 8000 + j, "Tags": [pool]}
+            self.services[name] = services
+            status = "critical" if rng.random() < unhealthy else "passing"
+            self.checks[name] = [{"Node": name, "CheckID": "serfHealth", "Name": "Serf Health Status",
+                                  "Status": status, "ServiceID": "", "ServiceName": "", "Output": ""}]
+            if i >= managers and services_per_node and rng.random() < degraded:
+                self.checks[name].append({"Node": name, "CheckID": "service:app-0", "Name": "HTTP check",
+                                          "Status": "critical", "ServiceID": "app-0", "ServiceName": "app-0",
+                                          "Output": "HTTP GET http://localhost:8000/health: 503"})
+        self.by_name = {n["Node"]: n for n in self.nodes}
+        self.leader = f"{self.nodes[0]['Address']}:8300" if self.nodes else ""
+        self.peers = [f"{n['Address']}:8300" for n in self.nodes[:managers]]
+
+    def route(self, path: str) -> Optional[object]:
+        """JSON body for a Consul API path, or None for 404"""
+        if path == "/v1/agent/self":
+            return {"Config": {"Datacenter": "krutrim-dc1", "NodeName": self.nodes[0]["Node"] if self.nodes else ""}}
+        if path == "/v1/status/leader":
+            return self.leader
+        if path == "/v1/status/peers":
+            return self.peers
+        if path == "/v1/catalog/nodes":
+            return self.nodes
+        if path == "/v1/catalog/services":
+            names: Dict[str, set] = {}
+            for services in self.services.values():
+                for svc in services.values():
+                    names.setdefault(svc["Service"], set()).update(svc["Tags"])
+            return {name: sorted(tags) for name, tags in names.items()}
+        if path.startswith("/v1/catalog/service/"):
+            service = path[len("/v1/catalog/service/"):]
+            return [
+                {"Node": node["Node"], "Address": node["Address"], "ServiceID": sid, "ServiceName": svc["Service"],
+                 "ServicePort": svc["Port"], "ServiceTags": svc["Tags"]}
+                for node in self.nodes
+                for sid, svc in self.services[node["Node"]].items() if svc["Service"] == service
+            ]
+        if path.startswith("/v1/catalog/node/"):
+            name = path[len("/v1/catalog/node/"):]
+            node = self.by_name.get(name)
+            return {"Node": node, "Services": self.services[name]} if node else None
+        if path.startswith("/v1/health/node/"):
+            return self.checks.get(path[len("/v1/health/node/"):], [])
+        if path.startswith("/v1/health/state/"):
+            state = path[len("/v1/health/state/"):]
+            return [c for checks in self.checks.values() for c in checks if state == "any" or c["Status"] == state]
+        if path.startswith("/v1/health/service/"):
+            service = path[len("/v1/health/service/"):]
+            return [
+                {"Node": node, "Service": self.services[node["Node"]][sid], "Checks": self.checks[node["Node"]]}
+                for node in self.nodes
+                for sid, svc in self.services[node["Node"]].items() if svc["Service"] == service
+            ]
+        return None
+
+
+class FakeConsul:
+    """
+    Serves a FakeCluster over HTTP on a background thread.
+
+    Every request sleeps `latency_ms` and fails with a 500 with probability
+    `failure_rate`. `requests` counts requests by endpoint (the path with the
+    node or service name stripped).
+    """
+
+    def __init__(self, cluster: FakeCluster, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 42):
+        self.cluster = cluster
+        self.latency = latency_ms / 1000.0
+        self.failure_rate = failure_rate
+        self.requests: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                parts = path.split("/")
+                with fake._lock:
+                    fake.requests["/".join(parts[:4]) if len(parts) > 4 else path] += 1
+                    fail = fake._rng.random() < fake.failure_rate
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fail:
+                    self._send(500, b"injected failure")
+                    return
+                data = fake.cluster.route(path)
+                if data is None:
+                    self._send(404, b"")
+                    return
+                self._send(200, json.dumps(data).encode())
+
+            do_PUT = do_GET
+
+            def _send(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-Consul-Index", "1")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.host, self.port = self.server.server_address[:2]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> "FakeConsul":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--managers", type=int, default=3)
+    parser.add_argument("--services-per-node", type=int, default=3)
+    parser.add_argument("--unhealthy", type=float, default=0.0, help="fraction of nodes with a critical check")
+    parser.add_argument("--degraded", type=float, default=0.0, help="fraction of workers with a failing service check")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    args = parser.parse_args()
+
+    cluster = FakeCluster(args.nodes, args.managers, args.services_per_node, args.unhealthy, args.degraded)
+    fake = FakeConsul(cluster, args.host, args.port, args.latency_ms, args.failure_rate)
+    print(f"Fake Consul with {args.nodes} nodes on http://{fake.host}:{fake.port} (Ctrl+C to stop)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+json_serialization.py - JSON serialization benchmark for dashboard responses
+Compares FastAPI's default response path with FastJSONResponse for a
+1,000-worker list and a 10k-point time series, as pydantic models and as
+internal MetricPoint records (time and bytes).
+
+    python3 benchmarks/json_serialization.py [--workers 1000] [--points 10000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "backend")
+sys.path.insert(0, BACKEND)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from api.responses import FastJSONResponse, orjson  # noqa: E402
+from models import MetricPoint, ServiceInfo, TimeSeriesDataPoint, Worker, WorkerPool, WorkerStatus  # noqa: E402
+
+
+def make_workers(count: int) -> List[Worker]:
+    pools = list(WorkerPool)
+    return [
+        Worker(
+            id=f"wkr-node-{i:04d}", hostname=f"node-{i:04d}", ip_address=f"10.0.{i // 256}.{i % 256}",
+            pool=pools[i % len(pools)], status=WorkerStatus.HEALTHY,
+            cpu_usage=i % 100, memory_usage=(i * 7) % 100, disk_usage=(i * 3) % 100,
+            uptime_seconds=86400 + i, last_heartbeat=datetime.utcnow(),
+            services=[ServiceInfo(name=f"svc-{j}", status="running", port=8000 + j) for j in range(3)],
+            total_services=3, healthy_services=3,
+        )
+        for i in range(count)
+    ]
+
+
+def make_points(count: int) -> List[TimeSeriesDataPoint]:
+    now = datetime.utcnow()
+    return [TimeSeriesDataPoint(timestamp=now - timedelta(seconds=10 * i), value=i % 100 + 0.5)
+            for i in range(count)]
+
+
+def make_records(count: int) -> List[MetricPoint]:
+    now = datetime.utcnow()
+    return [MetricPoint(now - timedelta(seconds=10 * i), i % 100 + 0.5) for i in range(count)]
+
+
+def bench(fn, runs: int):
+    body = fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1000)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = {
+        f"List[Worker] x{args.workers}": (make_workers(args.workers), TypeAdapter(List[Worker])),
+        f"timeseries x{args.points}": ({"metric": "cpu", "data": make_points(args.points)}, None),
+        f"records x{args.points}": ({"metric": "cpu", "data": make_records(args.points)}, None),
+    }
+
+    print(f"serializer: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    print(f"{'case':<24} {'path':<34} {'median ms':>10} {'bytes':>10}")
+    for name, (content, adapter) in cases.items():
+        paths = {}
+        if adapter is not None:
+            # What FastAPI does with response_model: re-validate, serialize, json.dumps
+            paths["fastapi response_model"] = lambda: JSONResponse(
+                adapter.dump_python(adapter.validate_python(content), mode="json")).body
+        paths["fastapi jsonable_encoder"] = lambda: JSONResponse(jsonable_encoder(content)).body
+        paths["FastJSONResponse"] = lambda: FastJSONResponse(content).body
+
+        baseline = None
+        for label, fn in paths.items():
+            ms, size = bench(fn, args.runs)
+            baseline = baseline or ms
+            print(f"{name:<24} {label:<34} {ms:>10.2f} {size:>10} ({baseline / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+supervisor_stress.py - Stress benchmark for proc_ipc.Process and the services.py supervisor
+Spawns synthetic children that print sequence-numbered, timestamped lines at
+a set rate and exit after a random lifetime or crash at a set rate, then runs
+the real supervision pass (services.supervise_once) over them. It reports:
+
+- spawn latency: time spent in Process.start, and time until the child's
+  first line arrives
+- restart latency: from a child's exit to its replacement being spawned
+- log throughput, plus dropped, delayed and partial lines
+- the supervisor's CPU, RSS, pass duration and open file descriptors
+
+    python3 benchmarks/supervisor_stress.py [--children 200] [--duration 20] [--line-rate 20]
+    python3 benchmarks/supervisor_stress.py --crash-rate 0.2 --lifetime 5 --tick 0.1
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import services  # noqa: E402
+from proc_ipc import Process, logger  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(ROOT, "benchmarks", "results", "supervisor.json")
+
+# argv: line rate/s, line bytes, mean lifetime s (0 = forever), crashes per second, exit-record dir
+CHILD = r"""
+import os, random, signal, sys, time
+rate, line_bytes, lifetime, crash_rate, outdir = float(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3]), float(sys.argv[4]), sys.argv[5]
+pid = os.getpid()
+rng = random.Random(pid)
+sent = 0
+def finish(code):
+    with open(os.path.join(outdir, str(pid)), "w") as f:
+        f.write(f"{time.time():.6f} {sent}")
+    os._exit(code)
+signal.signal(signal.SIGTERM, lambda *a: finish(0))
+now = time.time()
+planned = now + (lifetime * rng.uniform(0.5, 1.5) if lifetime > 0 else 1e12)
+crash = now + (rng.expovariate(crash_rate) if crash_rate > 0 else 1e12)
+end = min(planned, crash)
+pad = "x" * max(0, line_bytes - 48)
+out = sys.stdout
+out.write(f"R {pid} {now:.6f}\n"); out.flush()
+interval = 1.0 / rate if rate > 0 else None
+next_line = now
+while True:
+    now = time.time()
+    if now >= end:
+        finish(1 if crash <= planned else 0)
+    if interval and now >= next_line:
+        out.write(f"L {pid} {sent} {now:.6f} {pad}\n"); out.flush()
+        sent += 1
+        next_line += interval
+    wake = min(end, next_line if interval else end)
+    time.sleep(max(0.0, min(wake - time.time(), 0.5)))
+"""
+
+
+class TimedProcess(Process):
+    """Process that records how long each start() (fork + exec + pipe setup) blocks the supervisor"""
+
+    spawn_times = []
+
+    def start(self):
+        begin = time.perf_counter()
+        super().start()
+        TimedProcess.spawn_times.append(time.perf_counter() - begin)
+
+
+class LineCollector(logging.Handler):
+    """Parses the supervisor's log records for the children's ready and sequence lines"""
+
+    def __init__(self):
+        super().__init__()
+        self.ready = {}                    # pid -> receive time of its first line
+        self.received = Counter()          # pid -> lines received
+        self.last_seq = {}                 # pid -> last sequence number seen
+        self.gaps = 0
+        self.delays = []
+        self.partial = 0
+        self.bytes = 0
+
+    def emit(self, record):
+        now = time.time()
+        message = record.getMessage()
+        if not message.startswith("["):
+            return  # the supervisor's own messages
+        _, _, line = message.partition("] ")
+        self.bytes += len(line) + 1
+        parts = line.split(" ")
+        try:
+            if parts[0] == "R" and len(parts) == 3:
+                self.ready[int(parts[1])] = now
+                return
+            if parts[0] == "L" and len(parts) == 5:
+                pid, seq, sent_at = int(parts[1]), int(parts[2]), float(parts[3])
+            else:
+                raise ValueError(line)
+        except ValueError:
+            self.partial += 1  # a line split across reads
+            return
+        last = self.last_seq.get(pid, -1)
+        if seq > last + 1:
+            self.gaps += seq - last - 1
+        self.last_seq[pid] = max(last, seq)
+        self.received[pid] += 1
+        self.delays.append(now - sent_at)
+
+
+def percentiles(values, scale=1000.0):
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+
+    def pct(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale, 3)
+
+    return {"count": len(ordered), "p50": pct(0.5), "p99": pct(0.99), "max": round(ordered[-1] * scale, 3),
+            "mean": round(statistics.fmean(ordered) * scale, 3)}
+
+
+def read_exits(outdir):
+    """pid -> (exit time, lines sent) written by children as they exit"""
+    exits = {}
+    for name in os.listdir(outdir):
+        try:
+            with open(os.path.join(outdir, name)) as f:
+                ts, sent = f.read().split()
+            exits[int(name)] = (float(ts), int(sent))
+        except (OSError, ValueError):
+            pass
+    return exits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of supervision")
+    parser.add_argument("--line-rate", type=float, default=20.0, help="lines per second per child")
+    parser.add_argument("--line-bytes", type=int, default=120)
+    parser.add_argument("--lifetime", type=float, default=10.0, help="mean seconds a child lives (0 = forever)")
+    parser.add_argument("--crash-rate", type=float, default=0.05, help="crashes per second per child")
+    parser.add_argument("--tick", type=float, default=1.0, help="sleep between supervision passes (services.py: 1s)")
+    parser.add_argument("--delay-threshold", type=float, default=2.0, help="seconds after which a line counts as delayed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    collector = LineCollector()
+    logger.addHandler(collector)
+    logger.propagate = False  # keep child output off the terminal
+    outdir = tempfile.mkdtemp(prefix="nexus-supervisor-bench-")
+    child_args = [str(args.line_rate), str(args.line_bytes), str(args.lifetime), str(args.crash_rate), outdir]
+
+    fds_before = len(os.listdir("/proc/self/fd"))
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    wall_start = time.perf_counter()
+
+    procs = [TimedProcess([sys.executable, "-S", "-c", CHILD, *child_args], name=f"child-{i:03d}")
+             for i in range(args.children)]
+    for proc in procs:
+        proc.start()
+    initial_spawn = time.perf_counter() - wall_start
+
+    pids = {proc.name: proc.pid for proc in procs}
+    started = {proc.pid: proc.start_time for proc in procs}
+    restarts = []  # (old pid, new start time)
+    passes = []
+    error = None
+    deadline = time.perf_counter() + args.duration
+    try:
+        while time.perf_counter() < deadline:
+            begin = time.perf_counter()
+            try:
+                services.supervise_once(procs)
+            except Exception as e:  # the supervisor itself failed (e.g. out of file descriptors)
+                error = f"{type(e).__name__}: {e} after {time.perf_counter() - wall_start:.1f}s"
+                break
+            passes.append(time.perf_counter() - begin)
+            for proc in procs:
+                if proc.pid != pids[proc.name]:
+                    restarts.append((pids[proc.name], proc.start_time))
+                    pids[proc.name] = proc.pid
+                    started[proc.pid] = proc.start_time
+            time.sleep(args.tick)
+        if error is None:
+            services.supervise_once(procs)  # last drain before shutdown
+    finally:
+        logger.removeHandler(collector)  # stop() logs are not child output
+        usage_after = resource.getrusage(resource.RUSAGE_SELF)
+        wall = time.perf_counter() - wall_start
+        fds_after = len(os.listdir("/proc/self/fd"))
+        for proc in procs:
+            proc.stop(timeout=2)
+        time.sleep(0.2)
+
+    exits = read_exits(outdir)
+    shutil.rmtree(outdir, ignore_errors=True)
+
+    ready = [collector.ready[pid] - start for pid, start in started.items() if pid in collector.ready]
+    restart_latency = [start - exits[pid][0] for pid, start in restarts if pid in exits]
+    # Lines an exited child wrote that never arrived (lost with the old pipe on restart)
+    restarted = {pid for pid, _ in restarts}
+    lost_on_exit = sum(max(0, exits[pid][1] - collector.received[pid]) for pid in restarted if pid in exits)
+    sent = sum(sent for _, sent in exits.values())
+    received = sum(collector.received.values())
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "supervisor_error": error,
+        "params": {k: v for k, v in vars(args).items() if k != "output"},
+        "spawn_ms": percentiles(TimedProcess.spawn_times),
+        "initial_spawn_s": round(initial_spawn, 3),
+        "ready_ms": percentiles(ready),
+        "restarts": len(restarts),
+        "restart_ms": percentiles(restart_latency),
+        "lines": {
+            "sent": sent,
+            "received": received,
+            "undelivered": max(0, sent - received),
+            "dropped_gaps": collector.gaps,
+            "lost_on_restart": lost_on_exit,
+            "partial": collector.partial,
+            "delayed": sum(1 for d in collector.delays if d > args.delay_threshold),
+            "delay_ms": percentiles(collector.delays),
+            "throughput_lines_s": round(received / wall, 1),
+            "throughput_mb_s": round(collector.bytes / wall / 1e6, 3),
+        },
+        "supervisor": {
+            "cpu_percent": round(cpu / wall * 100, 1),
+            "max_rss_mb": round(usage_after.ru_maxrss / 1024, 1),
+            "pass_ms": percentiles(passes),
+            "open_fds_before": fds_before,
+            "open_fds_after": fds_after,
+        },
+    }
+
+    lines = results["lines"]
+    sup = results["supervisor"]
+    print(f"{args.children} children for {args.duration:g}s, {args.line_rate:g} lines/s each, "
+          f"tick {args.tick:g}s")
+    print(f"spawn:      start() p50 {results['spawn_ms'].get('p50')} ms  p99 {results['spawn_ms'].get('p99')} ms;"
+          f"  first line p50 {results['ready_ms'].get('p50')} ms  p99 {results['ready_ms'].get('p99')} ms")
+    print(f"restarts:   {results['restarts']}  latency p50 {results['restart_ms'].get('p50')} ms"
+          f"  p99 {results['restart_ms'].get('p99')} ms")
+    print(f"lines:      {lines['received']} of {lines['sent']} received  ({lines['throughput_lines_s']} lines/s,"
+          f" {lines['throughput_mb_s']} MB/s)")
+    print(f"            dropped {lines['dropped_gaps']}  lost on restart {lines['lost_on_restart']}"
+          f"  undelivered {lines['undelivered']}  partial {lines['partial']}  delayed >{args.delay_threshold:g}s {lines['delayed']}")
+    print(f"            delay p50 {lines['delay_ms'].get('p50')} ms  p99 {lines['delay_ms'].get('p99')} ms")
+    print(f"supervisor: cpu {sup['cpu_percent']}%  max rss {sup['max_rss_mb']} MB"
+          f"  pass p50 {sup['pass_ms'].get('p50')} ms  p99 {sup['pass_ms'].get('p99')} ms"
+          f"  fds {sup['open_fds_before']} -> {sup['open_fds_after']}")
+
+    if error:
+        print(f"SUPERVISOR FAILED: {error}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,5 +6,13 @@ from .managers import router as managers_router
 from .workers import router as workers_router
 from .analytics import router as analytics_router
 from .health import router as health_router
+from .alerts import router as alerts_router
+from .nodes import router as nodes_router
+from .stream import router as stream_router
+from .telemetry import router as telemetry_router, instrument_requests
+from .profiling import router as profiling_router, profile_requests
+from .cache import ResponseCache
+from .collector import proxy_to_collector
+from .assets import router as assets_router, get_asset_bundle
 
-__all__ = ['managers_router', 'workers_router', 'analytics_router', 'health_router']
+__all__ = ['managers_router', 'workers_router', 'analytics_router', 'health_router', 'alerts_router', 'nodes_router', 'stream_router', 'telemetry_router', 'instrument_requests', 'profiling_router', 'profile_requests', 'ResponseCache', 'proxy_to_collector', 'assets_router', 'get_asset_bundle']
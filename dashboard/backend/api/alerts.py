@@ -0,0 +1,25 @@
+"""
+Alerting API endpoints
+"""
+
+from fastapi import APIRouter, Depends
+from typing import List
+import logging
+
+from models import Alert, AlertRule
+from services import AlertEngine, get_alert_engine
+
+router = APIRouter(prefix="/api/alerts", tags=["alerts"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/", response_model=List[Alert])
+async def list_alerts(engine: AlertEngine = Depends(get_alert_engine)):
+    """Currently firing alerts, oldest first"""
+    return engine.active()
+
+
+@router.get("/rules", response_model=List[AlertRule])
+async def list_rules(engine: AlertEngine = Depends(get_alert_engine)):
+    """Alert rules being evaluated"""
+    return engine.rules
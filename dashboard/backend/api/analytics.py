@@ -3,99 +3,198 @@ Analytics and metrics API endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List
+from typing import List, Optional
 import logging
+import re
 
-from models import Metrics, SystemMetrics, TimeSeriesDataPoint
-from services import ConsulService, MetricsService
+from config import settings
+from models import (
+    Metrics, SystemMetrics, NodeMetricsReport, PercentileSummary, TopNode, TopService,
+    ServiceSampleBatch, ServiceHistory
+)
+from services import (
+    MetricsService, ClusterAggregates, get_cluster_aggregates, AlertEngine, get_alert_engine,
+    UpdateStream, get_update_stream, ServiceMetricsStore, get_service_metrics
+)
+from .responses import fast_json
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 logger = logging.getLogger(__name__)
 
 
-def get_consul_service():
-    return ConsulService()
-
 def get_metrics_service():
     return MetricsService()
 
 
+# NodeMetricsReport fields the alert rules can refer to
+ALERT_METRICS = {'cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out'}
+
+_WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(window: str) -> Optional[float]:
+    """'current' -> None, '15m' / '24h' / '7d' -> seconds"""
+    if window == 'current':
+        return None
+    match = re.fullmatch(r'(\d+)([smhd])', window)
+    if not match or int(match.group(1)) == 0:
+        raise HTTPException(status_code=400, detail="Window must be 'current' or like 15m, 24h, 7d")
+    return int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+
+
+def parse_quantiles(q: str) -> List[float]:
+    try:
+        quantiles = [float(v) for v in q.split(',') if v.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Quantiles must be numbers, e.g. 0.5,0.9,0.99")
+    if not quantiles or not all(0 <= v <= 1 for v in quantiles):
+        raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1")
+    return quantiles
+
+
 @router.get("/overview", response_model=SystemMetrics)
 async def get_overview(
-    consul: ConsulService = Depends(get_consul_service),
-    metrics: MetricsService = Depends(get_metrics_service)
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    alerts: AlertEngine = Depends(get_alert_engine)
 ):
-    """Get system overview metrics"""
+    """Get system overview metrics (read from the incrementally maintained aggregates)"""
     try:
-        # Get all nodes
-        nodes = consul.get_all_nodes()
-        
-        # Separate managers and workers
-        managers = []
-        workers = []
-        
-        for node in nodes:
-            node_services = consul.get_node_services(node['Node'])
-            is_manager = any(s.get('Service') == 'consul' for s in node_services)
-            
-            node_data = {
-                'status': 'healthy' if consul.is_node_healthy(node['Node']) else 'failed',
-                'cpu_usage': 0,  # Would get from actual metrics
-                'memory_usage': 0,
-                'disk_usage': 0
-            }
-            
-            if is_manager:
-                managers.append(node_data)
-            else:
-                workers.append(node_data)
-        
-        # Aggregate metrics
-        system_metrics = metrics.aggregate_cluster_metrics(managers, workers)
-        
-        return system_metrics
+        return fast_json(aggregates.system_metrics(alerts_count=alerts.active_count()))
     except Exception as e:
         logger.error(f"Failed to get overview: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/nodes/{node}/metrics", status_code=202)
+async def report_node_metrics(
+    node: str,
+    report: NodeMetricsReport,
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    alerts: AlertEngine = Depends(get_alert_engine),
+    stream: UpdateStream = Depends(get_update_stream)
+):
+    """Accept current metrics pushed by a cluster node, evaluate alert rules and publish it as node:<node>"""
+    services = {name: (usage.cpu_usage, usage.memory_mb) for name, usage in report.services.items()}
+    accepted = aggregates.report(
+        node, report.cpu_usage, report.memory_usage, report.disk_usage,
+        report.network_in, report.network_out, report.running_services, services,
+        report.uptime_seconds
+    )
+    if not accepted:
+        raise HTTPException(status_code=404, detail="Node not found")
+    if settings.alerting_enabled:
+        alerts.observe(node, report.model_dump(include=ALERT_METRICS))
+    stream.publish(f"node:{node}", report.model_dump(mode="json"))
+    return {"status": "accepted", "node": node}
+
+
+@router.post("/nodes/{node}/services", status_code=202)
+async def report_service_metrics(
+    node: str,
+    batch: ServiceSampleBatch,
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics)
+):
+    """Accept a batch of per-service samples from a node's supervisor"""
+    if not service_metrics.record(node, batch.services):
+        raise HTTPException(status_code=404, detail="Node not found")
+    return {"status": "accepted", "node": node,
+            "samples": sum(len(rows) for rows in batch.services.values())}
+
+
+@router.get("/services/{name}", response_model=ServiceHistory)
+async def get_service_history(
+    name: str,
+    window: str = Query("1h", description="Window like 15m, 24h, 7d"),
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics)
+):
+    """
+    A service's latest metrics on each node plus rollups over the window:
+    per-bucket average/max CPU and memory and restart counts (per minute up
+    to 1h, per 15 minutes up to 24h, hourly up to 7d).
+    """
+    seconds = parse_window(window)
+    if seconds is None:
+        raise HTTPException(status_code=400, detail="Window must be like 15m, 24h, 7d")
+    try:
+        history = service_metrics.history(name, seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if history is None:
+        raise HTTPException(status_code=404, detail="Service not found")
+    return fast_json(ServiceHistory(window=window, **history))
+
+
+@router.get("/percentiles", response_model=PercentileSummary)
+async def get_percentiles(
+    metric: str = Query("cpu", pattern="^(cpu|memory|disk)$"),
+    window: str = Query("current", description="'current' (across nodes now) or a window like 15m, 24h, 7d"),
+    node: Optional[str] = Query(None, description="Restrict a time window to one node"),
+    q: str = Query("0.5,0.9,0.99", description="Comma-separated quantiles"),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates)
+):
+    """
+    Percentiles of a node metric from mergeable sketches: across the current
+    value of every reporting node, or over every report in a time window
+    (fleet-wide up to 7d, per node up to 24h).
+    """
+    seconds = parse_window(window)
+    quantiles = parse_quantiles(q)
+    try:
+        count, values = aggregates.percentiles(metric, quantiles, window=seconds, node=node)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Node not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return PercentileSummary(
+        metric=metric, window=window, node=node, count=count,
+        percentiles={f"p{v * 100:g}": value for v, value in zip(quantiles, values)}
+    )
+
+
+@router.get("/top/nodes", response_model=List[TopNode])
+async def get_top_nodes(
+    metric: str = Query("cpu", pattern="^(cpu|memory|disk)$"),
+    k: int = Query(10, ge=1, le=100),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates)
+):
+    """The k nodes with the highest current metric value"""
+    return fast_json(aggregates.top_nodes(metric, k))
+
+
+@router.get("/top/services", response_model=List[TopService])
+async def get_top_services(
+    metric: str = Query("cpu", pattern="^(cpu|memory)$", description="cpu (%) or memory (MB)"),
+    k: int = Query(10, ge=1, le=100),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates)
+):
+    """The k services with the highest current metric value, from node reports"""
+    return fast_json(aggregates.top_services(metric, k))
+
+
 @router.get("/performance", response_model=Metrics)
 async def get_performance_metrics(
     duration_hours: int = Query(24, ge=1, le=168, description="Duration in hours"),
-    consul: ConsulService = Depends(get_consul_service),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    alerts: AlertEngine = Depends(get_alert_engine),
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics),
     metrics: MetricsService = Depends(get_metrics_service)
 ):
     """Get performance metrics with time series data"""
     try:
-        # Get current system metrics
-        nodes = consul.get_all_nodes()
-        managers = []
-        workers = []
-        
-        for node in nodes:
-            node_services = consul.get_node_services(node['Node'])
-            is_manager = any(s.get('Service') == 'consul' for s in node_services)
-            
-            node_data = {'status': 'healthy'}
-            if is_manager:
-                managers.append(node_data)
-            else:
-                workers.append(node_data)
-        
-        system_metrics = metrics.aggregate_cluster_metrics(managers, workers)
+        system_metrics = aggregates.system_metrics(alerts_count=alerts.active_count())
         
         # Get time series data
         cpu_history = metrics.get_time_series_data('cpu', duration_hours)
         memory_history = metrics.get_time_series_data('memory', duration_hours)
         network_history = metrics.get_time_series_data('network', duration_hours)
         
-        return Metrics(
+        return fast_json(Metrics(
             system=system_metrics,
-            services=[],
+            services=service_metrics.latest(),
             cpu_history=cpu_history,
             memory_history=memory_history,
             network_history=network_history
-        )
+        ))
     except Exception as e:
         logger.error(f"Failed to get performance metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -113,7 +212,7 @@ async def get_timeseries(
             raise HTTPException(status_code=400, detail="Invalid metric type")
         
         data = metrics.get_time_series_data(metric_type, duration_hours)
-        return {"metric": metric_type, "data": data}
+        return fast_json({"metric": metric_type, "data": data})
     except HTTPException:
         raise
     except Exception as e:
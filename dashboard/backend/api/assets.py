@@ -0,0 +1,195 @@
+"""
+Frontend asset serving
+At startup every file under the frontend directory is minified (CSS and JS),
+fingerprinted with a content hash and precompressed (gzip, and brotli when
+installed), and index.html is rewritten to the fingerprinted URLs. Everything
+is then served from memory: fingerprinted URLs are cached as immutable,
+index.html and the plain URLs revalidate with their ETag.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+
+from config import settings
+from .cache import etag_matches
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+router = APIRouter(tags=["frontend"])
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+MIN_COMPRESS_SIZE = 256  # smaller bodies gain less than the encoding costs
+
+_CSS_COMMENTS = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(text: str) -> str:
+    """Drops comments and whitespace around CSS punctuation (selectors keep their spaces)"""
+    text = _CSS_COMMENTS.sub("", text)
+    text = _CSS_PUNCTUATION.sub(r"\1", _CSS_SPACE.sub(" ", text))
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text: str) -> str:
+    """
+    Drops indentation, blank lines and whole-line // comments. Lines inside
+    multi-line template literals are kept as they are, so string content
+    never changes.
+    """
+    lines = []
+    in_template = False
+    for line in text.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("//"):
+                lines.append(stripped)
+        # An odd number of unescaped backticks toggles the template literal state
+        if (line.count("`") - line.count("\\`")) % 2:
+            in_template = not in_template
+    return "\n".join(lines) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+class Asset:
+    """One file's encoded variants ('identity', 'gzip', 'br') with its headers"""
+    __slots__ = ('media_type', 'digest', 'cache_control', 'variants')
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.cache_control = cache_control
+        self.variants: Dict[str, bytes] = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE and not media_type.startswith(("image/", "font/")):
+            compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                compressed['br'] = brotli.compress(body)
+            self.variants.update({enc: data for enc, data in compressed.items() if len(data) < len(body)})
+
+    def with_cache_control(self, cache_control: str) -> "Asset":
+        clone = Asset.__new__(Asset)
+        clone.media_type, clone.digest, clone.variants = self.media_type, self.digest, self.variants
+        clone.cache_control = cache_control
+        return clone
+
+    def respond(self, request: Request) -> Response:
+        accepted = {token.split(";")[0].strip() for token in request.headers.get("accept-encoding", "").split(",")
+                    if not token.replace(" ", "").endswith(";q=0")}
+        encoding = next((enc for enc in ('br', 'gzip') if enc in accepted and enc in self.variants), 'identity')
+        etag = f'"{self.digest}"' if encoding == 'identity' else f'"{self.digest}-{encoding}"'
+        headers = {'ETag': etag, 'Cache-Control': self.cache_control, 'Vary': 'Accept-Encoding'}
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class AssetBundle:
+    """
+    The processed frontend: `assets` maps URL paths under /static (both
+    `css/modern.css` and `css/modern.<hash>.css`) to assets, and `index` is
+    index.html pointing at the fingerprinted URLs.
+    """
+
+    def __init__(self, root: Path, minify: bool = True):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        self.fingerprinted: Dict[str, str] = {}  # plain path -> fingerprinted path
+        for path in sorted(p for p in root.rglob("*") if p.is_file() and p.name != "index.html"):
+            rel = path.relative_to(root).as_posix()
+            body = path.read_bytes()
+            minifier = MINIFIERS.get(path.suffix) if minify else None
+            if minifier is not None:
+                body = minifier(body.decode("utf-8")).encode("utf-8")
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if media_type.startswith("text/") or media_type == "application/javascript":
+                media_type += "; charset=utf-8"
+            asset = Asset(body, media_type, IMMUTABLE)
+            stem, dot, suffix = rel.rpartition(".")
+            fingerprinted = f"{stem}.{asset.digest}.{suffix}" if dot else f"{rel}.{asset.digest}"
+            self.assets[fingerprinted] = asset
+            self.assets[rel] = asset.with_cache_control(REVALIDATE)
+            self.fingerprinted[rel] = fingerprinted
+
+        self.index: Optional[Asset] = None
+        index_path = root / "index.html"
+        if index_path.exists():
+            html = index_path.read_text(encoding="utf-8")
+            html = re.sub(r'(["\'])/static/([^"\'?#]+)\1',
+                          lambda m: f'{m.group(1)}/static/{self.fingerprinted.get(m.group(2), m.group(2))}{m.group(1)}',
+                          html)
+            self.index = Asset(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+
+    def stats(self) -> Dict[str, int]:
+        """Total bytes per encoding over the fingerprinted assets"""
+        totals: Dict[str, int] = {}
+        for path in self.fingerprinted.values():
+            variants = self.assets[path].variants
+            for enc in ('identity', 'gzip') + (('br',) if brotli is not None else ()):
+                totals[enc] = totals.get(enc, 0) + len(variants.get(enc, variants['identity']))
+        return totals
+
+
+def frontend_root() -> Path:
+    root = Path(settings.frontend_path)
+    if not root.is_absolute():
+        # Relative to the backend working directory (systemd WorkingDirectory)
+        root = Path.cwd() / root
+    return root
+
+
+_asset_bundle: Optional[AssetBundle] = None
+
+
+def get_asset_bundle() -> Optional[AssetBundle]:
+    """Process-wide AssetBundle built on first use; None when the frontend directory is missing"""
+    global _asset_bundle
+    if _asset_bundle is None:
+        root = frontend_root()
+        if not root.is_dir():
+            logger.warning(f"Frontend path not found: {root} - static files not available")
+            return None
+        _asset_bundle = AssetBundle(root, minify=settings.static_minify)
+        sizes = _asset_bundle.stats()
+        logger.info(f"Frontend assets built from {root}: {len(_asset_bundle.fingerprinted)} files, "
+                    + ", ".join(f"{enc} {size / 1024:.1f} KiB" for enc, size in sizes.items()))
+    return _asset_bundle
+
+
+@router.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_frontend(request: Request):
+    """The dashboard page, from memory"""
+    bundle = get_asset_bundle()
+    if bundle is None or bundle.index is None:
+        return JSONResponse(status_code=404, content={"error": "Frontend not found",
+                                                      "path": str(frontend_root() / "index.html")})
+    return bundle.index.respond(request)
+
+
+@router.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_static(path: str, request: Request):
+    """A frontend asset; fingerprinted paths are immutable"""
+    bundle = get_asset_bundle()
+    asset = bundle.assets.get(path) if bundle is not None else None
+    if asset is None:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return asset.respond(request)
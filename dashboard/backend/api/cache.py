@@ -0,0 +1,143 @@
+"""
+Response caching for read-only API endpoints
+Strong ETags, conditional GET (304) and a short server-side TTL with
+request coalescing, keyed on path + query and the cluster snapshot version
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+from services.telemetry import RESPONSE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Headers recomputed by Response or owned by the cache
+_SKIP_HEADERS = {'content-length', 'etag', 'cache-control'}
+
+
+class CachedResponse:
+    __slots__ = ('body', 'status_code', 'headers', 'media_type', 'etag', 'version', 'created_at')
+
+    def __init__(self, body: bytes, status_code: int, headers: Dict[str, str],
+                 media_type: Optional[str], etag: str, version: int):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.media_type = media_type
+        self.etag = etag
+        self.version = version
+        self.created_at = time.monotonic()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header matches `etag` (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    HTTP middleware caching successful GET responses under `prefixes`.
+
+    An entry is reused while it is younger than `ttl` seconds and was built
+    from the current snapshot version. Concurrent misses for the same key
+    wait on one in-flight computation instead of each running the endpoint;
+    a waiter that gets no entry within `wait_timeout` seconds (or at all,
+    when the computation fails or is cancelled) runs the endpoint itself.
+    """
+
+    def __init__(self, prefixes: Sequence[str], ttl: float,
+                 version_source: Callable[[], int], max_entries: int = 256,
+                 wait_timeout: float = 30.0):
+        self.prefixes = tuple(prefixes)
+        self.ttl = ttl
+        self.version_source = version_source
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    def _fresh(self, entry: Optional[CachedResponse], version: int) -> bool:
+        return (entry is not None and entry.version == version
+                and time.monotonic() - entry.created_at < self.ttl)
+
+    def _respond(self, request: Request, entry: CachedResponse) -> Response:
+        headers = dict(entry.headers)
+        headers['ETag'] = entry.etag
+        headers['Cache-Control'] = 'no-cache'
+        if etag_matches(request.headers.get('if-none-match'), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, status_code=entry.status_code,
+                        headers=headers, media_type=entry.media_type)
+
+    async def _compute(self, request: Request, call_next, version: int) -> CachedResponse:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS}
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        return CachedResponse(body, response.status_code, headers, response.media_type,
+                              f'"{version:x}-{digest}"', version)
+
+    async def __call__(self, request: Request, call_next):
+        if request.method != "GET" or not request.url.path.startswith(self.prefixes):
+            return await call_next(request)
+
+        try:
+            version = self.version_source()
+        except Exception as e:
+            logger.warning(f"Response cache bypassed, snapshot version unavailable: {e}")
+            RESPONSE_CACHE_REQUESTS.inc("bypass")
+            return await call_next(request)
+
+        key = (request.url.path, str(request.url.query))
+        entry = self._entries.get(key)
+        if self._fresh(entry, version):
+            self._entries.move_to_end(key)
+            RESPONSE_CACHE_REQUESTS.inc("hit")
+            return self._respond(request, entry)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            RESPONSE_CACHE_REQUESTS.inc("coalesced")
+            try:
+                entry = await asyncio.wait_for(asyncio.shield(pending), self.wait_timeout)
+            except Exception:  # leader failed or cancelled, or the wait timed out
+                entry = None
+            if entry is not None:
+                return self._respond(request, entry)
+            return await call_next(request)
+
+        RESPONSE_CACHE_REQUESTS.inc("miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            entry = await self._compute(request, call_next, version)
+        finally:
+            self._inflight.pop(key, None)
+            # Always resolve, also on cancellation, so waiters never hang;
+            # errors and non-200 responses resolve to None and waiters recompute
+            if not future.done():
+                future.set_result(entry if entry is not None and entry.status_code == 200 else None)
+
+        if entry.status_code == 200:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return self._respond(request, entry)
+
+        # Errors are passed through uncached
+        return Response(content=entry.body, status_code=entry.status_code,
+                        headers=entry.headers, media_type=entry.media_type)
@@ -0,0 +1,33 @@
+"""
+Collector proxy for API worker processes
+With NEXUS_ROLE=api, requests for collector-owned state are forwarded to the
+collector process over its Unix socket; liveness, the update stream and the
+frontend are served by the worker itself
+"""
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+import httpx
+import logging
+
+from services.collector import get_collector_client
+
+logger = logging.getLogger(__name__)
+
+# Served by every worker: liveness, the relayed update stream and the API root
+LOCAL_PATHS = ("/api/health/live", "/api/health/", "/api/stream/", "/api")
+PROXIED_PREFIXES = ("/api/", "/metrics")
+
+
+async def proxy_to_collector(request: Request, call_next):
+    """HTTP middleware: forwards collector-owned paths; 503 while the collector is unreachable"""
+    path = request.url.path
+    if path in LOCAL_PATHS or not path.startswith(PROXIED_PREFIXES):
+        return await call_next(request)
+    try:
+        status, headers, body = await get_collector_client().request(
+            request.method, path, request.url.query, request.headers.items(), await request.body())
+    except httpx.TransportError as e:
+        logger.error(f"Collector unavailable for {request.method} {path}: {e}")
+        return JSONResponse(status_code=503, content={"detail": "Collector unavailable"})
+    return Response(content=body, status_code=status, headers=headers)
@@ -1,24 +1,23 @@
 """
 Health check API endpoints
+Liveness touches no dependencies; readiness and the Consul and cluster checks
+read the status cached by the background health loop
 """
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 import logging
 from datetime import datetime
 
-from services import ConsulService
+from services import HealthMonitor, get_health_monitor
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 logger = logging.getLogger(__name__)
 
 
-def get_consul_service():
-    return ConsulService()
-
-
 @router.get("/")
 async def health_check():
-    """Basic health check endpoint"""
+    """Basic health check endpoint (same as /live)"""
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -26,48 +25,30 @@ async def health_check():
     }
 
 
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is serving requests (no dependency checks)"""
+    return await health_check()
+
+
+@router.get("/ready")
+async def readiness(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """
+    Readiness probe: 200 while the background health check is fresh and a
+    cluster snapshot exists, 503 otherwise (including before the first check)
+    """
+    result = monitor.readiness()
+    result["timestamp"] = datetime.utcnow().isoformat()
+    return JSONResponse(status_code=200 if result["status"] == "ready" else 503, content=result)
+
+
 @router.get("/consul")
-async def consul_health(consul: ConsulService = Depends(get_consul_service)):
-    """Check Consul connectivity"""
-    try:
-        leader = consul.get_leader()
-        peers = consul.get_peers()
-        
-        return {
-            "status": "healthy" if leader else "unhealthy",
-            "leader": leader,
-            "peers_count": len(peers),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Consul health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+async def consul_health(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """Consul connectivity as of the last background check"""
+    return dict(monitor.consul_status(), timestamp=datetime.utcnow().isoformat())
 
 
 @router.get("/cluster")
-async def cluster_health(consul: ConsulService = Depends(get_consul_service)):
-    """Check overall cluster health"""
-    try:
-        nodes = consul.get_all_nodes()
-        services = consul.get_all_services()
-        
-        healthy_nodes = sum(1 for node in nodes if consul.is_node_healthy(node['Node']))
-        
-        return {
-            "status": "healthy" if healthy_nodes > 0 else "unhealthy",
-            "total_nodes": len(nodes),
-            "healthy_nodes": healthy_nodes,
-            "total_services": len(services),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-    except Exception as e:
-        logger.error(f"Cluster health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+async def cluster_health(monitor: HealthMonitor = Depends(get_health_monitor)):
+    """Overall cluster health as of the last background check"""
+    return dict(monitor.cluster_status(), timestamp=datetime.utcnow().isoformat())
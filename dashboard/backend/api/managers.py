@@ -6,65 +6,26 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 import logging
 
-from models import Manager, ManagerStatus
-from services import ConsulService, MetricsService
+from models import Manager
+from services import ClusterState, ClusterAggregates, get_cluster_state, get_cluster_aggregates
+from .nodes import NodeMetrics, build_manager
+from .responses import fast_json
 
 router = APIRouter(prefix="/api/managers", tags=["managers"])
 logger = logging.getLogger(__name__)
 
-# Dependency injection
-def get_consul_service():
-    return ConsulService()
-
-def get_metrics_service():
-    return MetricsService()
-
-
 @router.get("/", response_model=List[Manager])
 async def list_managers(
-    consul: ConsulService = Depends(get_consul_service),
-    metrics: MetricsService = Depends(get_metrics_service)
+    cluster: ClusterState = Depends(get_cluster_state),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates)
 ):
     """List all manager nodes"""
     try:
-        nodes = consul.get_all_nodes()
-        leader = consul.get_leader()
-        
-        managers = []
-        for node in nodes:
-            # Determine if this node is a manager (has consul server role)
-            node_services = consul.get_node_services(node['Node'])
-            is_manager = any(s.get('Service') == 'consul' for s in node_services)
-            
-            if is_manager:
-                # Collect metrics
-                system_metrics = metrics.collect_system_metrics()
-                
-                # Determine role
-                node_address = f"{node['Address']}:8300"
-                role = "primary" if leader and node_address in leader else "secondary"
-                
-                # Get worker count (simplified - would query actual data)
-                all_nodes = consul.get_all_nodes()
-                worker_count = len([n for n in all_nodes if n['Node'] != node['Node']])
-                
-                manager = Manager(
-                    id=f"mgr-{node['Node']}",
-                    hostname=node['Node'],
-                    ip_address=node['Address'],
-                    role=role,
-                    status=ManagerStatus.HEALTHY if consul.is_node_healthy(node['Node']) else ManagerStatus.FAILED,
-                    cpu_usage=system_metrics.get('cpu_usage', 0),
-                    memory_usage=system_metrics.get('memory_usage', 0),
-                    disk_usage=system_metrics.get('disk_usage', 0),
-                    uptime_seconds=metrics.get_uptime(),
-                    consul_leader=(role == "primary"),
-                    managed_workers=worker_count,
-                    healthy_workers=worker_count  # Simplified
-                )
-                managers.append(manager)
-        
-        return managers
+        snapshot = cluster.snapshot()
+        node_metrics = NodeMetrics(aggregates)
+        managers = [build_manager(mid, snapshot.managers[mid], snapshot, node_metrics)
+                    for mid in sorted(snapshot.managers)]
+        return fast_json(managers)
     except Exception as e:
         logger.error(f"Failed to list managers: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -73,40 +34,16 @@ async def list_managers(
 @router.get("/{manager_id}", response_model=Manager)
 async def get_manager(
     manager_id: str,
-    consul: ConsulService = Depends(get_consul_service),
-    metrics: MetricsService = Depends(get_metrics_service)
+    cluster: ClusterState = Depends(get_cluster_state),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates)
 ):
-    """Get specific manager details"""
+    """Get specific manager details (indexed snapshot lookup)"""
     try:
-        # Extract node name from manager_id
-        node_name = manager_id.replace("mgr-", "")
-        
-        nodes = consul.get_all_nodes()
-        node = next((n for n in nodes if n['Node'] == node_name), None)
-        
-        if not node:
+        snapshot = cluster.snapshot()
+        entry = snapshot.managers.get(manager_id)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Manager not found")
-        
-        # Get detailed metrics
-        system_metrics = metrics.collect_system_metrics()
-        leader = consul.get_leader()
-        node_address = f"{node['Address']}:8300"
-        role = "primary" if leader and node_address in leader else "secondary"
-        
-        manager = Manager(
-            id=manager_id,
-            hostname=node['Node'],
-            ip_address=node['Address'],
-            role=role,
-            status=ManagerStatus.HEALTHY,
-            cpu_usage=system_metrics.get('cpu_usage', 0),
-            memory_usage=system_metrics.get('memory_usage', 0),
-            disk_usage=system_metrics.get('disk_usage', 0),
-            uptime_seconds=metrics.get_uptime(),
-            consul_leader=(role == "primary")
-        )
-        
-        return manager
+        return build_manager(manager_id, entry, snapshot, NodeMetrics(aggregates))
     except HTTPException:
         raise
     except Exception as e:
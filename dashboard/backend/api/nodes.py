@@ -0,0 +1,172 @@
+"""
+Batched node detail endpoints
+Worker and manager models are built from the indexed cluster snapshot
+(keyed by ID) and each node's reported metrics, so a lookup is O(1)
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Callable, Dict, List, Optional
+import logging
+
+from models import (
+    Manager, ManagerStatus, NodeDetails, NodeRecord, ServiceInfo, ServiceRecord, Worker, WorkerPool, WorkerStatus
+)
+from services import (
+    ClusterAggregates, ClusterSnapshot, ClusterState, AlertEngine, ServiceMetricsStore,
+    get_cluster_state, get_cluster_aggregates, get_alert_engine, get_service_metrics
+)
+from .responses import fast_json
+
+router = APIRouter(prefix="/api/nodes", tags=["nodes"])
+logger = logging.getLogger(__name__)
+
+MAX_IDS = 1000
+
+MANAGER_STATUS = {
+    WorkerStatus.HEALTHY: ManagerStatus.HEALTHY,
+    WorkerStatus.DEGRADED: ManagerStatus.DEGRADED,
+    WorkerStatus.FAILED: ManagerStatus.FAILED,
+}
+
+
+# Metrics of a node without a fresh report: unknown, never another host's values
+UNREPORTED = dict.fromkeys(('cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out',
+                            'uptime_seconds', 'last_heartbeat'))
+
+
+class NodeMetrics:
+    """
+    Per-request metrics lookup: a node's latest report from the aggregates,
+    or null metrics for nodes that have not reported; service status,
+    restarts and uptime come from the node's supervisor samples when it
+    sends them
+    """
+
+    def __init__(self, aggregates: ClusterAggregates,
+                 service_metrics: Optional[ServiceMetricsStore] = None):
+        self.aggregates = aggregates
+        self.service_metrics = service_metrics
+
+    def __call__(self, node: str) -> Dict:
+        return self.aggregates.node_metrics(node) or UNREPORTED
+
+    def services(self, entry: NodeRecord) -> List[ServiceRecord]:
+        live = self.service_metrics.node_services(entry.node) if self.service_metrics else None
+        if not live:
+            return list(entry.services)
+        return [
+            ServiceRecord(s.name, s.port, *merge_status(s.status, live[s.name]), s.tags) if s.name in live else s
+            for s in entry.services
+        ]
+
+
+def merge_status(check_status: str, live):
+    """Supervisor (status, restarts, uptime), keeping a failing Consul check over a live 'running'"""
+    status, restarts, uptime = live
+    if status == 'running' and check_status != 'running':
+        status = check_status
+    return status, restarts, uptime
+
+
+# Worker fields derived from the snapshot entry; `m` is the NodeMetrics lookup.
+# Values are already in the API shape: `fields=` projections serialize them as is
+WORKER_FIELDS: Dict[str, Callable[[str, NodeRecord, NodeMetrics], object]] = {
+    'id': lambda wid, e, m: wid,
+    'hostname': lambda wid, e, m: e.node,
+    'ip_address': lambda wid, e, m: e.address,
+    'pool': lambda wid, e, m: e.pool,
+    'status': lambda wid, e, m: e.status,
+    'health_reasons': lambda wid, e, m: list(e.health_reasons),
+    'cpu_usage': lambda wid, e, m: m(e.node)['cpu_usage'],
+    'memory_usage': lambda wid, e, m: m(e.node)['memory_usage'],
+    'disk_usage': lambda wid, e, m: m(e.node)['disk_usage'],
+    'network_in': lambda wid, e, m: m(e.node)['network_in'],
+    'network_out': lambda wid, e, m: m(e.node)['network_out'],
+    'uptime_seconds': lambda wid, e, m: m(e.node)['uptime_seconds'],
+    'last_heartbeat': lambda wid, e, m: m(e.node)['last_heartbeat'],
+    'services': lambda wid, e, m: [ServiceInfo.model_validate(s) for s in m.services(e)],
+    'total_services': lambda wid, e, m: len(e.services),
+    'healthy_services': lambda wid, e, m: sum(1 for s in m.services(e) if s.status == 'running'),
+}
+
+
+def build_worker(worker_id: str, entry: NodeRecord, metrics: NodeMetrics) -> Worker:
+    return Worker(**{f: get(worker_id, entry, metrics) for f, get in WORKER_FIELDS.items()})
+
+
+def build_manager(manager_id: str, entry: NodeRecord, snapshot: ClusterSnapshot,
+                  metrics: NodeMetrics) -> Manager:
+    m = metrics(entry.node)
+    role = "primary" if snapshot.leader and f"{entry.address}:8300" in snapshot.leader else "secondary"
+    return Manager(
+        id=manager_id,
+        hostname=entry.node,
+        ip_address=entry.address,
+        role=role,
+        status=MANAGER_STATUS.get(entry.status, ManagerStatus.UNKNOWN),
+        health_reasons=list(entry.health_reasons),
+        cpu_usage=m['cpu_usage'],
+        memory_usage=m['memory_usage'],
+        disk_usage=m['disk_usage'],
+        network_in=m['network_in'],
+        network_out=m['network_out'],
+        uptime_seconds=m['uptime_seconds'],
+        last_heartbeat=m['last_heartbeat'],
+        consul_leader=(role == "primary"),
+        managed_workers=len(snapshot.workers),
+        healthy_workers=len(snapshot.workers_by_status.get(WorkerStatus.HEALTHY, ())),
+        total_services=len(entry.services),
+        running_services=sum(1 for s in metrics.services(entry) if s.status == 'running')
+    )
+
+
+@router.get("/", response_model=NodeDetails)
+async def get_node_details(
+    ids: Optional[str] = Query(None, description="Comma-separated worker/manager IDs (wkr-<node>, mgr-<node>)"),
+    pool: Optional[WorkerPool] = Query(None, description="Only workers in this pool"),
+    include_overview: bool = Query(False, description="Add the cluster overview to the response"),
+    cluster: ClusterState = Depends(get_cluster_state),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    alerts: AlertEngine = Depends(get_alert_engine),
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics)
+):
+    """
+    Details for many nodes in one call.
+
+    With `ids`, returns those workers and managers (unknown IDs are listed in
+    `missing`); with `pool`, workers are limited to that pool; with neither,
+    every manager and worker. `include_overview=true` adds the overview so a
+    dashboard page renders from a single request.
+    """
+    requested = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip())) if ids else None
+    if requested is not None and len(requested) > MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_IDS} IDs per request")
+
+    try:
+        snapshot = cluster.snapshot()
+        node_metrics = NodeMetrics(aggregates, service_metrics)
+        details = NodeDetails()
+
+        if requested is None:
+            worker_ids = snapshot.select_workers(pool=pool)
+            manager_ids = [] if pool is not None else sorted(snapshot.managers)
+        else:
+            worker_ids, manager_ids = [], []
+            for node_id in requested:
+                if node_id in snapshot.workers:
+                    if pool is None or snapshot.workers[node_id].pool == pool:
+                        worker_ids.append(node_id)
+                elif node_id in snapshot.managers:
+                    manager_ids.append(node_id)
+                else:
+                    details.missing.append(node_id)
+
+        details.managers = [build_manager(mid, snapshot.managers[mid], snapshot, node_metrics)
+                            for mid in manager_ids]
+        details.workers = [build_worker(wid, snapshot.workers[wid], node_metrics) for wid in worker_ids]
+        if include_overview:
+            details.overview = aggregates.system_metrics(alerts_count=alerts.active_count())
+        return fast_json(details)
+    except Exception as e:
+        logger.error(f"Failed to get node details: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
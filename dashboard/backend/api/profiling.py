@@ -0,0 +1,65 @@
+"""
+Request profiling API endpoints
+The middleware sampling requests (when NEXUS_PROFILING_ENABLED is set) and the
+admin endpoints listing and downloading the kept profiles
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import FileResponse
+from typing import List
+import asyncio
+import logging
+
+from models import ProfileInfo
+from services import RequestProfiler, get_profiler
+
+router = APIRouter(prefix="/api/admin/profiles", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-nexus-profile"
+
+
+async def profile_requests(request: Request, call_next):
+    """
+    HTTP middleware: samples every request and keeps the profile when it was
+    slow or asked for with `X-Nexus-Profile: 1`. Kept profiles are named in
+    the `X-Nexus-Profile-Id` response header.
+    """
+    profiler = get_profiler()
+    key = profiler.begin(forced=request.headers.get(PROFILE_HEADER) == "1")
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        capture = profiler.end(key)
+        if capture is not None:
+            try:
+                profile_id = await asyncio.to_thread(
+                    profiler.save, capture, request.method, request.url.path, status)
+                logger.info(f"Profiled {request.method} {request.url.path} "
+                            f"({capture.duration:.2f}s): {profile_id}")
+            except OSError as e:
+                logger.error(f"Failed to save request profile: {e}")
+                profile_id = None
+    if capture is not None and profile_id:
+        response.headers["X-Nexus-Profile-Id"] = profile_id
+    return response
+
+
+@router.get("/", response_model=List[ProfileInfo])
+async def list_profiles(profiler: RequestProfiler = Depends(get_profiler)):
+    """Kept request profiles, newest first"""
+    return await asyncio.to_thread(profiler.store.list)
+
+
+@router.get("/{profile_id}", response_class=FileResponse)
+async def download_profile(profile_id: str, profiler: RequestProfiler = Depends(get_profiler)):
+    """
+    A profile as collapsed stacks (`frame;frame;frame count` per line), for
+    flamegraph.pl, inferno-flamegraph or speedscope
+    """
+    path = profiler.store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(str(path), media_type="text/plain", filename=f"{profile_id}.folded")
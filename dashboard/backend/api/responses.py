@@ -0,0 +1,68 @@
+"""
+Fast JSON serialization for large API responses
+Uses orjson when installed (native datetime, enum and dataclass support) and
+falls back to the standard library otherwise
+"""
+
+import dataclasses
+import json
+import time
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from config import settings
+from services.telemetry import JSON_RENDER_SECONDS
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types neither serializer handles natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if orjson is None:
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, Enum):
+            return obj.value
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializes API content (models, dataclasses, datetimes, enums) to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendering models directly, without jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        start = time.perf_counter()
+        body = dumps(content)
+        JSON_RENDER_SECONDS.observe(time.perf_counter() - start)
+        return body
+
+
+def fast_json(content: Any, **kwargs) -> Any:
+    """
+    Returns content as a FastJSONResponse when NEXUS_FAST_JSON_ENABLED is set,
+    which skips FastAPI's response_model re-validation and serialization.
+    Otherwise returns content unchanged for the default path.
+    """
+    if settings.fast_json_enabled:
+        return FastJSONResponse(content, **kwargs)
+    return content
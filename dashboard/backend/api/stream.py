@@ -0,0 +1,114 @@
+"""
+Server-Sent Events endpoint
+Lighter alternative to /ws/realtime for clients behind proxies, fed by the
+same update stream
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, Set
+import logging
+import time
+
+from config import settings
+from models import WorkerPool
+from services.updates import SCOPED_TOPICS, STATIC_TOPICS, UpdateStream, get_update_stream, topic_matches
+from services.telemetry import STREAM_CLIENTS, STREAM_DELIVERIES
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+logger = logging.getLogger(__name__)
+
+RETRY_MS = 3000
+_POOLS = {p.value for p in WorkerPool}
+
+
+def parse_topics(topics: str) -> Set[str]:
+    """'overview,pool:web,node:node-1' -> validated topic set"""
+    parsed = {t.strip() for t in topics.split(",") if t.strip()}
+    for topic in parsed:
+        scope, sep, name = topic.partition(":")
+        if topic in STATIC_TOPICS:
+            continue
+        if sep and scope in SCOPED_TOPICS and name and (scope != "pool" or name == "*" or name in _POOLS):
+            continue
+        raise HTTPException(status_code=400, detail=f"Unknown topic: {topic}")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No topics given")
+    return parsed
+
+
+def parse_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+@router.get("/")
+async def stream_updates(
+    request: Request,
+    topics: str = Query("overview,metrics,alerts",
+                        description="Comma-separated topics: overview, metrics, alerts, "
+                                    "pool:<pool>, node:<node> (pool:* and node:* for all)"),
+    last_event_id: Optional[str] = Header(None, description="Resume after this event ID (sent by EventSource on reconnect)"),
+    stream: UpdateStream = Depends(get_update_stream)
+):
+    """
+    Stream updates as text/event-stream.
+
+    A new connection first receives the latest event of each subscribed
+    topic. A reconnect with Last-Event-ID replays what it missed from the
+    bounded replay buffer; if that is gone, a `reset` event is sent followed
+    by the latest state.
+    """
+    wanted = parse_topics(topics)
+    resume_from = parse_event_id(last_event_id)
+
+    async def frames():
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        backlog = stream.since(resume_from) if resume_from is not None else None
+        if backlog is None:
+            if resume_from is not None:
+                yield b"event: reset\ndata: {}\n\n"
+            backlog = stream.latest(wanted)
+        cursor = stream.last_id
+        for event in backlog:
+            if topic_matches(event.topic, wanted):
+                yield event.frame
+
+        # Other topics' events wake the loop too, so the keep-alive is timed
+        # from the last frame this client was actually sent
+        interval = settings.stream_keepalive_interval
+        last_sent = time.monotonic()
+        while True:
+            await stream.wait(cursor, timeout=max(0.0, last_sent + interval - time.monotonic()))
+            if await request.is_disconnected():
+                break
+            pending = stream.since(cursor)
+            if pending is None:
+                # Fell behind the replay buffer: start over from the latest state
+                yield b"event: reset\ndata: {}\n\n"
+                last_sent = time.monotonic()
+                pending = stream.latest(wanted)
+            cursor = stream.last_id
+            for event in pending:
+                if topic_matches(event.topic, wanted):
+                    yield event.frame
+                    last_sent = time.monotonic()
+            if time.monotonic() - last_sent >= interval:
+                yield b": keep-alive\n\n"
+                last_sent = time.monotonic()
+
+    async def events():
+        STREAM_CLIENTS.inc("sse")
+        try:
+            async for frame in frames():
+                yield frame
+                STREAM_DELIVERIES.inc("sse")
+        finally:
+            STREAM_CLIENTS.dec("sse")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+    })
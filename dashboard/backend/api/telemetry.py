@@ -0,0 +1,39 @@
+"""
+Self-instrumentation endpoint
+Serves the backend's own counters and histograms in the Prometheus text
+format, and the HTTP middleware timing every router
+"""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+import time
+
+from services.telemetry import REGISTRY, HTTP_REQUESTS, HTTP_REQUEST_SECONDS
+
+router = APIRouter(tags=["telemetry"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape target"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+async def instrument_requests(request: Request, call_next):
+    """
+    HTTP middleware recording handling time and status per route template
+    (`/api/workers/{worker_id}`, not the raw path, so series stay bounded)
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        template = getattr(route, "path", None) or "unmatched"
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, template, request.method)
+        HTTP_REQUESTS.inc(template, request.method, str(status))
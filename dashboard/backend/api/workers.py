@@ -2,94 +2,102 @@
 Worker API endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from typing import List, Optional
+import base64
 import logging
 
-from models import Worker, WorkerStatus, WorkerPool, ServiceInfo
-from services import ConsulService, MetricsService
+from config import settings
+from models import Worker, WorkerStatus, WorkerPool
+from services import (
+    ClusterState, ClusterAggregates, ServiceMetricsStore,
+    get_cluster_state, get_cluster_aggregates, get_service_metrics
+)
+from .nodes import WORKER_FIELDS, NodeMetrics, build_worker
+from .responses import FastJSONResponse, fast_json
 
 router = APIRouter(prefix="/api/workers", tags=["workers"])
 logger = logging.getLogger(__name__)
 
 
-def get_consul_service():
-    return ConsulService()
+def encode_cursor(worker_id: str) -> str:
+    return base64.urlsafe_b64encode(worker_id.encode()).decode().rstrip("=")
 
-def get_metrics_service():
-    return MetricsService()
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in Worker.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names
 
 
 @router.get("/", response_model=List[Worker])
 async def list_workers(
+    response: Response,
     pool: Optional[WorkerPool] = Query(None, description="Filter by worker pool"),
     status: Optional[WorkerStatus] = Query(None, description="Filter by status"),
-    consul: ConsulService = Depends(get_consul_service),
-    metrics: MetricsService = Depends(get_metrics_service)
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to return every worker"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,pool"),
+    cluster: ClusterState = Depends(get_cluster_state),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics)
 ):
-    """List all worker nodes with optional filters"""
+    """
+    List worker nodes with optional filters.
+
+    Filters are evaluated against the snapshot indexes before any model is
+    built. With `limit`, results come in worker-ID order and the next page's
+    cursor is returned in the X-Next-Cursor header. With `fields`, only those
+    fields are serialized (no Worker models are built).
+    """
+    projection = parse_fields(fields)
+    after = decode_cursor(cursor) if cursor else None
     try:
-        nodes = consul.get_all_nodes()
-        workers = []
-        
-        for node in nodes:
-            # Get services running on this node
-            node_services = consul.get_node_services(node['Node'])
-            
-            # Check if this is a worker (has nexus-worker service)
-            is_worker = any('worker' in s.get('Service', '').lower() for s in node_services)
-            
-            if is_worker:
-                # Collect metrics
-                system_metrics = metrics.collect_system_metrics()
-                
-                # Parse services
-                services = []
-                for svc in node_services:
-                    if svc.get('Service') != 'consul':
-                        services.append(ServiceInfo(
-                            name=svc.get('Service', 'unknown'),
-                            status='running',
-                            port=svc.get('Port', 0),
-                            restarts=0,
-                            uptime_seconds=0
-                        ))
-                
-                # Determine worker pool from tags or default
-                worker_pool = WorkerPool.WORKER
-                for svc in node_services:
-                    tags = svc.get('Tags', [])
-                    if 'web' in tags:
-                        worker_pool = WorkerPool.WEB
-                    elif 'api' in tags:
-                        worker_pool = WorkerPool.API
-                    elif 'database' in tags:
-                        worker_pool = WorkerPool.DATABASE
-                
-                worker = Worker(
-                    id=f"wkr-{node['Node']}",
-                    hostname=node['Node'],
-                    ip_address=node['Address'],
-                    pool=worker_pool,
-                    status=WorkerStatus.HEALTHY if consul.is_node_healthy(node['Node']) else WorkerStatus.FAILED,
-                    cpu_usage=system_metrics.get('cpu_usage', 0),
-                    memory_usage=system_metrics.get('memory_usage', 0),
-                    disk_usage=system_metrics.get('disk_usage', 0),
-                    uptime_seconds=metrics.get_uptime(),
-                    services=services,
-                    total_services=len(services),
-                    healthy_services=len([s for s in services if s.status == 'running'])
-                )
-                
-                # Apply filters
-                if pool and worker.pool != pool:
-                    continue
-                if status and worker.status != status:
-                    continue
-                
-                workers.append(worker)
-        
-        return workers
+        snapshot = cluster.snapshot()
+        ids = snapshot.select_workers(pool=pool, status=status, after=after,
+                                      limit=limit + 1 if limit else None)
+        next_cursor = None
+        if limit and len(ids) > limit:
+            ids = ids[:limit]
+            next_cursor = encode_cursor(ids[-1])
+
+        # Reported metrics per node (null for nodes that have not reported)
+        node_metrics = NodeMetrics(aggregates, service_metrics)
+
+        if projection is not None:
+            defaults = {f: Worker.model_fields[f].get_default(call_default_factory=True)
+                        for f in projection if f not in WORKER_FIELDS}
+            rows = []
+            for wid in ids:
+                entry = snapshot.workers[wid]
+                rows.append({
+                    f: WORKER_FIELDS[f](wid, entry, node_metrics) if f in WORKER_FIELDS else defaults[f]
+                    for f in projection
+                })
+            headers = {'X-Next-Cursor': next_cursor} if next_cursor else None
+            if settings.fast_json_enabled:
+                return FastJSONResponse(rows, headers=headers)
+            return JSONResponse(content=jsonable_encoder(rows), headers=headers)
+
+        workers = [build_worker(wid, snapshot.workers[wid], node_metrics) for wid in ids]
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return fast_json(workers, headers={'X-Next-Cursor': next_cursor} if next_cursor else None)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list workers: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -98,50 +106,16 @@ async def list_workers(
 @router.get("/{worker_id}", response_model=Worker)
 async def get_worker(
     worker_id: str,
-    consul: ConsulService = Depends(get_consul_service),
-    metrics: MetricsService = Depends(get_metrics_service)
+    cluster: ClusterState = Depends(get_cluster_state),
+    aggregates: ClusterAggregates = Depends(get_cluster_aggregates),
+    service_metrics: ServiceMetricsStore = Depends(get_service_metrics)
 ):
-    """Get specific worker details"""
+    """Get specific worker details (indexed snapshot lookup)"""
     try:
-        node_name = worker_id.replace("wkr-", "")
-        
-        nodes = consul.get_all_nodes()
-        node = next((n for n in nodes if n['Node'] == node_name), None)
-        
-        if not node:
+        entry = cluster.snapshot().workers.get(worker_id)
+        if entry is None:
             raise HTTPException(status_code=404, detail="Worker not found")
-        
-        # Get detailed metrics and services
-        system_metrics = metrics.collect_system_metrics()
-        node_services = consul.get_node_services(node['Node'])
-        
-        services = []
-        for svc in node_services:
-            if svc.get('Service') != 'consul':
-                services.append(ServiceInfo(
-                    name=svc.get('Service', 'unknown'),
-                    status='running',
-                    port=svc.get('Port', 0),
-                    restarts=0,
-                    uptime_seconds=0
-                ))
-        
-        worker = Worker(
-            id=worker_id,
-            hostname=node['Node'],
-            ip_address=node['Address'],
-            pool=WorkerPool.WORKER,
-            status=WorkerStatus.HEALTHY,
-            cpu_usage=system_metrics.get('cpu_usage', 0),
-            memory_usage=system_metrics.get('memory_usage', 0),
-            disk_usage=system_metrics.get('disk_usage', 0),
-            uptime_seconds=metrics.get_uptime(),
-            services=services,
-            total_services=len(services),
-            healthy_services=len(services)
-        )
-        
-        return worker
+        return build_worker(worker_id, entry, NodeMetrics(aggregates, service_metrics))
     except HTTPException:
         raise
     except Exception as e:
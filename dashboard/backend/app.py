@@ -5,14 +5,12 @@ Main application entry point
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 import logging
 import asyncio
 import json
 import sys
-from pathlib import Path
 from typing import List
 from datetime import datetime
 
@@ -24,8 +22,17 @@ except ImportError as e:
     print("Ensure config.py exists and all dependencies are installed")
     sys.exit(1)
 
-from api import managers_router, workers_router, analytics_router, health_router
-from services import ConsulService, MetricsService
+from api import (
+    managers_router, workers_router, analytics_router, health_router, alerts_router, nodes_router, stream_router,
+    telemetry_router, instrument_requests, profiling_router, profile_requests, ResponseCache, proxy_to_collector,
+    assets_router, get_asset_bundle
+)
+from api.responses import dumps
+from services import (
+    MetricsService, get_cluster_state, get_cluster_aggregates, get_alert_engine, get_update_stream,
+    get_health_monitor, get_collector_client, get_snapshot_version, collector_directory
+)
+from services.telemetry import STREAM_CLIENTS, STREAM_DELIVERIES, WEBSOCKET_SEND_SECONDS
 
 # Configure logging from settings
 logging.basicConfig(
@@ -55,6 +62,28 @@ app = FastAPI(
     debug=settings.debug
 )
 
+# API workers forward collector-owned paths (innermost, so the response cache still serves hits locally)
+if settings.role == "api":
+    app.middleware("http")(proxy_to_collector)
+
+# Router timings for /metrics (registered before the cache so it times only requests reaching the routers)
+if settings.telemetry_enabled:
+    app.middleware("http")(instrument_requests)
+
+# Response cache for polled read-only endpoints (registered before CORS so CORS wraps it)
+if settings.response_cache_enabled:
+    response_cache = ResponseCache(
+        prefixes=settings.response_cache_prefixes,
+        ttl=settings.response_cache_ttl,
+        version_source=(get_snapshot_version().get if settings.role == "api"
+                        else lambda: get_cluster_state().snapshot().version)
+    )
+    app.middleware("http")(response_cache)
+
+# Opt-in request profiling (outside the cache, so a profile covers the whole request)
+if settings.profiling_enabled:
+    app.middleware("http")(profile_requests)
+
 # CORS middleware from settings
 app.add_middleware(
     CORSMiddleware,
@@ -88,20 +117,35 @@ app.include_router(managers_router)
 app.include_router(workers_router)
 app.include_router(analytics_router)
 app.include_router(health_router)
+app.include_router(alerts_router)
+app.include_router(nodes_router)
+app.include_router(stream_router)
+if settings.telemetry_enabled:
+    app.include_router(telemetry_router)
+if settings.profiling_enabled:
+    app.include_router(profiling_router)
+
+# Frontend: minified, fingerprinted and precompressed once, then served from memory
+try:
+    get_asset_bundle()
+except Exception as e:
+    logger.error(f"Failed to build frontend assets: {e}")
+app.include_router(assets_router)
+
+async def send_text(websocket: WebSocket, text: str):
+    """send_text, timed for /metrics"""
+    with WEBSOCKET_SEND_SECONDS.time():
+        await websocket.send_text(text)
+    STREAM_DELIVERIES.inc("websocket")
+
+
+async def send_json(websocket: WebSocket, message: dict):
+    """send_json through the fast JSON path when enabled"""
+    if settings.fast_json_enabled:
+        await send_text(websocket, dumps(message).decode("utf-8"))
+    else:
+        await send_text(websocket, json.dumps(message, separators=(",", ":"), ensure_ascii=False))
 
-# Mount static files (frontend) with validation
-frontend_path = Path(settings.frontend_path)
-if not frontend_path.is_absolute():
-    # Make relative to backend working directory (systemd WorkingDirectory)
-    frontend_path = Path.cwd() / frontend_path
-if frontend_path.exists():
-    try:
-        app.mount("/static", StaticFiles(directory=str(frontend_path)), name="static")
-        logger.info(f"Static files mounted from: {frontend_path}")
-    except Exception as e:
-        logger.error(f"Failed to mount static files: {e}")
-else:
-    logger.warning(f"Frontend path not found: {frontend_path} - static files not available")
 
 # WebSocket connection manager
 class ConnectionManager:
@@ -111,29 +155,88 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        STREAM_CLIENTS.inc("websocket")
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+            STREAM_CLIENTS.dec("websocket")
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send to client: {e}")
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
-
 manager = ConnectionManager()
 
+# Update stream topics forwarded to /ws/realtime clients
+WEBSOCKET_TOPICS = ("metrics", "alerts")
+
+
+async def update_loop():
+    """
+    Single producer for /ws/realtime and /api/stream: collects local metrics
+    and the cluster overview once per interval, whatever the number of clients
+    """
+    stream = get_update_stream()
+    cluster = get_cluster_state()
+    aggregates = get_cluster_aggregates(cluster)
+    alerts = get_alert_engine(cluster)
+    metrics_service = MetricsService(history_size=settings.metrics_history_size)
+    while True:
+        try:
+            # Both block (cpu_percent sampling, Consul refresh), so keep them off the event loop
+            system_metrics = await asyncio.to_thread(metrics_service.collect_system_metrics)
+            overview = await asyncio.to_thread(aggregates.system_metrics, alerts.active_count())
+            stream.publish("metrics", {
+                "type": "metrics_update",
+                "timestamp": system_metrics['timestamp'].isoformat(),
+                "data": {
+                    "cpu_usage": system_metrics['cpu_usage'],
+                    "memory_usage": system_metrics['memory_usage'],
+                    "disk_usage": system_metrics['disk_usage'],
+                    "network_in": system_metrics['network_in'],
+                    "network_out": system_metrics['network_out'],
+                    "total_nodes": overview.total_managers + overview.total_workers,
+                    "total_services": overview.total_services
+                }
+            })
+            stream.publish("overview", overview.model_dump(mode="json", exclude={"timestamp"}),
+                           only_if_changed=True)
+            for pool, pool_metrics in overview.pools.items():
+                stream.publish(f"pool:{pool}", pool_metrics.model_dump(mode="json"), only_if_changed=True)
+        except Exception as e:
+            logger.error(f"Error in update loop: {e}")
+        await asyncio.sleep(settings.metrics_collection_interval)
+
+
+async def alert_loop():
+    """Fires overdue absence rules and publishes alert transitions to the update stream"""
+    stream = get_update_stream()
+    engine = get_alert_engine(get_cluster_state())
+    while True:
+        try:
+            engine.tick()
+            events = engine.drain_events()
+            if events:
+                stream.publish("alerts", {
+                    "type": "alerts_update",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "active_count": engine.active_count(),
+                    "events": [e.model_dump(mode="json") for e in events]
+                })
+        except Exception as e:
+            logger.error(f"Error in alert loop: {e}")
+        await asyncio.sleep(settings.alert_tick_interval)
+
+
+async def health_loop():
+    """Refreshes the cached dependency status read by the readiness and health endpoints"""
+    monitor = get_health_monitor(get_cluster_state())
+    while True:
+        try:
+            await asyncio.to_thread(monitor.refresh)
+        except Exception as e:
+            logger.error(f"Error in health loop: {e}")
+        await asyncio.sleep(settings.health_check_interval)
+
 
 @app.get("/api", tags=["Root"])
 async def api_root():
@@ -144,78 +247,41 @@ async def api_root():
         "docs": "/api/docs" if settings.debug else "API documentation disabled"
     }
 
-@app.get("/", response_class=FileResponse)
-async def serve_frontend():
-    """Serve the frontend dashboard HTML"""
-    frontend_dir = Path(settings.frontend_path)
-    if not frontend_dir.is_absolute():
-        # Make relative to backend working directory (systemd WorkingDirectory)
-        frontend_dir = Path.cwd() / frontend_dir
-    frontend_html = frontend_dir / "index.html"
-    if frontend_html.exists():
-        return FileResponse(str(frontend_html))
-    return JSONResponse(
-        status_code=404,
-        content={"error": "Frontend not found", "path": str(frontend_html)}
-    )
-
-
 @app.websocket("/ws/realtime")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time metrics"""
     await manager.connect(websocket)
+    stream = get_update_stream()
     
-    try:
-        consul = ConsulService(
-            host=settings.consul_host,
-            port=settings.consul_port
-        )
-        metrics_service = MetricsService(
-            history_size=settings.metrics_history_size
-        )
-    except Exception as e:
-        logger.error(f"Failed to initialize services for WebSocket: {e}")
-        await websocket.close(code=1011, reason="Service initialization failed")
-        return
+    if settings.alerting_enabled:
+        try:
+            # Current alert state first; later changes arrive as alerts_update messages
+            if settings.role == "api":
+                alerts = await get_collector_client().get_json("/api/alerts/")
+            else:
+                alerts = [a.model_dump(mode="json") for a in get_alert_engine(get_cluster_state()).active()]
+            await send_json(websocket, {
+                "type": "alerts_snapshot",
+                "timestamp": datetime.utcnow().isoformat(),
+                "alerts": alerts
+            })
+        except Exception as e:
+            logger.error(f"Failed to send alert snapshot: {e}")
     
     try:
+        # Forward the shared update stream; the latest metrics go out immediately
+        for event in stream.latest(("metrics",)):
+            await send_text(websocket, event.data)
+        cursor = stream.last_id
         while True:
-            try:
-                # Collect current metrics with error handling
-                system_metrics = metrics_service.collect_system_metrics()
-                if not system_metrics:
-                    logger.warning("Failed to collect system metrics, skipping update")
-                    await asyncio.sleep(settings.metrics_collection_interval)
-                    continue
-                
-                # Get cluster status with error handling
-                nodes = consul.get_all_nodes()
-                services = consul.get_all_services()
-                
-                # Prepare real-time update
-                update = {
-                    "type": "metrics_update",
-                    "timestamp": system_metrics.get('timestamp', datetime.utcnow()).isoformat() if hasattr(system_metrics.get('timestamp', datetime.utcnow()), 'isoformat') else str(system_metrics.get('timestamp', datetime.utcnow())),
-                    "data": {
-                        "cpu_usage": system_metrics.get('cpu_usage', 0),
-                        "memory_usage": system_metrics.get('memory_usage', 0),
-                        "disk_usage": system_metrics.get('disk_usage', 0),
-                        "network_in": system_metrics.get('network_in', 0),
-                        "network_out": system_metrics.get('network_out', 0),
-                        "total_nodes": len(nodes) if nodes else 0,
-                        "total_services": len(services) if services else 0
-                    }
-                }
-                
-                # Send to this client
-                await websocket.send_json(update)
-                
-            except Exception as e:
-                logger.error(f"Error in WebSocket update loop: {e}")
-                # Continue loop even if one update fails
-            
-            # Wait before next update
-            await asyncio.sleep(settings.metrics_collection_interval)
+            await stream.wait(cursor, timeout=settings.websocket_heartbeat_interval)
+            pending = stream.since(cursor)
+            if pending is None:  # fell behind the replay buffer
+                pending = stream.latest(("metrics",))
+            cursor = stream.last_id
+            for event in pending:
+                if event.topic in WEBSOCKET_TOPICS:
+                    await send_text(websocket, event.data)
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -236,9 +302,15 @@ async def startup_event():
         logger.info("API documentation available at /api/docs")
         logger.info("Dashboard available at /")
     
+    if settings.role == "api":
+        # State lives in the collector; this worker only relays its update stream
+        logger.info(f"API worker for the collector in {collector_directory()}")
+        app.state.relay_task = asyncio.create_task(get_collector_client().relay(get_update_stream()))
+        return
+    
     # Test Consul connectivity
     try:
-        consul = ConsulService(host=settings.consul_host, port=settings.consul_port)
+        consul = get_cluster_state().consul
         leader = consul.get_leader()
         if leader:
             logger.info(f"Consul connection successful, leader: {leader}")
@@ -247,12 +319,86 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to connect to Consul: {e}")
         logger.error("Dashboard will start but may not function correctly")
+    
+    if settings.role == "collector":
+        # API workers validate their response caches against this version
+        shared_version = get_snapshot_version()
+        get_cluster_state().subscribe(lambda snapshot: shared_version.set(snapshot.version))
+    
+    app.state.update_task = asyncio.create_task(update_loop())
+    app.state.health_task = asyncio.create_task(health_loop())
+    if settings.alerting_enabled:
+        app.state.alert_task = asyncio.create_task(alert_loop())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Application shutdown tasks"""
     logger.info("Shutting down Krutrim Nexus Ops Dashboard...")
+    for name in ("update_task", "health_task", "alert_task", "relay_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+
+
+def run_workers():
+    """
+    Multi-process mode: one collector process (this app with NEXUS_ROLE=collector
+    on a Unix socket) owns Consul, ingestion and the update stream, and
+    NEXUS_WORKERS API worker processes (NEXUS_ROLE=api) serve the public port
+    """
+    import os
+    import signal
+    import socket
+    import subprocess
+    import threading
+    import uvicorn
+    from services.collector import SOCKET_NAME
+    
+    # uvicorn's own worker socket is created without IPPROTO_TCP, so asyncio
+    # never sets TCP_NODELAY on accepted connections and each keep-alive
+    # response waits out a delayed ACK (~40 ms). Bind it here with
+    # TCP_NODELAY, which accepted connections inherit, and pass it as fd.
+    listener = socket.socket(socket.AF_INET6 if ":" in settings.host else socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    listener.bind((settings.host, settings.port))
+    
+    socket_path = collector_directory() / SOCKET_NAME
+    logger.info(f"Starting the collector on {socket_path}")
+    collector = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--uds", str(socket_path),
+         "--log-level", settings.log_level.lower()] + ([] if settings.debug else ["--no-access-log"]),
+        env=dict(os.environ, NEXUS_ROLE="collector")
+    )
+    stopping, collector_failed = threading.Event(), threading.Event()
+    
+    def watch_collector():
+        # Without the collector the workers can only answer 503; exit so the service manager restarts both
+        code = collector.wait()
+        if not stopping.is_set():
+            logger.error(f"Collector exited with status {code}; stopping the API workers")
+            collector_failed.set()
+            os.kill(os.getpid(), signal.SIGTERM)
+    
+    threading.Thread(target=watch_collector, name="collector-watch", daemon=True).start()
+    os.environ["NEXUS_ROLE"] = "api"  # inherited by the uvicorn worker processes
+    try:
+        logger.info(f"Starting {settings.workers} API workers on {settings.host}:{settings.port}")
+        uvicorn.run(
+            "app:app",
+            fd=listener.fileno(),
+            workers=settings.workers,
+            log_level=settings.log_level.lower(),
+            access_log=settings.debug
+        )
+    finally:
+        stopping.set()
+        listener.close()
+        collector.terminate()
+        collector.wait(timeout=10)
+    if collector_failed.is_set():
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -261,6 +407,10 @@ if __name__ == "__main__":
     # Add datetime import for websocket
     from datetime import datetime
     
+    if settings.workers > 1 and settings.role == "standalone":
+        run_workers()
+        sys.exit(0)
+    
     logger.info(f"Starting uvicorn server on {settings.host}:{settings.port}")
     uvicorn.run(
         app,
@@ -25,6 +25,12 @@ class Settings(BaseSettings):
     port: int = Field(default=9000, ge=1024, le=65535, description="Server port")
     public_url: Optional[str] = Field(default=None, description="Public URL (e.g., http://64.181.212.50:9000)")
     
+    # Process model: standalone (one process), or one collector plus API workers
+    role: str = Field(default="standalone", pattern="^(standalone|collector|api)$", description="standalone, collector (owns Consul and ingestion) or api (forwards to the collector)")
+    workers: int = Field(default=1, ge=1, le=64, description="API worker processes started by `python app.py`; above 1, a collector process is started as well")
+    collector_dir: str = Field(default="", description="Directory of the collector's Unix socket and the shared snapshot version; empty uses $XDG_RUNTIME_DIR/nexus-dashboard, else a per-user temp directory (created 0700, must be owned by this user)")
+    collector_timeout: float = Field(default=10.0, ge=1, le=300, description="Seconds an API worker waits for the collector")
+    
     # Consul
     consul_host: str = Field(default="localhost", description="Consul host")
     consul_port: int = Field(default=8500, ge=1, le=65535, description="Consul port")
@@ -33,11 +39,47 @@ class Settings(BaseSettings):
     consul_token: Optional[str] = Field(default=None, description="Consul ACL token")
     consul_datacenter: str = Field(default="krutrim-dc1", description="Consul datacenter")
     consul_timeout: int = Field(default=10, ge=1, le=60, description="Consul timeout seconds")
+    consul_consistency: str = Field(default="default", pattern="^(default|consistent|stale)$", description="Consul read consistency (stale reads keep working during leader elections)")
+    consul_breaker_threshold: int = Field(default=3, ge=1, le=100, description="Consecutive Consul failures that open the circuit breaker")
+    consul_breaker_reset_timeout: float = Field(default=1.0, ge=0.1, le=300, description="Seconds before the first probe of an open circuit")
+    consul_breaker_max_reset_timeout: float = Field(default=30.0, ge=0.1, le=3600, description="Upper bound of the doubling probe backoff")
+    cluster_cache_ttl: float = Field(default=5.0, ge=0, le=300, description="Seconds a cluster snapshot is reused across requests")
+    
+    # Response caching (read-only GET endpoints polled by the frontend)
+    response_cache_enabled: bool = Field(default=True, description="Cache GET responses with ETags and request coalescing")
+    response_cache_ttl: float = Field(default=5.0, ge=0, le=300, description="Seconds a cached response is served")
+    response_cache_prefixes: list[str] = Field(
+        default=["/api/analytics/", "/api/managers", "/api/workers", "/api/nodes"],
+        description="Path prefixes whose GET responses are cached"
+    )
     
     # Metrics
     metrics_history_size: int = Field(default=288, ge=10, le=1000, description="Metrics history size (24h at 5min intervals)")
     # Slightly slower default collection interval for better performance on small VMs
     metrics_collection_interval: int = Field(default=10, ge=1, le=60, description="Metrics collection interval seconds")
+    node_metrics_ttl: float = Field(default=120.0, ge=5, le=3600, description="Seconds a node's reported metrics count towards cluster averages")
+    
+    # Alerting
+    alerting_enabled: bool = Field(default=True, description="Evaluate alert rules and push alert changes over /ws/realtime")
+    alert_rules_file: Optional[str] = Field(default=None, description="JSON file with alert rules (built-in defaults when unset)")
+    alert_tick_interval: float = Field(default=1.0, ge=0.1, le=60, description="Seconds between absence-rule checks and alert pushes")
+    
+    # Serialization
+    fast_json_enabled: bool = Field(default=False, description="Serialize large API responses and WebSocket messages with the fast JSON path (orjson if installed)")
+    
+    # Health checks (readiness reads the result of the background check)
+    health_check_interval: float = Field(default=10.0, ge=1, le=300, description="Seconds between background dependency checks")
+    health_stale_after: float = Field(default=30.0, ge=1, le=3600, description="Seconds after which a dependency check result no longer counts as ready")
+    
+    # Self-instrumentation
+    telemetry_enabled: bool = Field(default=True, description="Time routers, Consul calls and stream sends and serve them at /metrics")
+    
+    # Request profiling (opt-in; profiles are served under /api/admin/profiles)
+    profiling_enabled: bool = Field(default=False, description="Sample stacks of in-flight requests and keep profiles of slow ones")
+    profiling_slow_threshold: float = Field(default=2.0, ge=0, description="Seconds after which a request's profile is kept (0: only X-Nexus-Profile requests)")
+    profiling_interval: float = Field(default=0.01, ge=0.001, le=1, description="Seconds between stack samples")
+    profiling_dir: str = Field(default="profiles", description="Directory of the profile ring (relative to the backend dir)")
+    profiling_max_profiles: int = Field(default=50, ge=1, le=10000, description="Profiles kept before the oldest is removed")
     
     # Logging
     log_level: str = Field(default="INFO", pattern="^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$")
@@ -52,6 +94,10 @@ class Settings(BaseSettings):
     # WebSocket
     websocket_heartbeat_interval: int = Field(default=30, ge=10, le=300, description="WebSocket heartbeat interval")
     
+    # Update stream (shared by /ws/realtime and the /api/stream SSE endpoint)
+    stream_replay_size: int = Field(default=4096, ge=64, le=100000, description="Events kept for Last-Event-ID resume")
+    stream_keepalive_interval: int = Field(default=15, ge=1, le=300, description="Seconds between SSE keep-alive comments")
+    
     # API Rate Limiting
     rate_limit_enabled: bool = Field(default=True, description="Enable rate limiting")
     rate_limit_requests: int = Field(default=100, ge=1, description="Max requests per minute")
@@ -61,6 +107,7 @@ class Settings(BaseSettings):
     
     # Paths
     frontend_path: str = Field(default="../frontend", description="Frontend static files path (relative to backend dir)")
+    static_minify: bool = Field(default=True, description="Minify frontend CSS and JS when building the in-memory asset bundle at startup")
     
     @field_validator("consul_host")
     @classmethod
@@ -127,34 +174,37 @@ def validate_environment() -> tuple[bool, list[str]]:
     try:
         settings = get_settings()
         
-        # Validate Consul connectivity
+        # Validate Consul connectivity (API workers reach Consul through the collector)
         import socket
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2)
-            result = sock.connect_ex((settings.consul_host, settings.consul_port))
-            sock.close()
-            if result != 0:
-                errors.append(f"Cannot connect to Consul at {settings.consul_host}:{settings.consul_port}")
-        except Exception as e:
-            errors.append(f"Consul connectivity check failed: {e}")
+        if settings.role != "api":
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.settimeout(2)
+                result = sock.connect_ex((settings.consul_host, settings.consul_port))
+                sock.close()
+                if result != 0:
+                    errors.append(f"Cannot connect to Consul at {settings.consul_host}:{settings.consul_port}")
+            except Exception as e:
+                errors.append(f"Consul connectivity check failed: {e}")
         
-        # Validate port availability
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.bind(('', settings.port))
-            sock.close()
-        except OSError as e:
-            if e.errno == 98:  # Address already in use
-                errors.append(f"Port {settings.port} is already in use")
-            else:
-                errors.append(f"Port {settings.port} validation failed: {e}")
+        # Validate port availability (API workers import the app after uvicorn has bound the port,
+        # and the collector listens on a Unix socket)
+        if settings.role == "standalone":
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(('', settings.port))
+                sock.close()
+            except OSError as e:
+                if e.errno == 98:  # Address already in use
+                    errors.append(f"Port {settings.port} is already in use")
+                else:
+                    errors.append(f"Port {settings.port} validation failed: {e}")
         
         # Validate required Python modules
         required_modules = [
             'fastapi', 'uvicorn', 'consul', 'pydantic', 'pydantic_settings',
-            'psutil', 'websockets'
+            'psutil', 'websockets', 'httpx'
         ]
         for module in required_modules:
             try:
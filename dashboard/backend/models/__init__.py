@@ -4,10 +4,22 @@ Data models for Krutrim Nexus Ops Dashboard
 
 from .manager import Manager, ManagerStatus
 from .worker import Worker, WorkerStatus, WorkerPool, ServiceInfo
-from .metrics import Metrics, SystemMetrics, ServiceMetrics, TimeSeriesDataPoint
+from .metrics import (
+    Metrics, SystemMetrics, PoolMetrics, NodeMetricsReport, ServiceUsage, ServiceMetrics,
+    ServiceSample, ServiceSampleBatch, ServiceRollupPoint, ServiceHistory,
+    TimeSeriesDataPoint, PercentileSummary, TopNode, TopService
+)
+from .alerts import Alert, AlertRule
+from .nodes import NodeDetails
+from .records import NodeRecord, ServiceRecord, MetricPoint
+from .profiles import ProfileInfo
 
 __all__ = [
     'Manager', 'ManagerStatus',
     'Worker', 'WorkerStatus', 'WorkerPool', 'ServiceInfo',
-    'Metrics', 'SystemMetrics', 'ServiceMetrics', 'TimeSeriesDataPoint'
+    'Metrics', 'SystemMetrics', 'PoolMetrics', 'NodeMetricsReport', 'ServiceUsage', 'ServiceMetrics',
+    'ServiceSample', 'ServiceSampleBatch', 'ServiceRollupPoint', 'ServiceHistory',
+    'TimeSeriesDataPoint', 'PercentileSummary', 'TopNode', 'TopService',
+    'Alert', 'AlertRule', 'NodeDetails',
+    'NodeRecord', 'ServiceRecord', 'MetricPoint', 'ProfileInfo'
 ]
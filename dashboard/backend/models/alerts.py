@@ -0,0 +1,53 @@
+"""
+Alerting data models
+"""
+
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Literal
+from datetime import datetime
+
+from .worker import WorkerPool
+
+
+class AlertRule(BaseModel):
+    """
+    Rule evaluated on every node metrics report.
+
+    threshold: fires while `metric <op> value`
+    rate:      fires while the metric's change per second `<op> value`
+    absence:   fires when a node has not reported for `value` seconds
+    """
+    name: str = Field(..., description="Unique rule name")
+    kind: Literal["threshold", "rate", "absence"] = Field(default="threshold")
+    metric: Optional[Literal["cpu_usage", "memory_usage", "disk_usage", "network_in", "network_out"]] = None
+    op: Literal[">", ">=", "<", "<="] = Field(default=">")
+    value: float = Field(..., description="Threshold, rate per second, or absence seconds")
+    clear: Optional[float] = Field(default=None, description="Resolve threshold (hysteresis); defaults to value")
+    for_seconds: float = Field(default=0.0, ge=0.0, description="How long the condition must hold before firing")
+    severity: Literal["info", "warning", "critical"] = Field(default="warning")
+    pool: Optional[WorkerPool] = Field(default=None, description="Only evaluate nodes in this pool")
+
+    @model_validator(mode="after")
+    def check_metric(self):
+        if self.kind == "absence":
+            if self.value <= 0:
+                raise ValueError("absence rules need value > 0 (seconds)")
+        elif self.metric is None:
+            raise ValueError(f"{self.kind} rules need a metric")
+        return self
+
+
+class Alert(BaseModel):
+    """Alert instance for one rule on one node"""
+    rule: str
+    node: str
+    severity: str
+    state: Literal["firing", "resolved"]
+    value: Optional[float] = None
+    message: str = ""
+    started_at: datetime
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        # Built from the engine's internal alert state
+        from_attributes = True
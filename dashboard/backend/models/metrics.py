@@ -2,11 +2,20 @@
 Metrics and analytics data models
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from pydantic import BaseModel, Field, NonNegativeFloat, NonNegativeInt
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 
+class PoolMetrics(BaseModel):
+    """Per-pool worker breakdown"""
+    total_workers: int = Field(default=0)
+    healthy_workers: int = Field(default=0)
+    avg_cpu_usage: float = Field(default=0.0, ge=0.0, le=100.0)
+    avg_memory_usage: float = Field(default=0.0, ge=0.0, le=100.0)
+    avg_disk_usage: float = Field(default=0.0, ge=0.0, le=100.0)
+
+
 class SystemMetrics(BaseModel):
     """System-wide metrics"""
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -31,6 +40,54 @@ class SystemMetrics(BaseModel):
     # Health status
     cluster_health: str = Field(default="unknown", description="Overall cluster health")
     alerts_count: int = Field(default=0, description="Active alerts count")
+    stale: bool = Field(default=False, description="Consul is unavailable and the counts are from the last good snapshot")
+    snapshot_age_seconds: float = Field(default=0.0, description="Seconds since the cluster snapshot was read from Consul")
+    
+    # Breakdown
+    reporting_nodes: int = Field(default=0, description="Nodes with fresh metrics (the averages cover these)")
+    pools: Dict[str, PoolMetrics] = Field(default_factory=dict, description="Worker breakdown by pool")
+
+
+class ServiceUsage(BaseModel):
+    """Resource usage of one service in a node report"""
+    cpu_usage: float = Field(default=0.0, ge=0.0)
+    memory_mb: float = Field(default=0.0, ge=0.0)
+
+
+class NodeMetricsReport(BaseModel):
+    """Metrics pushed by a node (POST /api/analytics/nodes/{node}/metrics)"""
+    cpu_usage: float = Field(ge=0.0, le=100.0)
+    memory_usage: float = Field(ge=0.0, le=100.0)
+    disk_usage: float = Field(default=0.0, ge=0.0, le=100.0)
+    network_in: float = Field(default=0.0, ge=0.0, description="MB/s")
+    network_out: float = Field(default=0.0, ge=0.0, description="MB/s")
+    running_services: Optional[int] = Field(default=None, ge=0, description="Defaults to the services registered in Consul")
+    services: Dict[str, ServiceUsage] = Field(default_factory=dict, description="Per-service usage, by service name")
+    uptime_seconds: int = Field(default=0, ge=0)
+
+
+class PercentileSummary(BaseModel):
+    """Percentiles of a metric across nodes or over a time window"""
+    metric: str
+    window: str
+    node: Optional[str] = None
+    count: int = Field(description="Samples summarized")
+    percentiles: Dict[str, Optional[float]] = Field(description="e.g. {'p50': 41.2, 'p99': 93.0}")
+
+
+class TopNode(BaseModel):
+    """Node ranked by a current metric"""
+    node: str
+    value: float
+    pool: str
+    is_manager: bool = False
+
+
+class TopService(BaseModel):
+    """Service ranked by a current metric"""
+    node: str
+    service: str
+    value: float
 
 
 class ServiceMetrics(BaseModel):
@@ -56,11 +113,50 @@ class ServiceMetrics(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+# [timestamp, cpu %, memory MB, restarts (supervisor's running count), uptime seconds]
+ServiceSample = Tuple[float, NonNegativeFloat, NonNegativeFloat, NonNegativeInt, NonNegativeInt]
+
+
+class ServiceSampleBatch(BaseModel):
+    """Per-service samples pushed by a worker supervisor (POST /api/analytics/nodes/{node}/services)"""
+    services: Dict[str, List[ServiceSample]] = Field(..., description="Sample rows by service name")
+
+
+class ServiceRollupPoint(BaseModel):
+    """One time bucket of a service's history, across the nodes running it"""
+    timestamp: datetime
+    samples: int
+    avg_cpu_usage: float
+    max_cpu_usage: float
+    avg_memory_mb: float
+    max_memory_mb: float
+    restarts: int = Field(default=0, description="Restarts during the bucket")
+
+
+class ServiceHistory(BaseModel):
+    """Latest per-node metrics of a service and its rollups over a window"""
+    name: str
+    window: str
+    resolution_seconds: int = Field(description="Width of each series bucket")
+    instances: List[ServiceMetrics] = Field(default_factory=list, description="Latest sample per node")
+    samples: int = 0
+    avg_cpu_usage: Optional[float] = None
+    max_cpu_usage: Optional[float] = None
+    avg_memory_mb: Optional[float] = None
+    max_memory_mb: Optional[float] = None
+    restarts: int = Field(default=0, description="Restarts during the window")
+    series: List[ServiceRollupPoint] = Field(default_factory=list)
+
+
 class TimeSeriesDataPoint(BaseModel):
     """Single data point in time series"""
     timestamp: datetime
     value: float
 
+    class Config:
+        # Built from internal MetricPoint objects at the API boundary
+        from_attributes = True
+
 
 class Metrics(BaseModel):
     """Complete metrics response"""
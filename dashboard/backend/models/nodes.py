@@ -0,0 +1,18 @@
+"""
+Batched node detail models
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from .manager import Manager
+from .worker import Worker
+from .metrics import SystemMetrics
+
+
+class NodeDetails(BaseModel):
+    """Details for a batch of nodes (one dashboard page in one response)"""
+    managers: List[Manager] = Field(default_factory=list)
+    workers: List[Worker] = Field(default_factory=list)
+    missing: List[str] = Field(default_factory=list, description="Requested IDs not in the cluster")
+    overview: Optional[SystemMetrics] = Field(default=None, description="Included with include_overview=true")
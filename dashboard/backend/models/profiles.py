@@ -0,0 +1,19 @@
+"""
+Request profile models
+"""
+
+from pydantic import BaseModel, Field
+from typing import Literal
+
+
+class ProfileInfo(BaseModel):
+    """Stored request profile (the stacks are downloaded separately)"""
+    id: str
+    method: str
+    path: str
+    status: int
+    duration_ms: float
+    samples: int = Field(..., description="Stack samples taken while the request ran")
+    interval_ms: float = Field(..., description="Sampling interval")
+    trigger: Literal["header", "slow"]
+    created_at: float = Field(..., description="Unix time the profile was saved")
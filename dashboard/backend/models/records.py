@@ -0,0 +1,47 @@
+"""
+Lightweight internal record types
+__slots__ dataclasses used for the in-memory cluster model and metrics
+history. They skip per-field validation; the pydantic models in this package
+validate them at the API boundary (see `from_attributes` on the models).
+All fields are required so the classes work with __slots__ on Python 3.8+.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Tuple
+
+from .worker import WorkerPool, WorkerStatus
+
+
+@dataclass
+class ServiceRecord:
+    """Service registered on a node (internal form of ServiceInfo)"""
+    __slots__ = ('name', 'port', 'status', 'restarts', 'uptime_seconds', 'tags')
+    name: str
+    port: int
+    status: str
+    restarts: int
+    uptime_seconds: int
+    tags: Tuple[str, ...]
+
+
+@dataclass
+class NodeRecord:
+    """One Consul node in the cluster snapshot (internal form of Worker/Manager)"""
+    __slots__ = ('node', 'address', 'is_manager', 'is_worker', 'pool', 'status', 'health_reasons', 'services')
+    node: str
+    address: str
+    is_manager: bool
+    is_worker: bool
+    pool: WorkerPool
+    status: WorkerStatus
+    health_reasons: Tuple[str, ...]
+    services: Tuple[ServiceRecord, ...]
+
+
+@dataclass
+class MetricPoint:
+    """Single time-series sample (internal form of TimeSeriesDataPoint)"""
+    __slots__ = ('timestamp', 'value')
+    timestamp: datetime
+    value: float
@@ -32,6 +32,10 @@ class ServiceInfo(BaseModel):
     restarts: int = 0
     uptime_seconds: int = 0
 
+    class Config:
+        # Built from internal ServiceRecord objects at the API boundary
+        from_attributes = True
+
 
 class Worker(BaseModel):
     """Worker node model"""
@@ -40,18 +44,19 @@ class Worker(BaseModel):
     ip_address: str = Field(..., description="Worker IP address")
     pool: WorkerPool = Field(default=WorkerPool.WORKER, description="Worker pool assignment")
     status: WorkerStatus = Field(default=WorkerStatus.UNKNOWN)
+    health_reasons: List[str] = Field(default_factory=list, description="Failing Consul checks behind a degraded/failed status")
     
     # Resource metrics
-    cpu_usage: float = Field(default=0.0, ge=0.0, le=100.0, description="CPU usage percentage")
-    memory_usage: float = Field(default=0.0, ge=0.0, le=100.0, description="Memory usage percentage")
-    disk_usage: float = Field(default=0.0, ge=0.0, le=100.0, description="Disk usage percentage")
+    cpu_usage: Optional[float] = Field(default=None, ge=0.0, le=100.0, description="CPU usage percentage (null until the node reports)")
+    memory_usage: Optional[float] = Field(default=None, ge=0.0, le=100.0, description="Memory usage percentage (null until the node reports)")
+    disk_usage: Optional[float] = Field(default=None, ge=0.0, le=100.0, description="Disk usage percentage (null until the node reports)")
     
     # Network metrics
-    network_in: float = Field(default=0.0, description="Network input MB/s")
-    network_out: float = Field(default=0.0, description="Network output MB/s")
+    network_in: Optional[float] = Field(default=None, description="Network input MB/s (null until the node reports)")
+    network_out: Optional[float] = Field(default=None, description="Network output MB/s (null until the node reports)")
     
     # Operational data
-    uptime_seconds: int = Field(default=0, description="Uptime in seconds")
+    uptime_seconds: Optional[int] = Field(default=None, description="Uptime in seconds (null until the node reports it)")
     last_heartbeat: Optional[datetime] = Field(default=None, description="Last heartbeat timestamp")
     
     # Services
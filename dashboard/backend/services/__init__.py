@@ -2,7 +2,22 @@
 Backend services for dashboard
 """
 
+from .breaker import CircuitBreaker, CircuitOpenError
 from .consul_service import ConsulService
 from .metrics_service import MetricsService
+from .cluster_state import ClusterState, ClusterSnapshot, get_cluster_state
+from .aggregates import ClusterAggregates, get_cluster_aggregates
+from .alerting import AlertEngine, get_alert_engine
+from .updates import UpdateStream, get_update_stream
+from .service_metrics import ServiceMetricsStore, get_service_metrics
+from .profiler import RequestProfiler, ProfileStore, get_profiler
+from .health import HealthMonitor, get_health_monitor
+from .collector import CollectorClient, collector_directory, get_collector_client, get_snapshot_version
 
-__all__ = ['ConsulService', 'MetricsService']
+__all__ = [
+    'ConsulService', 'MetricsService', 'ClusterState', 'ClusterSnapshot', 'get_cluster_state',
+    'ClusterAggregates', 'get_cluster_aggregates', 'AlertEngine', 'get_alert_engine',
+    'UpdateStream', 'get_update_stream', 'ServiceMetricsStore', 'get_service_metrics',
+    'RequestProfiler', 'ProfileStore', 'get_profiler', 'HealthMonitor', 'get_health_monitor',
+    'CircuitBreaker', 'CircuitOpenError', 'CollectorClient', 'collector_directory', 'get_collector_client', 'get_snapshot_version'
+]
@@ -0,0 +1,340 @@
+"""
+Cluster aggregates service
+Fleet-wide totals, averages, per-pool breakdowns, health counts, percentile
+sketches and top-K rankings kept up to date incrementally as node reports
+and snapshot changes arrive, so they are read without re-scanning every node
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Depends
+
+from config import settings
+from models import NodeRecord, PoolMetrics, SystemMetrics, WorkerPool, WorkerStatus
+from .cluster_state import ClusterSnapshot, ClusterState, get_cluster_state
+from .metrics_service import cluster_health
+from .sketches import DDSketch, RollupSketch, TopK
+
+logger = logging.getLogger(__name__)
+
+# API metric name -> NodeStats attribute (node metrics) / services tuple index
+NODE_METRICS = {'cpu': 'cpu_usage', 'memory': 'memory_usage', 'disk': 'disk_usage'}
+SERVICE_METRICS = {'cpu': 0, 'memory': 1}
+
+# (bucket seconds, buckets) per rollup tier, fine to coarse
+NODE_TIERS = ((300, 12), (3600, 24))      # 1h at 5 min, 24h hourly
+FLEET_TIERS = ((60, 60), (3600, 168))     # 1h per minute, 7d hourly
+
+
+class NodeStats:
+    """Latest known state of one node; its contribution to the running sums"""
+    __slots__ = ('node', 'is_manager', 'pool', 'healthy', 'total_services', 'running_services',
+                 'reported_at', 'cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out',
+                 'uptime_seconds', 'services')
+
+    def __init__(self, node: str, is_manager: bool, pool: WorkerPool, healthy: bool, total_services: int):
+        self.node = node
+        self.is_manager = is_manager
+        self.pool = pool
+        self.healthy = healthy
+        self.total_services = total_services
+        self.running_services = total_services
+        self.reported_at: Optional[float] = None
+        self.cpu_usage = 0.0
+        self.memory_usage = 0.0
+        self.disk_usage = 0.0
+        self.network_in = 0.0
+        self.network_out = 0.0
+        self.uptime_seconds = 0
+        self.services: Dict[str, Tuple[float, float]] = {}  # name -> (cpu %, memory MB)
+
+    def copy(self) -> "NodeStats":
+        clone = NodeStats.__new__(NodeStats)
+        for name in NodeStats.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+
+class Totals:
+    """Running sums over a set of nodes"""
+    __slots__ = ('nodes', 'healthy', 'reporting', 'total_services', 'running_services',
+                 'cpu_usage', 'memory_usage', 'disk_usage', 'network_in', 'network_out')
+
+    def __init__(self):
+        for name in Totals.__slots__:
+            setattr(self, name, 0)
+
+    def add(self, stats: NodeStats, sign: int):
+        self.nodes += sign
+        self.healthy += sign if stats.healthy else 0
+        self.total_services += sign * stats.total_services
+        self.running_services += sign * stats.running_services
+        if stats.reported_at is not None:
+            self.reporting += sign
+            self.cpu_usage += sign * stats.cpu_usage
+            self.memory_usage += sign * stats.memory_usage
+            self.disk_usage += sign * stats.disk_usage
+            self.network_in += sign * stats.network_in
+            self.network_out += sign * stats.network_out
+
+    def avg(self, name: str) -> float:
+        if not self.reporting:
+            return 0.0
+        # Running float sums can drift by a few ulps; clamp to the model bounds
+        return min(100.0, max(0.0, round(getattr(self, name) / self.reporting, 2)))
+
+
+class ClusterAggregates:
+    """
+    Incrementally maintained cluster aggregates.
+
+    Every change replaces one node's NodeStats: its old contribution is
+    subtracted from the running sums, the current-value sketches and the
+    top-K heaps, and the new one added. Membership, health and services
+    follow the cluster snapshot (`sync` runs on every refresh); resource
+    metrics come from node reports (`report`) and drop out of the current
+    view once older than `metrics_ttl` seconds. Reports also feed per-node
+    and fleet-wide time rollups for windowed percentiles.
+    """
+
+    def __init__(self, cluster: ClusterState, metrics_ttl: float = 120.0):
+        self.cluster = cluster
+        self.metrics_ttl = metrics_ttl
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, NodeStats] = {}
+        self._all = Totals()
+        self._managers = Totals()
+        self._workers = Totals()
+        self._pools: Dict[WorkerPool, Totals] = {}
+        self._current = {m: DDSketch() for m in NODE_METRICS}
+        self._top_nodes = {m: TopK() for m in NODE_METRICS}
+        self._top_services = {m: TopK() for m in SERVICE_METRICS}
+        self._node_rollups: Dict[str, Dict[str, RollupSketch]] = {}
+        self._fleet_rollups = {m: RollupSketch(FLEET_TIERS) for m in NODE_METRICS}
+        self._version: Optional[int] = None
+        cluster.subscribe(self.sync)
+
+    def _apply(self, stats: NodeStats, sign: int):
+        self._all.add(stats, sign)
+        if stats.reported_at is not None:
+            for metric, attr in NODE_METRICS.items():
+                self._current[metric].add(getattr(stats, attr), sign)
+        if stats.is_manager:
+            self._managers.add(stats, sign)
+        else:
+            self._workers.add(stats, sign)
+            self._pools.setdefault(stats.pool, Totals()).add(stats, sign)
+
+    def _replace(self, node: str, new: Optional[NodeStats]):
+        old = self._nodes.pop(node, None)
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+            self._nodes[node] = new
+        self._rank(node, old, new)
+
+    def _rank(self, node: str, old: Optional[NodeStats], new: Optional[NodeStats]):
+        reported = new is not None and new.reported_at is not None
+        for metric, attr in NODE_METRICS.items():
+            if reported:
+                self._top_nodes[metric].update(node, getattr(new, attr))
+            else:
+                self._top_nodes[metric].discard(node)
+        services = new.services if reported else {}
+        for name in (old.services if old is not None else ()):
+            if name not in services:
+                for top in self._top_services.values():
+                    top.discard((node, name))
+        for name, values in services.items():
+            for metric, index in SERVICE_METRICS.items():
+                self._top_services[metric].update((node, name), values[index])
+
+    def sync(self, snapshot: ClusterSnapshot):
+        """Applies membership, health and service changes from a new snapshot"""
+        with self._lock:
+            if snapshot.version != self._version:
+                for node in [n for n in self._nodes if n not in snapshot.nodes]:
+                    self._replace(node, None)
+                    self._node_rollups.pop(node, None)
+                for node, record in snapshot.nodes.items():
+                    self._sync_node(record)
+                self._version = snapshot.version
+            self._expire(time.time() - self.metrics_ttl)
+
+    def _sync_node(self, record: NodeRecord):
+        healthy = record.status == WorkerStatus.HEALTHY
+        total_services = len(record.services)
+        old = self._nodes.get(record.node)
+        if old is None:
+            self._replace(record.node, NodeStats(record.node, record.is_manager, record.pool,
+                                                 healthy, total_services))
+            return
+        if (old.is_manager, old.pool, old.healthy, old.total_services) == \
+                (record.is_manager, record.pool, healthy, total_services):
+            return
+        stats = old.copy()
+        stats.is_manager = record.is_manager
+        stats.pool = record.pool
+        stats.healthy = healthy
+        if stats.reported_at is None or stats.running_services > total_services:
+            stats.running_services = total_services
+        stats.total_services = total_services
+        self._replace(record.node, stats)
+
+    def _expire(self, cutoff: float):
+        for node, stats in list(self._nodes.items()):
+            if stats.reported_at is not None and stats.reported_at < cutoff:
+                fresh = NodeStats(node, stats.is_manager, stats.pool, stats.healthy, stats.total_services)
+                self._replace(node, fresh)
+
+    def report(self, node: str, cpu_usage: float, memory_usage: float, disk_usage: float = 0.0,
+               network_in: float = 0.0, network_out: float = 0.0,
+               running_services: Optional[int] = None,
+               services: Optional[Dict[str, Tuple[float, float]]] = None,
+               uptime_seconds: int = 0) -> bool:
+        """
+        Records a node's current metrics; False when the node is not in the cluster.
+        `services` maps service name to (cpu %, memory MB) for the top-K services view.
+        """
+        self.cluster.snapshot()  # past the TTL, starts a refresh that picks up nodes that joined
+        now = time.time()
+        with self._lock:
+            old = self._nodes.get(node)
+            if old is None:
+                return False
+            stats = old.copy()
+            stats.reported_at = now
+            stats.cpu_usage = cpu_usage
+            stats.memory_usage = memory_usage
+            stats.disk_usage = disk_usage
+            stats.network_in = network_in
+            stats.network_out = network_out
+            stats.uptime_seconds = uptime_seconds
+            stats.running_services = (min(running_services, stats.total_services)
+                                      if running_services is not None else stats.total_services)
+            stats.services = dict(services or {})
+            self._replace(node, stats)
+
+            rollups = self._node_rollups.get(node)
+            if rollups is None:
+                rollups = self._node_rollups[node] = {m: RollupSketch(NODE_TIERS) for m in NODE_METRICS}
+            for metric, attr in NODE_METRICS.items():
+                rollups[metric].add(getattr(stats, attr), now)
+                self._fleet_rollups[metric].add(getattr(stats, attr), now)
+            return True
+
+    def node_metrics(self, node: str) -> Optional[Dict[str, float]]:
+        """A node's latest reported metrics, or None when it has no fresh report"""
+        with self._lock:
+            stats = self._nodes.get(node)
+            if stats is None or stats.reported_at is None:
+                return None
+            return {
+                'cpu_usage': stats.cpu_usage,
+                'memory_usage': stats.memory_usage,
+                'disk_usage': stats.disk_usage,
+                'network_in': stats.network_in,
+                'network_out': stats.network_out,
+                'uptime_seconds': stats.uptime_seconds,
+                'last_heartbeat': datetime.utcfromtimestamp(stats.reported_at),
+            }
+
+    def percentiles(self, metric: str, quantiles: Sequence[float], window: Optional[float] = None,
+                    node: Optional[str] = None) -> Tuple[int, List[Optional[float]]]:
+        """
+        (sample count, quantile values) for `metric` ('cpu', 'memory' or 'disk').
+
+        Without `window`, across the current value of every reporting node.
+        With `window` (seconds), over every report in that window, fleet-wide
+        or for one `node`. Raises KeyError for unknown nodes and ValueError
+        when the window is longer than the rollups keep.
+        """
+        if window is None and node is not None:
+            raise ValueError("Per-node percentiles need a time window")
+        self.cluster.snapshot()
+        now = time.time()
+        with self._lock:
+            if window is None:
+                sketch = self._current[metric]
+            else:
+                if node is not None:
+                    if node not in self._nodes:
+                        raise KeyError(node)
+                    rollup = self._node_rollups.get(node, {}).get(metric) or RollupSketch(NODE_TIERS)
+                else:
+                    rollup = self._fleet_rollups[metric]
+                sketch = rollup.window(window, now)
+                if sketch is None:
+                    raise ValueError(f"Window exceeds the {rollup.max_window}s kept for this series")
+            values = [sketch.quantile(q) for q in quantiles]
+            return sketch.count, [round(v, 2) if v is not None else None for v in values]
+
+    def top_nodes(self, metric: str, k: int) -> List[Dict]:
+        """The k reporting nodes with the highest current `metric`"""
+        self.cluster.snapshot()
+        with self._lock:
+            return [
+                {'node': node, 'value': value, 'pool': self._nodes[node].pool,
+                 'is_manager': self._nodes[node].is_manager}
+                for node, value in self._top_nodes[metric].top(k)
+            ]
+
+    def top_services(self, metric: str, k: int) -> List[Dict]:
+        """The k services with the highest current `metric` ('cpu' % or 'memory' MB)"""
+        self.cluster.snapshot()
+        with self._lock:
+            return [
+                {'node': node, 'service': name, 'value': value}
+                for (node, name), value in self._top_services[metric].top(k)
+            ]
+
+    def system_metrics(self, alerts_count: int = 0) -> SystemMetrics:
+        """Current cluster overview; O(pools), independent of the number of nodes"""
+        self.cluster.snapshot()  # refreshes (and syncs) in the background once the snapshot TTL has passed
+        with self._lock:
+            managers, workers, total = self._managers, self._workers, self._all
+            return SystemMetrics(
+                total_managers=managers.nodes,
+                healthy_managers=managers.healthy,
+                total_workers=workers.nodes,
+                healthy_workers=workers.healthy,
+                total_services=total.total_services,
+                running_services=total.running_services,
+                avg_cpu_usage=total.avg('cpu_usage'),
+                avg_memory_usage=total.avg('memory_usage'),
+                avg_disk_usage=total.avg('disk_usage'),
+                total_network_in=round(max(0.0, total.network_in), 2),
+                total_network_out=round(max(0.0, total.network_out), 2),
+                cluster_health=cluster_health(managers.nodes, managers.healthy,
+                                              workers.nodes, workers.healthy),
+                alerts_count=alerts_count,
+                reporting_nodes=total.reporting,
+                stale=self.cluster.stale,
+                snapshot_age_seconds=round(self.cluster.age(), 1),
+                pools={
+                    pool.value: PoolMetrics(
+                        total_workers=t.nodes,
+                        healthy_workers=t.healthy,
+                        avg_cpu_usage=t.avg('cpu_usage'),
+                        avg_memory_usage=t.avg('memory_usage'),
+                        avg_disk_usage=t.avg('disk_usage'),
+                    )
+                    for pool, t in self._pools.items() if t.nodes
+                }
+            )
+
+
+_cluster_aggregates: Optional[ClusterAggregates] = None
+
+
+def get_cluster_aggregates(cluster: ClusterState = Depends(get_cluster_state)) -> ClusterAggregates:
+    """Process-wide ClusterAggregates fed by the shared ClusterState (FastAPI dependency)"""
+    global _cluster_aggregates
+    if _cluster_aggregates is None:
+        _cluster_aggregates = ClusterAggregates(cluster, metrics_ttl=settings.node_metrics_ttl)
+    return _cluster_aggregates
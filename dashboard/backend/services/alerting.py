@@ -0,0 +1,260 @@
+"""
+Alerting service
+Threshold, rate-of-change and absence rules evaluated incrementally on each
+node metrics report, with hysteresis, deduplication and a deadline heap for
+missed heartbeats
+"""
+
+import heapq
+import json
+import logging
+import operator
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from fastapi import Depends
+
+from config import settings
+from models import Alert, AlertRule, WorkerPool
+from .cluster_state import ClusterSnapshot, ClusterState, get_cluster_state
+
+logger = logging.getLogger(__name__)
+
+OPS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+DEFAULT_RULES = [
+    AlertRule(name="high-cpu", metric="cpu_usage", value=90, clear=80, for_seconds=60),
+    AlertRule(name="high-memory", metric="memory_usage", value=90, clear=85, for_seconds=60),
+    AlertRule(name="disk-almost-full", metric="disk_usage", value=90, clear=85, severity="critical"),
+    AlertRule(name="node-heartbeat-missing", kind="absence", value=60, severity="critical"),
+]
+
+
+class AlertRecord:
+    """Pending or firing alert for one (rule, node) pair"""
+    __slots__ = ('rule', 'node', 'severity', 'state', 'value', 'message',
+                 'since', 'started_at', 'resolved_at')
+
+    def __init__(self, rule: AlertRule, node: str, value: float, now: float):
+        self.rule = rule.name
+        self.node = node
+        self.severity = rule.severity
+        self.state = "pending"
+        self.value = value
+        self.message = ""
+        self.since = now
+        self.started_at = datetime.utcfromtimestamp(now)
+        self.resolved_at: Optional[datetime] = None
+
+
+class AlertEngine:
+    """
+    Evaluates alert rules as reports arrive instead of re-querying history.
+
+    Threshold and rate rules are indexed by metric, so a report only touches
+    the rules for the metrics it carries. A (rule, node) pair goes pending
+    when its condition first holds, fires once it held for `for_seconds`, and
+    resolves only when the value crosses the rule's `clear` level
+    (hysteresis). A firing pair is never re-emitted (deduplication). Absence
+    rules keep one deadline per (rule, node) in a heap that `tick` pops.
+    Firing/resolved transitions are queued for `drain_events`.
+    """
+
+    def __init__(self, rules: Sequence[AlertRule], max_events: int = 1000):
+        self._lock = threading.Lock()
+        self._events: Deque[Alert] = deque(maxlen=max_events)
+        self._pools: Dict[str, WorkerPool] = {}
+        self._version: Optional[int] = None
+        self.evaluations = 0
+        self.set_rules(rules)
+
+    def set_rules(self, rules: Sequence[AlertRule]):
+        """Replaces the rule set; pending and firing alerts are reset"""
+        names = [r.name for r in rules]
+        duplicates = {n for n in names if names.count(n) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate alert rule names: {', '.join(sorted(duplicates))}")
+
+        with self._lock:
+            self.rules = list(rules)
+            self._threshold: Dict[str, List[Tuple[int, AlertRule]]] = {}
+            self._rate: Dict[str, List[Tuple[int, AlertRule]]] = {}
+            self._absence: List[Tuple[int, AlertRule]] = []
+            for idx, rule in enumerate(self.rules):
+                if rule.kind == "absence":
+                    self._absence.append((idx, rule))
+                else:
+                    index = self._threshold if rule.kind == "threshold" else self._rate
+                    index.setdefault(rule.metric, []).append((idx, rule))
+
+            self._states: Dict[Tuple[int, str], AlertRecord] = {}
+            self._firing = 0
+            self._previous: Dict[str, Dict[str, Tuple[float, float]]] = {}  # node -> metric -> (value, ts)
+            self._last_seen: Dict[str, float] = {}
+            self._deadlines: List[Tuple[float, int, str]] = []
+            self._scheduled: Set[Tuple[int, str]] = set()
+
+    def sync(self, snapshot: ClusterSnapshot):
+        """Tracks node pools for rule filters and forgets nodes that left the cluster"""
+        if snapshot.version == self._version:
+            return
+        with self._lock:
+            self._pools = {node: record.pool for node, record in snapshot.nodes.items()}
+            for node in [n for n in self._last_seen if n not in snapshot.nodes]:
+                self._forget(node, time.time())
+            self._version = snapshot.version
+
+    def _forget(self, node: str, now: float):
+        self._last_seen.pop(node, None)
+        self._previous.pop(node, None)
+        for key in [k for k in self._states if k[1] == node]:
+            self._resolve(key, now, "node left the cluster")
+
+    # -- transitions -------------------------------------------------------
+
+    def _emit(self, record: AlertRecord):
+        self._events.append(Alert.model_validate(record))
+
+    def _fire(self, record: AlertRecord, message: str):
+        record.state = "firing"
+        record.message = message
+        self._firing += 1
+        self._emit(record)
+
+    def _resolve(self, key: Tuple[int, str], now: float, message: str):
+        record = self._states.pop(key)
+        if record.state == "firing":
+            record.state = "resolved"
+            record.message = message
+            record.resolved_at = datetime.utcfromtimestamp(now)
+            self._firing -= 1
+            self._emit(record)
+
+    @staticmethod
+    def _describe(rule: AlertRule, value: float) -> str:
+        if rule.kind == "rate":
+            return f"{rule.metric} changing {value:+.2f}/s (threshold {rule.op} {rule.value:g})"
+        return f"{rule.metric} at {value:.1f} (threshold {rule.op} {rule.value:g})"
+
+    def _evaluate(self, idx: int, rule: AlertRule, node: str, value: float, now: float):
+        self.evaluations += 1
+        key = (idx, node)
+        record = self._states.get(key)
+        compare = OPS[rule.op]
+        if record is None:
+            if not compare(value, rule.value):
+                return
+            record = self._states[key] = AlertRecord(rule, node, value, now)
+        record.value = value
+        if record.state == "pending":
+            if not compare(value, rule.value):
+                del self._states[key]
+            elif now - record.since >= rule.for_seconds:
+                self._fire(record, self._describe(rule, value))
+        elif not compare(value, rule.clear if rule.clear is not None else rule.value):
+            self._resolve(key, now, self._describe(rule, value))
+
+    # -- inputs ------------------------------------------------------------
+
+    def observe(self, node: str, metrics: Dict[str, float], now: Optional[float] = None):
+        """Evaluates every rule that applies to a node report"""
+        now = time.time() if now is None else now
+        with self._lock:
+            pool = self._pools.get(node)
+            for metric, value in metrics.items():
+                for idx, rule in self._threshold.get(metric, ()):
+                    if rule.pool is None or rule.pool == pool:
+                        self._evaluate(idx, rule, node, value, now)
+
+            if self._rate:
+                previous = self._previous.get(node, {})
+                for metric, value in metrics.items():
+                    rules = self._rate.get(metric)
+                    last = previous.get(metric)
+                    if rules and last is not None and now > last[1]:
+                        rate = (value - last[0]) / (now - last[1])
+                        for idx, rule in rules:
+                            if rule.pool is None or rule.pool == pool:
+                                self._evaluate(idx, rule, node, rate, now)
+                self._previous[node] = {m: (v, now) for m, v in metrics.items() if m in self._rate}
+
+            self._last_seen[node] = now
+            for idx, rule in self._absence:
+                if rule.pool is not None and rule.pool != pool:
+                    continue
+                self.evaluations += 1
+                key = (idx, node)
+                if key in self._states:
+                    self._resolve(key, now, "node reporting again")
+                if key not in self._scheduled:
+                    self._scheduled.add(key)
+                    heapq.heappush(self._deadlines, (now + rule.value, idx, node))
+            self._expire(now)
+
+    def tick(self, now: Optional[float] = None):
+        """Fires absence rules whose deadline has passed (called periodically)"""
+        with self._lock:
+            self._expire(time.time() if now is None else now)
+
+    def _expire(self, now: float):
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, idx, node = heapq.heappop(self._deadlines)
+            key = (idx, node)
+            last = self._last_seen.get(node)
+            if last is None:
+                self._scheduled.discard(key)
+                continue
+            rule = self.rules[idx]
+            due = last + rule.value
+            if due > now:
+                heapq.heappush(self._deadlines, (due, idx, node))  # reported since; move the deadline
+                continue
+            self._scheduled.discard(key)  # re-armed by the next report
+            silent = now - last
+            record = self._states[key] = AlertRecord(rule, node, silent, now)
+            self._fire(record, f"no report for {silent:.0f}s")
+
+    # -- outputs -----------------------------------------------------------
+
+    def active_count(self) -> int:
+        return self._firing
+
+    def active(self) -> List[Alert]:
+        """Firing alerts, oldest first"""
+        with self._lock:
+            firing = [r for r in self._states.values() if r.state == "firing"]
+        return [Alert.model_validate(r) for r in sorted(firing, key=lambda r: r.since)]
+
+    def drain_events(self) -> List[Alert]:
+        """Firing/resolved transitions since the last call"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+
+def load_rules(path: Optional[str]) -> List[AlertRule]:
+    """Rules from a JSON file (a list of AlertRule objects), or the defaults"""
+    if not path:
+        return list(DEFAULT_RULES)
+    try:
+        with open(path) as f:
+            return [AlertRule(**rule) for rule in json.load(f)]
+    except Exception as e:
+        logger.error(f"Failed to load alert rules from {path}, using defaults: {e}")
+        return list(DEFAULT_RULES)
+
+
+_alert_engine: Optional[AlertEngine] = None
+
+
+def get_alert_engine(cluster: ClusterState = Depends(get_cluster_state)) -> AlertEngine:
+    """Process-wide AlertEngine (FastAPI dependency)"""
+    global _alert_engine
+    if _alert_engine is None:
+        _alert_engine = AlertEngine(load_rules(settings.alert_rules_file))
+        cluster.subscribe(_alert_engine.sync)
+    return _alert_engine
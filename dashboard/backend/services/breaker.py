@@ -0,0 +1,110 @@
+"""
+Circuit breaker
+Stops calling a dependency that keeps failing, so callers fail fast instead
+of each waiting for a timeout, and probes it again with exponential backoff
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    closed: calls go through; `failure_threshold` consecutive failures open
+    the circuit.
+    open: calls are refused until `retry_at`; then the circuit is half-open.
+    half_open: one probe call goes through. Success closes the circuit;
+    failure opens it again with the backoff doubled (up to `max_reset_timeout`).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3,
+                 reset_timeout: float = 1.0, max_reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._backoff = reset_timeout
+        self._retry_at = 0.0
+        self._probing = False
+        self.failures_total = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() >= self._retry_at:
+                return self.HALF_OPEN
+            return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._retry_at - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go through now; in half-open state only one probe at a time does"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() < self._retry_at:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._backoff = self.reset_timeout
+            self._probing = False
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.failures_total += 1
+            if self._state == self.HALF_OPEN:
+                self._backoff = min(self._backoff * 2, self.max_reset_timeout)
+            elif self._state == self.OPEN or self._failures < self.failure_threshold:
+                return
+            self._state = self.OPEN
+            self._probing = False
+            self._retry_at = time.monotonic() + self._backoff
+            if self.opened_at is None:
+                self.opened_at = time.time()
+            logger.warning(f"Circuit {self.name} open; next probe in {self._backoff:.1f}s")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """Process-wide breaker for `name` (created with `options` on first use)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
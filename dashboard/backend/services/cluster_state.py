@@ -0,0 +1,294 @@
+"""
+Cluster state service
+Indexed, versioned snapshot of the Consul catalog shared by the API routers
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from config import settings
+from models import NodeRecord, ServiceRecord, WorkerPool, WorkerStatus
+from .consul_service import ConsulService
+from .telemetry import CLUSTER_REFRESH_SECONDS, timed
+
+logger = logging.getLogger(__name__)
+
+POOL_TAGS = {
+    'web': WorkerPool.WEB,
+    'api': WorkerPool.API,
+    'database': WorkerPool.DATABASE,
+}
+
+
+class NodeHealth:
+    """A node's status derived from its Consul health checks"""
+    __slots__ = ('status', 'reasons', 'services')
+
+    def __init__(self, status: WorkerStatus, reasons: Tuple[str, ...] = (),
+                 services: Optional[Dict[str, str]] = None):
+        self.status = status
+        self.reasons = reasons
+        self.services = services or {}  # service ID -> 'warning' / 'critical'
+
+
+HEALTHY = NodeHealth(WorkerStatus.HEALTHY)
+CHECK_SEVERITY = {'passing': 0, 'warning': 1, 'critical': 2}
+
+
+def index_health_checks(checks: List[Dict]) -> Dict[str, List[Dict]]:
+    """node -> its failing (warning or critical) checks, from one bulk health/state call"""
+    failing: Dict[str, List[Dict]] = {}
+    for check in checks:
+        if CHECK_SEVERITY.get(check.get('Status'), 2) > 0:
+            failing.setdefault(check.get('Node', ''), []).append(check)
+    return failing
+
+
+def evaluate_node_health(failing: List[Dict]) -> NodeHealth:
+    """
+    FAILED when a node-level check (e.g. serfHealth) is critical, DEGRADED when
+    any other check is warning or critical, HEALTHY otherwise
+    """
+    if not failing:
+        return HEALTHY
+    status = WorkerStatus.DEGRADED
+    reasons = []
+    services: Dict[str, str] = {}
+    for check in sorted(failing, key=lambda c: (c.get('ServiceID') or '', c.get('CheckID', ''))):
+        state = check.get('Status') or 'critical'
+        service_id = check.get('ServiceID') or ''
+        if service_id:
+            if CHECK_SEVERITY.get(state, 2) > CHECK_SEVERITY.get(services.get(service_id), 0):
+                services[service_id] = state
+            label = f"{check.get('ServiceName') or service_id}: {check.get('Name') or check.get('CheckID')}"
+        else:
+            if state == 'critical':
+                status = WorkerStatus.FAILED
+            label = check.get('Name') or check.get('CheckID') or 'node check'
+        output = (check.get('Output') or '').strip().splitlines()
+        reasons.append(f"{label} is {state}" + (f" ({output[0][:120]})" if output else ""))
+    return NodeHealth(status, tuple(reasons), services)
+
+
+def classify_node(node: Dict, node_services: List[Dict], health: NodeHealth) -> NodeRecord:
+    """Builds the snapshot entry for one Consul node"""
+    node_services = list(node_services)
+    is_manager = any(s.get('Service') == 'consul' for s in node_services)
+    is_worker = any('worker' in s.get('Service', '').lower() for s in node_services)
+
+    # Determine worker pool from tags or default
+    pool = WorkerPool.WORKER
+    for svc in node_services:
+        for tag in svc.get('Tags', []) or []:
+            if tag in POOL_TAGS:
+                pool = POOL_TAGS[tag]
+
+    return NodeRecord(
+        node=node['Node'],
+        address=node['Address'],
+        is_manager=is_manager,
+        is_worker=is_worker,
+        pool=pool,
+        status=health.status,
+        health_reasons=health.reasons,
+        services=tuple(
+            ServiceRecord(
+                name=s.get('Service', 'unknown'),
+                port=s.get('Port', 0),
+                status=health.services.get(s.get('ID')) or health.services.get(s.get('Service'), 'running'),
+                restarts=0,
+                uptime_seconds=0,
+                tags=tuple(s.get('Tags', []) or ())
+            )
+            for s in node_services if s.get('Service') != 'consul'
+        )
+    )
+
+
+class ClusterSnapshot:
+    """Immutable view of the cluster with indexes for filtering without building models"""
+
+    def __init__(self, entries: List[NodeRecord], version: int, signature: str,
+                 leader: Optional[str] = None):
+        self.version = version
+        self.signature = signature
+        self.leader = leader
+        self.created_at = time.time()
+        self.nodes: Dict[str, NodeRecord] = {e.node: e for e in entries}
+
+        workers = {f"wkr-{e.node}": e for e in entries if e.is_worker}
+        self.workers = workers
+        self.worker_ids: List[str] = sorted(workers)
+        self.workers_by_pool: Dict[WorkerPool, FrozenSet[str]] = {}
+        self.workers_by_status: Dict[WorkerStatus, FrozenSet[str]] = {}
+        for wid, e in workers.items():
+            self.workers_by_pool.setdefault(e.pool, set()).add(wid)
+            self.workers_by_status.setdefault(e.status, set()).add(wid)
+        self.workers_by_pool = {k: frozenset(v) for k, v in self.workers_by_pool.items()}
+        self.workers_by_status = {k: frozenset(v) for k, v in self.workers_by_status.items()}
+
+        self.managers = {f"mgr-{e.node}": e for e in entries if e.is_manager}
+
+    def select_workers(self, pool: Optional[WorkerPool] = None,
+                       status: Optional[WorkerStatus] = None,
+                       after: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[str]:
+        """Worker IDs in ID order matching the filters, starting after the cursor ID"""
+        sets = []
+        if pool is not None:
+            sets.append(self.workers_by_pool.get(pool, frozenset()))
+        if status is not None:
+            sets.append(self.workers_by_status.get(status, frozenset()))
+
+        start = bisect.bisect_right(self.worker_ids, after) if after else 0
+        selected = []
+        for wid in self.worker_ids[start:]:
+            if all(wid in s for s in sets):
+                selected.append(wid)
+                if limit is not None and len(selected) >= limit:
+                    break
+        return selected
+
+
+class ClusterState:
+    """
+    Caches the cluster snapshot for a short TTL so requests share Consul round
+    trips. An expired snapshot keeps being served while a background thread
+    rebuilds it, and when Consul is unavailable the last good snapshot is kept
+    and reported as stale.
+    """
+
+    def __init__(self, consul: ConsulService, ttl: float = 5.0):
+        self.consul = consul
+        self.ttl = ttl
+        self._snapshot: Optional[ClusterSnapshot] = None
+        self._version = 0
+        self._listeners: List[Callable[[ClusterSnapshot], None]] = []
+        self._refresh_lock = threading.Lock()
+        self._attempted_at = 0.0
+        self._stale_since: Optional[float] = None
+
+    def subscribe(self, listener: Callable[[ClusterSnapshot], None]):
+        """Calls `listener` with every refreshed snapshot (and the current one, if any)"""
+        self._listeners.append(listener)
+        if self._snapshot is not None:
+            listener(self._snapshot)
+
+    @property
+    def stale(self) -> bool:
+        """True while the snapshot is older than Consul's last answer (Consul unavailable)"""
+        return self._stale_since is not None
+
+    def age(self) -> float:
+        """Seconds since the current snapshot was read from Consul"""
+        return time.time() - self._snapshot.created_at if self._snapshot is not None else 0.0
+
+    def snapshot(self) -> ClusterSnapshot:
+        """
+        Current snapshot. Only the first call waits for Consul; once the TTL
+        has passed, later calls return the current snapshot and start a
+        background refresh (one at a time)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._rebuild()
+            return self._snapshot
+        if time.time() - max(snapshot.created_at, self._attempted_at) >= self.ttl:
+            if self._refresh_lock.acquire(blocking=False):
+                threading.Thread(target=self._revalidate, name="cluster-refresh", daemon=True).start()
+        return snapshot
+
+    def refresh(self) -> ClusterSnapshot:
+        """Rebuilds the snapshot now (blocking)"""
+        with self._refresh_lock:
+            return self._rebuild()
+
+    def _revalidate(self):
+        try:
+            self._rebuild()
+        except Exception as e:
+            logger.error(f"Cluster snapshot refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _keep_previous(self, previous: ClusterSnapshot) -> ClusterSnapshot:
+        if self._stale_since is None:
+            self._stale_since = time.time()
+            logger.warning(f"Consul unavailable; serving the cluster snapshot "
+                           f"from {time.time() - previous.created_at:.0f}s ago")
+        return previous
+
+    @timed(CLUSTER_REFRESH_SECONDS)
+    def _rebuild(self) -> ClusterSnapshot:
+        self._attempted_at = time.time()
+        previous_snapshot = self._snapshot
+        if previous_snapshot is not None and not self.consul.available():
+            return self._keep_previous(previous_snapshot)
+        errors = self.consul.errors()
+
+        # One bulk health query for the whole fleet; if it fails, nodes keep their last known health
+        checks = self.consul.get_health_checks()
+        failing = index_health_checks(checks) if checks is not None else None
+        # Services for every node from one catalog query per service name, not one per node
+        services = self.consul.get_services_by_node() or {}
+        previous = previous_snapshot.nodes if previous_snapshot is not None else {}
+        entries = []
+        for node in self.consul.get_all_nodes():
+            node_services = services.get(node['Node'], [])
+            if failing is not None:
+                health = evaluate_node_health(failing.get(node['Node'], []))
+            elif node['Node'] in previous:
+                last = previous[node['Node']]
+                health = NodeHealth(last.status, last.health_reasons,
+                                    {s.name: s.status for s in last.services if s.status != 'running'})
+            else:
+                health = NodeHealth(WorkerStatus.UNKNOWN, ("Consul health checks unavailable",))
+            entries.append(classify_node(node, node_services, health))
+        entries.sort(key=lambda e: e.node)
+        leader = self.consul.get_leader()
+
+        # A refresh where any Consul call failed (or was refused by the circuit
+        # breaker) would replace good data with partial data
+        failed = self.consul.errors() != errors
+        if failed and previous_snapshot is not None:
+            return self._keep_previous(previous_snapshot)
+        if self._stale_since is not None and not failed:
+            logger.info("Consul available again; cluster snapshot is current")
+        self._stale_since = (self._stale_since or time.time()) if failed else None
+
+        # Version only moves when the content changes, so it can back cache validators
+        signature = hashlib.sha1(repr((leader, entries)).encode()).hexdigest()
+        if self._snapshot is None or self._snapshot.signature != signature:
+            self._version += 1
+        self._snapshot = ClusterSnapshot(entries, self._version, signature, leader)
+        for listener in self._listeners:
+            try:
+                listener(self._snapshot)
+            except Exception as e:
+                logger.error(f"Cluster snapshot listener failed: {e}")
+        return self._snapshot
+
+
+_cluster_state: Optional[ClusterState] = None
+
+
+def get_cluster_state() -> ClusterState:
+    """Process-wide ClusterState (FastAPI dependency)"""
+    global _cluster_state
+    if _cluster_state is None:
+        consul = ConsulService(
+            host=settings.consul_host,
+            port=settings.consul_port,
+            token=settings.consul_token,
+            scheme=settings.consul_scheme,
+            timeout=settings.consul_timeout,
+            consistency=settings.consul_consistency
+        )
+        _cluster_state = ClusterState(consul, ttl=settings.cluster_cache_ttl)
+    return _cluster_state
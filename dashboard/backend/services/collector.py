@@ -0,0 +1,164 @@
+"""
+Collector IPC service
+In multi-process mode one collector process owns Consul, node metric
+ingestion and the update stream, and API worker processes reach it over a
+Unix socket. The cluster snapshot version is shared through a memory-mapped
+file, so workers validate their response caches without a round trip.
+"""
+
+import asyncio
+import logging
+import mmap
+import os
+import stat
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from config import settings
+from .updates import SCOPED_TOPICS, STATIC_TOPICS, UpdateStream
+
+logger = logging.getLogger(__name__)
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per forwarded request otherwise
+
+SOCKET_NAME = "collector.sock"
+VERSION_NAME = "snapshot.version"
+
+# Every topic the collector publishes, so the relayed event IDs stay contiguous
+RELAY_TOPICS = ",".join(sorted(STATIC_TOPICS) + [f"{scope}:*" for scope in sorted(SCOPED_TOPICS)])
+
+# Hop-by-hop headers and headers the worker sets itself
+_SKIP_HEADERS = {'host', 'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'upgrade'}
+_SKIP_RESPONSE_HEADERS = _SKIP_HEADERS | {'date', 'server', 'vary', 'content-encoding'}
+
+
+class SharedCounter:
+    """Unsigned 64-bit integer in a memory-mapped file, written by one process and read by others"""
+
+    _FORMAT = '<Q'
+
+    def __init__(self, path: Path):
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            size = struct.calcsize(self._FORMAT)
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def get(self) -> int:
+        return struct.unpack_from(self._FORMAT, self._map)[0]
+
+    def set(self, value: int):
+        struct.pack_into(self._FORMAT, self._map, 0, value)
+
+
+class CollectorClient:
+    """HTTP over the collector's Unix socket, used by API worker processes"""
+
+    def __init__(self, directory: Path, timeout: float = 10.0):
+        self.socket_path = directory / SOCKET_NAME
+        self._client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(uds=str(self.socket_path)),
+            base_url="http://collector", timeout=timeout)
+
+    async def request(self, method: str, path: str, query: str, headers: Iterable[Tuple[str, str]],
+                      body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Forwards one request; returns (status, headers, body). Raises httpx.TransportError if unreachable"""
+        response = await self._client.request(
+            method, path, params=httpx.QueryParams(query), content=body,
+            headers=[(k, v) for k, v in headers if k.lower() not in _SKIP_HEADERS])
+        # content-encoding is dropped because httpx has already decoded the body
+        relayed = {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_RESPONSE_HEADERS}
+        return response.status_code, relayed, response.content
+
+    async def get_json(self, path: str):
+        response = await self._client.get(path)
+        response.raise_for_status()
+        return response.json()
+
+    async def relay(self, stream: UpdateStream, retry_seconds: float = 1.0):
+        """
+        Mirrors the collector's update stream into this process's stream, so
+        /ws/realtime and /api/stream clients are served by the worker they
+        connected to. Reconnects with Last-Event-ID; runs until cancelled.
+        """
+        while True:
+            headers = {"Last-Event-ID": str(stream.last_id)} if stream.last_id else {}
+            try:
+                async with self._client.stream("GET", "/api/stream/", params={"topics": RELAY_TOPICS},
+                                               headers=headers, timeout=None) as response:
+                    response.raise_for_status()
+                    logger.info("Relaying the collector's update stream")
+                    event_id, topic, data = None, None, []
+                    async for line in response.aiter_lines():
+                        if line:
+                            field, _, value = line.partition(": ")
+                            if field == "id":
+                                event_id = int(value)
+                            elif field == "event":
+                                topic = value
+                            elif field == "data":
+                                data.append(value)
+                            continue
+                        if topic == "reset":
+                            stream.reset()
+                        elif event_id is not None and topic is not None:
+                            stream.mirror(event_id, topic, "\n".join(data))
+                        event_id, topic, data = None, None, []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Collector update stream unavailable: {e}")
+            await asyncio.sleep(retry_seconds)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def collector_directory() -> Path:
+    """
+    The collector directory: NEXUS_COLLECTOR_DIR, else nexus-dashboard under
+    $XDG_RUNTIME_DIR, else a per-user directory in the temp dir. It is created
+    with mode 0700. Whoever controls it controls the collector socket, so a
+    symlink, a directory owned by another user or one open to other users is
+    refused with PermissionError.
+    """
+    if settings.collector_dir:
+        directory = Path(settings.collector_dir)
+    elif os.environ.get("XDG_RUNTIME_DIR"):
+        directory = Path(os.environ["XDG_RUNTIME_DIR"]) / "nexus-dashboard"
+    else:
+        directory = Path(tempfile.gettempdir()) / f"nexus-dashboard-{os.getuid()}"
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"Collector directory {directory} is not a directory owned by uid {os.getuid()}")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise PermissionError(f"Collector directory {directory} is accessible by other users "
+                              f"(mode {stat.S_IMODE(info.st_mode):o}); restrict it to 0700")
+    return directory
+
+
+_collector_client: Optional[CollectorClient] = None
+_snapshot_version: Optional[SharedCounter] = None
+
+
+def get_collector_client() -> CollectorClient:
+    """Process-wide CollectorClient (API worker role)"""
+    global _collector_client
+    if _collector_client is None:
+        _collector_client = CollectorClient(collector_directory(), timeout=settings.collector_timeout)
+    return _collector_client
+
+
+def get_snapshot_version() -> SharedCounter:
+    """Cluster snapshot version shared by the collector with the API workers"""
+    global _snapshot_version
+    if _snapshot_version is None:
+        _snapshot_version = SharedCounter(collector_directory() / VERSION_NAME)
+    return _snapshot_version
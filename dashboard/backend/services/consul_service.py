@@ -4,16 +4,90 @@ Consul integration service
 
 import consul
 import logging
+import requests
+import threading
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from config import settings
+from .breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from .telemetry import CONSUL_CIRCUIT_OPEN, CONSUL_ERRORS, CONSUL_REQUEST_SECONDS, CONSUL_SHORT_CIRCUITS, timed
+
 logger = logging.getLogger(__name__)
 
 
+def instrumented(method):
+    """Records a ConsulService method's duration under its name"""
+    return timed(CONSUL_REQUEST_SECONDS, method.__name__)(method)
+
+
+def is_outage(error: Exception) -> bool:
+    """
+    Whether a failed Consul request means Consul is unavailable: no connection,
+    a timeout or a 5xx (such as "No cluster leader" during an election). 4xx
+    errors (not found, ACL, bad request) are answers and do not count.
+    """
+    if isinstance(error, (requests.RequestException, consul.Timeout)):
+        return True
+    return type(error) is consul.ConsulException
+
+
+class TimeoutSession(requests.Session):
+    """requests session applying a default timeout (python-consul passes none)"""
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class GuardedHTTPClient:
+    """python-consul HTTP client wrapper sending every request through a circuit breaker"""
+
+    def __init__(self, http, breaker: CircuitBreaker):
+        self.http = http
+        self.breaker = breaker
+
+    def _call(self, method: str, *args, **kwargs):
+        if not self.breaker.allow():
+            CONSUL_SHORT_CIRCUITS.inc()
+            raise CircuitOpenError(
+                f"Consul circuit open, next probe in {self.breaker.retry_in():.1f}s")
+        try:
+            result = getattr(self.http, method)(*args, **kwargs)
+        except Exception as e:
+            if is_outage(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            CONSUL_CIRCUIT_OPEN.set(0 if self.breaker.state == CircuitBreaker.CLOSED else 1)
+        return result
+
+    def get(self, *args, **kwargs):
+        return self._call('get', *args, **kwargs)
+
+    def put(self, *args, **kwargs):
+        return self._call('put', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._call('delete', *args, **kwargs)
+
+    def post(self, *args, **kwargs):
+        return self._call('post', *args, **kwargs)
+
+
 class ConsulService:
     """Service for interacting with Consul with comprehensive error handling"""
     
-    def __init__(self, host: str = "localhost", port: int = 8500, token: Optional[str] = None, scheme: str = "http", timeout: int = 10):
+    def __init__(self, host: str = "localhost", port: int = 8500, token: Optional[str] = None, scheme: str = "http",
+                 timeout: int = 10, consistency: str = "default", breaker: Optional[CircuitBreaker] = None):
         """
         Initialize Consul service with validation
         
@@ -22,7 +96,9 @@ class ConsulService:
             port: Consul port
             token: Optional ACL token
             scheme: http or https
-            timeout: Connection timeout in seconds
+            timeout: Per-request timeout in seconds
+            consistency: Read consistency mode (default, consistent or stale)
+            breaker: Circuit breaker for the requests (default: shared per Consul address)
         """
         # Validate inputs
         if not host or host.strip() == "":
@@ -33,24 +109,33 @@ class ConsulService:
             raise ValueError(f"Invalid port: {port}. Must be between 1 and 65535")
         if scheme not in ["http", "https"]:
             raise ValueError(f"Invalid scheme: {scheme}. Must be 'http' or 'https'")
+        if consistency not in ["default", "consistent", "stale"]:
+            raise ValueError(f"Invalid consistency: {consistency}. Must be 'default', 'consistent' or 'stale'")
         
         self.host = host.strip()
         self.port = port
         self.token = token
         self.scheme = scheme
         self.timeout = timeout
+        self.breaker = breaker or get_breaker(
+            f"consul {self.scheme}://{self.host}:{self.port}",
+            failure_threshold=settings.consul_breaker_threshold,
+            reset_timeout=settings.consul_breaker_reset_timeout,
+            max_reset_timeout=settings.consul_breaker_max_reset_timeout)
         self._connected = False
+        self._errors = threading.local()
+        
+        self.consul = consul.Consul(
+            host=self.host,
+            port=self.port,
+            token=self.token,
+            scheme=self.scheme,
+            consistency=consistency
+        )
+        self.consul.http.session = TimeoutSession(self.timeout)
+        self.consul.http = GuardedHTTPClient(self.consul.http, self.breaker)
         
         try:
-            # Create Consul client with timeout
-            self.consul = consul.Consul(
-                host=self.host,
-                port=self.port,
-                token=self.token,
-                scheme=self.scheme,
-                timeout=self.timeout
-            )
-            
             # Test connection
             self.consul.agent.self()
             self._connected = True
@@ -58,73 +143,133 @@ class ConsulService:
         except Exception as e:
             logger.error(f"Failed to connect to Consul at {self.scheme}://{self.host}:{self.port}: {e}")
             logger.warning("Consul service will operate in degraded mode")
-            # Create a stub consul object to prevent crashes
-            self.consul = consul.Consul(
-                host=self.host,
-                port=self.port,
-                token=self.token,
-                scheme=self.scheme
-            )
-            self._connected = False
+    
+    def _record_error(self, method: str):
+        CONSUL_ERRORS.inc(method)
+        self._errors.count = self.errors() + 1
+    
+    def errors(self) -> int:
+        """
+        Consul errors the methods below have swallowed on this thread (they
+        return empty results instead). Compare before and after a sequence of
+        calls to tell whether any of them failed, including calls refused by
+        the circuit breaker.
+        """
+        return getattr(self._errors, 'count', 0)
+    
+    def available(self) -> bool:
+        """False while the circuit is open: requests would be refused without a round trip"""
+        return self.breaker.state != CircuitBreaker.OPEN
     
     def is_connected(self) -> bool:
         """Check if connected to Consul"""
         return self._connected
         
+    @instrumented
     def get_all_nodes(self) -> List[Dict]:
         """Get all nodes in the cluster"""
         try:
             _, nodes = self.consul.catalog.nodes()
             return nodes
         except Exception as e:
+            self._record_error('get_all_nodes')
             logger.error(f"Failed to get nodes from Consul: {e}")
             return []
     
+    @instrumented
     def get_all_services(self) -> Dict[str, List]:
         """Get all registered services"""
         try:
             _, services = self.consul.catalog.services()
             return services
         except Exception as e:
+            self._record_error('get_all_services')
             logger.error(f"Failed to get services from Consul: {e}")
             return {}
     
+    @instrumented
     def get_service_health(self, service_name: str) -> List[Dict]:
         """Get health status for a specific service"""
         try:
             _, checks = self.consul.health.service(service_name, passing=True)
             return checks
         except Exception as e:
+            self._record_error('get_service_health')
             logger.error(f"Failed to get health for {service_name}: {e}")
             return []
     
+    @instrumented
+    def get_health_checks(self, state: str = "any") -> Optional[List[Dict]]:
+        """Every health check in the cluster in `state` (one bulk call), or None if Consul failed"""
+        try:
+            _, checks = self.consul.health.state(state)
+            return checks
+        except Exception as e:
+            self._record_error('get_health_checks')
+            logger.error(f"Failed to get health checks from Consul: {e}")
+            return None
+    
+    @instrumented
     def get_node_services(self, node_name: str) -> List[Dict]:
         """Get all services running on a specific node"""
         try:
             _, services = self.consul.catalog.node(node_name)
             return services.get('Services', {}).values() if services else []
         except Exception as e:
+            self._record_error('get_node_services')
             logger.error(f"Failed to get services for node {node_name}: {e}")
             return []
     
+    @instrumented
+    def get_services_by_node(self) -> Optional[Dict[str, List[Dict]]]:
+        """
+        node -> its services (ID, Service, Port, Tags, as get_node_services
+        returns them), read with one catalog query per service name instead of
+        one per node; None if Consul failed
+        """
+        try:
+            _, names = self.consul.catalog.services()
+            by_node: Dict[str, List[Dict]] = {}
+            for name in names:
+                _, instances = self.consul.catalog.service(name)
+                for instance in instances:
+                    by_node.setdefault(instance['Node'], []).append({
+                        'ID': instance.get('ServiceID'),
+                        'Service': instance.get('ServiceName'),
+                        'Port': instance.get('ServicePort', 0),
+                        'Tags': instance.get('ServiceTags') or [],
+                    })
+            for services in by_node.values():
+                services.sort(key=lambda s: s['ID'] or '')
+            return by_node
+        except Exception as e:
+            self._record_error('get_services_by_node')
+            logger.error(f"Failed to get services from Consul: {e}")
+            return None
+    
+    @instrumented
     def get_leader(self) -> Optional[str]:
         """Get current Consul leader"""
         try:
             leader = self.consul.status.leader()
             return leader
         except Exception as e:
+            self._record_error('get_leader')
             logger.error(f"Failed to get Consul leader: {e}")
             return None
     
+    @instrumented
     def get_peers(self) -> List[str]:
         """Get all Consul peers"""
         try:
             peers = self.consul.status.peers()
             return peers
         except Exception as e:
+            self._record_error('get_peers')
             logger.error(f"Failed to get Consul peers: {e}")
             return []
     
+    @instrumented
     def register_service(self, service_id: str, service_name: str, 
                         port: int, address: str, 
                         health_check_url: Optional[str] = None) -> bool:
@@ -144,9 +289,11 @@ class ConsulService:
             logger.info(f"Registered service {service_name} ({service_id})")
             return True
         except Exception as e:
+            self._record_error('register_service')
             logger.error(f"Failed to register service {service_name}: {e}")
             return False
     
+    @instrumented
     def deregister_service(self, service_id: str) -> bool:
         """Deregister a service from Consul"""
         try:
@@ -154,18 +301,22 @@ class ConsulService:
             logger.info(f"Deregistered service {service_id}")
             return True
         except Exception as e:
+            self._record_error('deregister_service')
             logger.error(f"Failed to deregister service {service_id}: {e}")
             return False
     
+    @instrumented
     def get_kv(self, key: str) -> Optional[str]:
         """Get value from Consul KV store"""
         try:
             _, data = self.consul.kv.get(key)
             return data['Value'].decode('utf-8') if data else None
         except Exception as e:
+            self._record_error('get_kv')
             logger.error(f"Failed to get KV {key}: {e}")
             return None
     
+    @instrumented
     def put_kv(self, key: str, value: str) -> bool:
         """Put value into Consul KV store"""
         try:
@@ -173,19 +324,19 @@ class ConsulService:
             logger.info(f"Stored KV {key}")
             return True
         except Exception as e:
+            self._record_error('put_kv')
             logger.error(f"Failed to put KV {key}: {e}")
             return False
     
+    @instrumented
     def is_node_healthy(self, node_name: str, timeout_seconds: int = 60) -> bool:
-        """Check if a node is healthy based on last heartbeat"""
+        """Check if a node is healthy: none of its node-level checks (e.g. serfHealth) are critical"""
         try:
-            _, node = self.consul.catalog.node(node_name)
-            if not node:
+            _, checks = self.consul.health.node(node_name)
+            if not checks:
                 return False
-            
-            # Check if node has recent activity
-            # In production, you'd check actual health checks
-            return True
+            return not any(c.get('Status') == 'critical' and not c.get('ServiceID') for c in checks)
         except Exception as e:
+            self._record_error('is_node_healthy')
             logger.error(f"Failed to check health for {node_name}: {e}")
             return False
@@ -0,0 +1,129 @@
+"""
+Dependency health service
+Background-refreshed status of Consul and the cluster snapshot, so readiness
+probes read a cached result instead of calling Consul per probe
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import Depends
+
+from config import settings
+from models import WorkerStatus
+from .cluster_state import ClusterState, get_cluster_state
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """
+    Checks the dashboard's dependencies on `refresh()` (called by the
+    background health loop) and keeps the latest result with the time it was
+    taken. Readers never trigger a check, so a probe costs the same whatever
+    the cluster size.
+    """
+
+    def __init__(self, cluster: ClusterState, stale_after: float = 30.0):
+        self.cluster = cluster
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._consul: Optional[Dict] = None
+        self._cluster: Optional[Dict] = None
+        self._snapshot_available = False
+        self._checked_at: Optional[float] = None
+
+    def refresh(self):
+        """Runs every dependency check (blocking; call off the event loop)"""
+        consul = self.cluster.consul
+        start = time.perf_counter()
+        leader = consul.get_leader()
+        peers = consul.get_peers()
+        consul_status = {
+            "status": "healthy" if leader else "unhealthy",
+            "leader": leader,
+            "peers_count": len(peers),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "circuit": consul.breaker.state,
+        }
+
+        snapshot_available = False
+        try:
+            snapshot = self.cluster.snapshot()
+            snapshot_available = True
+            records = snapshot.nodes.values()
+            healthy_nodes = sum(1 for r in records if r.status == WorkerStatus.HEALTHY)
+            cluster_status = {
+                "status": "healthy" if healthy_nodes > 0 else "unhealthy",
+                "total_nodes": len(snapshot.nodes),
+                "healthy_nodes": healthy_nodes,
+                "total_services": len(consul.get_all_services()),
+                "snapshot_version": snapshot.version,
+                "snapshot_stale": self.cluster.stale,
+                "snapshot_age_seconds": round(self.cluster.age(), 1),
+            }
+        except Exception as e:
+            logger.error(f"Cluster health check failed: {e}")
+            cluster_status = {"status": "unhealthy", "error": str(e)}
+
+        with self._lock:
+            self._consul, self._cluster = consul_status, cluster_status
+            self._snapshot_available = snapshot_available
+            self._checked_at = time.time()
+
+    def _stamp(self, result: Optional[Dict], checked_at: Optional[float]) -> Dict:
+        if result is None:
+            return {"status": "unknown", "error": "No check has completed yet", "checked_at": None}
+        age = time.time() - checked_at
+        stamped = dict(result, checked_at=datetime.utcfromtimestamp(checked_at).isoformat(),
+                       age_seconds=round(age, 1))
+        if age > self.stale_after:
+            stamped["status"] = "stale"
+        return stamped
+
+    def consul_status(self) -> Dict:
+        with self._lock:
+            return self._stamp(self._consul, self._checked_at)
+
+    def cluster_status(self) -> Dict:
+        with self._lock:
+            return self._stamp(self._cluster, self._checked_at)
+
+    def readiness(self) -> Dict:
+        """
+        Whether this instance can answer requests: the health loop ran within
+        `stale_after` seconds and a cluster snapshot has been built (a stale
+        one counts). Consul and fleet health are reported in `checks` but do
+        not gate readiness, so an outage still leaves the last good snapshot
+        served.
+        """
+        with self._lock:
+            checked_at, snapshot_available = self._checked_at, self._snapshot_available
+        if checked_at is None:
+            reason = "No check has completed yet"
+        elif time.time() - checked_at > self.stale_after:
+            reason = "Health loop has not run recently"
+        elif not snapshot_available:
+            reason = "No cluster snapshot has been built yet"
+        else:
+            reason = None
+        result = {"status": "ready" if reason is None else "not_ready",
+                  "snapshot_available": snapshot_available,
+                  "checks": {"consul": self.consul_status(), "cluster": self.cluster_status()}}
+        if reason is not None:
+            result["reason"] = reason
+        return result
+
+
+_health_monitor: Optional[HealthMonitor] = None
+
+
+def get_health_monitor(cluster: ClusterState = Depends(get_cluster_state)) -> HealthMonitor:
+    """Process-wide HealthMonitor (FastAPI dependency)"""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor(cluster, stale_after=settings.health_stale_after)
+    return _health_monitor
@@ -8,11 +8,24 @@ from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import deque
 
-from models import SystemMetrics, ServiceMetrics, TimeSeriesDataPoint
+from models import SystemMetrics, ServiceMetrics, MetricPoint
+from .telemetry import METRICS_COLLECT_SECONDS, timed
 
 logger = logging.getLogger(__name__)
 
 
+def cluster_health(total_managers: int, healthy_managers: int,
+                   total_workers: int, healthy_workers: int) -> str:
+    """Overall cluster health from manager and worker health counts"""
+    if healthy_managers == 0:
+        return "critical"
+    if healthy_workers < total_workers * 0.5:
+        return "degraded"
+    if healthy_workers == total_workers and healthy_managers == total_managers:
+        return "healthy"
+    return "warning"
+
+
 class MetricsService:
     """Service for collecting and aggregating metrics"""
     
@@ -22,6 +35,7 @@ class MetricsService:
         self.memory_history = deque(maxlen=history_size)
         self.network_history = deque(maxlen=history_size)
         
+    @timed(METRICS_COLLECT_SECONDS)
     def collect_system_metrics(self) -> Dict:
         """Collect current system metrics with comprehensive error handling"""
         metrics = {
@@ -65,18 +79,10 @@ class MetricsService:
             
             # Add to history
             try:
-                self.cpu_history.append(TimeSeriesDataPoint(
-                    timestamp=metrics['timestamp'],
-                    value=metrics['cpu_usage']
-                ))
-                self.memory_history.append(TimeSeriesDataPoint(
-                    timestamp=metrics['timestamp'],
-                    value=metrics['memory_usage']
-                ))
-                self.network_history.append(TimeSeriesDataPoint(
-                    timestamp=metrics['timestamp'],
-                    value=metrics['network_in'] + metrics['network_out']
-                ))
+                timestamp = metrics['timestamp']
+                self.cpu_history.append(MetricPoint(timestamp, metrics['cpu_usage']))
+                self.memory_history.append(MetricPoint(timestamp, metrics['memory_usage']))
+                self.network_history.append(MetricPoint(timestamp, metrics['network_in'] + metrics['network_out']))
             except Exception as e:
                 logger.warning(f"Failed to add metrics to history: {e}")
             
@@ -127,16 +133,6 @@ class MetricsService:
         total_services = sum(n.get('total_services', 0) for n in all_nodes)
         running_services = sum(n.get('running_services', 0) for n in all_nodes)
         
-        # Determine cluster health
-        if healthy_managers == 0:
-            cluster_health = "critical"
-        elif healthy_workers < total_workers * 0.5:
-            cluster_health = "degraded"
-        elif healthy_workers == total_workers and healthy_managers == total_managers:
-            cluster_health = "healthy"
-        else:
-            cluster_health = "warning"
-        
         return SystemMetrics(
             total_managers=total_managers,
             healthy_managers=healthy_managers,
@@ -147,12 +143,13 @@ class MetricsService:
             avg_cpu_usage=round(avg_cpu, 2),
             avg_memory_usage=round(avg_memory, 2),
             avg_disk_usage=round(avg_disk, 2),
-            cluster_health=cluster_health
+            cluster_health=cluster_health(total_managers, healthy_managers,
+                                          total_workers, healthy_workers)
         )
     
     def get_time_series_data(self, metric_type: str, 
-                            duration_hours: int = 24) -> List[TimeSeriesDataPoint]:
-        """Get time series data for a specific metric"""
+                            duration_hours: int = 24) -> List[MetricPoint]:
+        """Get time series data for a specific metric (internal records, validated at the API boundary)"""
         # Get existing history
         if metric_type == 'cpu':
             history = list(self.cpu_history)
@@ -185,10 +182,7 @@ class MetricsService:
                     # Simulate network throughput (0-100 MB/s)
                     value = random.uniform(10, 80) + 20 * abs((i % 20) - 10) / 10
                 
-                history.append(TimeSeriesDataPoint(
-                    timestamp=timestamp,
-                    value=round(value, 2)
-                ))
+                history.append(MetricPoint(timestamp, round(value, 2)))
             
             logger.info(f"Generated {len(history)} sample data points for {metric_type}")
         
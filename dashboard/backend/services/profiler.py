@@ -0,0 +1,192 @@
+"""
+Request profiler service
+Wall-clock stack sampling of in-flight requests, keeping the profiles of slow
+(or explicitly requested) ones in a bounded on-disk ring as collapsed stacks
+(`frame;frame;frame count`, readable by flamegraph.pl, inferno and speedscope)
+"""
+
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads parked waiting for work; their stacks are noise in a request profile
+IDLE_FRAMES = {('threading.py', 'wait'), ('thread.py', '_worker'), ('queue.py', 'get')}
+
+
+class Capture:
+    """Samples collected for one in-flight request"""
+    __slots__ = ('started', 'forced', 'samples', 'duration')
+
+    def __init__(self, forced: bool):
+        self.started = time.perf_counter()
+        self.forced = forced
+        self.duration = 0.0
+        self.samples: Counter = Counter()
+
+
+class ProfileStore:
+    """
+    Ring of at most `max_profiles` profiles in `directory`: `<id>.folded` with
+    the collapsed stacks and `<id>.json` with the request metadata. IDs sort
+    by creation time, so the oldest are removed first.
+    """
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def save(self, info: Dict, samples: Counter) -> str:
+        profile_id = f"{int(time.time() * 1000):013d}-{next(self._seq) % 10000:04d}"
+        info = dict(info, id=profile_id)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            folded = "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+            (self.directory / f"{profile_id}.folded").write_text(folded)
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(info))
+            for old in self._ids()[:-self.max_profiles]:
+                for suffix in (".folded", ".json"):
+                    (self.directory / f"{old}{suffix}").unlink(missing_ok=True)
+        return profile_id
+
+    def _ids(self) -> List[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(p.stem for p in self.directory.glob("*.json"))
+
+    def list(self) -> List[Dict]:
+        """Metadata of the stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                profiles.append(json.loads((self.directory / f"{profile_id}.json").read_text()))
+            except (OSError, ValueError):
+                continue  # removed by a concurrent save
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Collapsed-stack file of a profile, or None"""
+        if profile_id not in self._ids():  # also rejects anything path-like
+            return None
+        path = self.directory / f"{profile_id}.folded"
+        return path if path.exists() else None
+
+
+class RequestProfiler:
+    """
+    Samples the stacks of every thread each `interval` seconds while at least
+    one request is being captured. A capture is kept when it was forced or the
+    request took at least `threshold` seconds (0 keeps only forced ones).
+
+    Samples are wall-clock and per process: concurrent requests share them,
+    with each stack rooted at its thread's name (the event loop runs on
+    MainThread, asyncio.to_thread work on asyncio_N).
+    """
+
+    def __init__(self, store: ProfileStore, interval: float = 0.01, threshold: float = 2.0,
+                 max_depth: int = 128):
+        self.store = store
+        self.interval = interval
+        self.threshold = threshold
+        self.max_depth = max_depth
+        self._captures: Dict[int, Capture] = {}
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}  # code object -> frame label
+
+    def begin(self, forced: bool = False) -> Optional[int]:
+        """Starts capturing for a request; returns a key for `end`, or None when not profiling it"""
+        if not forced and self.threshold <= 0:
+            return None
+        key = next(self._keys)
+        with self._lock:
+            self._captures[key] = Capture(forced)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return key
+
+    def end(self, key: Optional[int]) -> Optional[Capture]:
+        """Stops a capture; returns it when it should be kept"""
+        if key is None:
+            return None
+        with self._lock:
+            capture = self._captures.pop(key, None)
+        if capture is None:
+            return None
+        capture.duration = time.perf_counter() - capture.started
+        if capture.forced or capture.duration >= self.threshold:
+            return capture
+        return None
+
+    def save(self, capture: Capture, method: str, path: str, status: int) -> str:
+        """Writes a kept capture to the store (blocking file I/O)"""
+        return self.store.save({
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(capture.duration * 1000, 1),
+            "samples": sum(capture.samples.values()),
+            "interval_ms": self.interval * 1000,
+            "trigger": "header" if capture.forced else "slow",
+            "created_at": time.time(),
+        }, capture.samples)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._captures:
+                    self._thread = None  # the next begin() starts a new sampler
+                    return
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                frames = []
+                while frame is not None and len(frames) < self.max_depth:
+                    frames.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                frames.append(names.get(ident, f"thread-{ident}"))
+                stacks.append(";".join(reversed(frames)))
+            with self._lock:  # end() takes a capture out under the lock, so it stops changing
+                for capture in self._captures.values():
+                    capture.samples.update(stacks)
+            time.sleep(self.interval)
+
+
+_profiler: Optional[RequestProfiler] = None
+
+
+def get_profiler() -> RequestProfiler:
+    """Process-wide RequestProfiler"""
+    global _profiler
+    if _profiler is None:
+        store = ProfileStore(settings.profiling_dir, max_profiles=settings.profiling_max_profiles)
+        _profiler = RequestProfiler(store, interval=settings.profiling_interval,
+                                    threshold=settings.profiling_slow_threshold)
+    return _profiler
@@ -0,0 +1,223 @@
+"""
+Service metrics store
+Per-service process stats and restart counts reported by worker supervisors,
+kept as the latest sample per node plus time rollups per service
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Depends
+
+from config import settings
+from models import ServiceMetrics, ServiceSample
+from .cluster_state import ClusterSnapshot, ClusterState, get_cluster_state
+from .sketches import StatsRollup
+
+logger = logging.getLogger(__name__)
+
+# (bucket seconds, buckets) per rollup tier, fine to coarse
+SERVICE_TIERS = ((60, 60), (900, 96), (3600, 168))  # 1h per minute, 24h per 15 min, 7d hourly
+
+
+class ServiceInstance:
+    """Latest sample of one service on one node"""
+    __slots__ = ('node', 'service', 'reported_at', 'sampled_at', 'cpu_usage', 'memory_mb',
+                 'restarts', 'uptime_seconds', 'last_restart')
+
+    def __init__(self, node: str, service: str):
+        self.node = node
+        self.service = service
+        self.reported_at = 0.0
+        self.sampled_at = 0.0
+        self.cpu_usage = 0.0
+        self.memory_mb = 0.0
+        self.restarts = 0
+        self.uptime_seconds = 0
+        self.last_restart: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        return "running" if self.uptime_seconds > 0 else "stopped"
+
+
+class ServiceSeries:
+    """Rollups of one service across every node running it"""
+    __slots__ = ('cpu_usage', 'memory_mb', 'restarts')
+
+    def __init__(self):
+        self.cpu_usage = StatsRollup(SERVICE_TIERS)
+        self.memory_mb = StatsRollup(SERVICE_TIERS)
+        self.restarts = StatsRollup(SERVICE_TIERS)  # restarts per sample; bucket sums are restart counts
+
+
+class ServiceMetricsStore:
+    """
+    Ingests batched per-service samples from worker supervisors.
+
+    Each sample updates the (node, service) instance and is added to the
+    service's rollups at its own timestamp, so batches sent a minute late
+    still land in the right buckets. Restart counts arrive as the
+    supervisor's running total; the store records the increase between
+    consecutive samples (a drop means the supervisor restarted). Instances
+    older than `metrics_ttl` seconds are left out of current views; nodes
+    that leave the cluster are forgotten on the next snapshot.
+    """
+
+    def __init__(self, cluster: ClusterState, metrics_ttl: float = 120.0):
+        self.cluster = cluster
+        self.metrics_ttl = metrics_ttl
+        self._lock = threading.Lock()
+        self._by_node: Dict[str, Dict[str, ServiceInstance]] = {}
+        self._by_service: Dict[str, Dict[str, ServiceInstance]] = {}
+        self._series: Dict[str, ServiceSeries] = {}
+        self._version: Optional[int] = None
+        cluster.subscribe(self.sync)
+
+    def sync(self, snapshot: ClusterSnapshot):
+        """Forgets the services of nodes that left the cluster"""
+        if snapshot.version == self._version:
+            return
+        with self._lock:
+            for node in [n for n in self._by_node if n not in snapshot.nodes]:
+                for name in self._by_node.pop(node):
+                    self._by_service[name].pop(node, None)
+            self._version = snapshot.version
+
+    def record(self, node: str, services: Dict[str, Sequence[ServiceSample]]) -> bool:
+        """Stores a batch of samples from one node; False when the node is not in the cluster"""
+        if node not in self.cluster.snapshot().nodes:
+            return False
+        now = time.time()
+        with self._lock:
+            node_services = self._by_node.setdefault(node, {})
+            for name, rows in services.items():
+                series = self._series.get(name)
+                if series is None:
+                    series = self._series[name] = ServiceSeries()
+                instance = node_services.get(name)
+                if instance is None:
+                    instance = node_services[name] = ServiceInstance(node, name)
+                    self._by_service.setdefault(name, {})[node] = instance
+                    baseline = None
+                else:
+                    baseline = instance.restarts
+                for ts, cpu_usage, memory_mb, restarts, uptime_seconds in sorted(rows):
+                    ts = min(ts, now)  # clock skew
+                    if ts <= instance.sampled_at:
+                        continue  # resent sample
+                    if baseline is None:
+                        delta = 0  # first sample: earlier restarts are not attributable
+                    else:
+                        delta = restarts - baseline if restarts >= baseline else restarts
+                    baseline = restarts
+                    if delta:
+                        instance.last_restart = ts
+                    instance.sampled_at = ts
+                    instance.cpu_usage = cpu_usage
+                    instance.memory_mb = memory_mb
+                    instance.restarts = restarts
+                    instance.uptime_seconds = uptime_seconds
+                    series.cpu_usage.add(cpu_usage, ts)
+                    series.memory_mb.add(memory_mb, ts)
+                    series.restarts.add(delta, ts)
+                instance.reported_at = now
+            return True
+
+    def _fresh(self, instances: Dict[str, ServiceInstance], now: float) -> List[ServiceInstance]:
+        cutoff = now - self.metrics_ttl
+        return [i for i in instances.values() if i.reported_at >= cutoff]
+
+    @staticmethod
+    def _model(instance: ServiceInstance) -> ServiceMetrics:
+        return ServiceMetrics(
+            service_name=instance.service,
+            worker_id=f"wkr-{instance.node}",
+            status=instance.status,
+            cpu_usage=instance.cpu_usage,
+            memory_mb=instance.memory_mb,
+            uptime_seconds=instance.uptime_seconds,
+            restart_count=instance.restarts,
+            last_restart=(datetime.utcfromtimestamp(instance.last_restart)
+                          if instance.last_restart is not None else None),
+            timestamp=datetime.utcfromtimestamp(instance.sampled_at)
+        )
+
+    def node_services(self, node: str) -> Dict[str, Tuple[str, int, int]]:
+        """Fresh services of a node: name -> (status, restarts, uptime seconds)"""
+        with self._lock:
+            instances = self._fresh(self._by_node.get(node, {}), time.time())
+            return {i.service: (i.status, i.restarts, i.uptime_seconds) for i in instances}
+
+    def latest(self) -> List[ServiceMetrics]:
+        """Fresh samples of every service on every node"""
+        now = time.time()
+        with self._lock:
+            instances = [i for by_node in self._by_service.values() for i in self._fresh(by_node, now)]
+        instances.sort(key=lambda i: (i.service, i.node))
+        return [self._model(i) for i in instances]
+
+    def history(self, name: str, window: float) -> Optional[Dict]:
+        """
+        Latest per-node samples of a service and its rollups over the last
+        `window` seconds; None for unknown services. Raises ValueError when
+        the window is longer than the rollups keep.
+        """
+        now = time.time()
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return None
+            cpu = series.cpu_usage.window(window, now)
+            if cpu is None:
+                raise ValueError(f"Window exceeds the {series.cpu_usage.max_window}s kept for service metrics")
+            width, cpu_buckets = cpu
+            _, memory_buckets = series.memory_mb.window(window, now)
+            _, restart_buckets = series.restarts.window(window, now)
+            instances = sorted(self._fresh(self._by_service.get(name, {}), now), key=lambda i: i.node)
+
+        memory_by_start = {b.start: b for b in memory_buckets}
+        restarts_by_start = {b.start: b for b in restart_buckets}
+        points = []
+        for c in cpu_buckets:
+            m = memory_by_start[c.start]
+            points.append({
+                'timestamp': datetime.utcfromtimestamp(c.start),
+                'samples': c.count,
+                'avg_cpu_usage': round(c.total / c.count, 2),
+                'max_cpu_usage': round(c.max, 2),
+                'avg_memory_mb': round(m.total / m.count, 2),
+                'max_memory_mb': round(m.max, 2),
+                'restarts': int(restarts_by_start[c.start].total),
+            })
+
+        samples = sum(c.count for c in cpu_buckets)
+        summary = {'samples': samples, 'restarts': int(sum(b.total for b in restart_buckets))}
+        if samples:
+            summary.update(
+                avg_cpu_usage=round(sum(c.total for c in cpu_buckets) / samples, 2),
+                max_cpu_usage=round(max(c.max for c in cpu_buckets), 2),
+                avg_memory_mb=round(sum(m.total for m in memory_buckets) / samples, 2),
+                max_memory_mb=round(max(m.max for m in memory_buckets), 2),
+            )
+        return {
+            'name': name,
+            'resolution_seconds': width,
+            'instances': [self._model(i) for i in instances],
+            'series': points,
+            **summary
+        }
+
+
+_service_metrics: Optional[ServiceMetricsStore] = None
+
+
+def get_service_metrics(cluster: ClusterState = Depends(get_cluster_state)) -> ServiceMetricsStore:
+    """Process-wide ServiceMetricsStore (FastAPI dependency)"""
+    global _service_metrics
+    if _service_metrics is None:
+        _service_metrics = ServiceMetricsStore(cluster, metrics_ttl=settings.node_metrics_ttl)
+    return _service_metrics
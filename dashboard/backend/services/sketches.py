@@ -0,0 +1,229 @@
+"""
+Mergeable summaries for fleet analytics
+DDSketch-style quantile sketches, time-tiered rollups of them (and of plain
+count/sum/min/max stats), and a lazily invalidated heap for top-K queries
+"""
+
+import heapq
+import math
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative-error guarantees (DDSketch, Masson et al.).
+
+    Values land in logarithmic buckets, so any quantile is returned within
+    `relative_accuracy` of the true value. Sketches with the same accuracy
+    merge by adding bucket counts, and counts may be negative-adjusted to
+    remove a value that was added before.
+    """
+    __slots__ = ('relative_accuracy', '_log_gamma', '_buckets', '_zero', 'count')
+
+    MIN_VALUE = 1e-6
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+
+    def add(self, value: float, weight: int = 1):
+        """Adds `value` (negative weight removes it); values below MIN_VALUE count as zero"""
+        self.count += weight
+        if value < self.MIN_VALUE:
+            self._zero += weight
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        total = self._buckets.get(key, 0) + weight
+        if total:
+            self._buckets[key] = total
+        else:
+            self._buckets.pop(key, None)
+
+    def merge(self, other: "DDSketch"):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self._zero += other._zero
+        for key, n in other._buckets.items():
+            total = self._buckets.get(key, 0) + n
+            if total:
+                self._buckets[key] = total
+            else:
+                self._buckets.pop(key, None)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), or None when empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self._buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+
+class RollupSketch:
+    """
+    DDSketches bucketed by time at several resolutions (tiers).
+
+    `tiers` are (bucket seconds, bucket count) pairs from fine to coarse;
+    every value goes into the current bucket of each tier. A window query
+    merges the buckets of the finest tier that covers it.
+    """
+    __slots__ = ('tiers', 'relative_accuracy', '_buckets')
+
+    def __init__(self, tiers: Sequence[Tuple[int, int]], relative_accuracy: float = 0.01):
+        self.tiers = tuple(tiers)
+        self.relative_accuracy = relative_accuracy
+        self._buckets: List[Deque[Tuple[float, DDSketch]]] = [deque(maxlen=slots) for _, slots in self.tiers]
+
+    @property
+    def max_window(self) -> int:
+        return max(width * slots for width, slots in self.tiers)
+
+    def add(self, value: float, now: float):
+        for (width, _), buckets in zip(self.tiers, self._buckets):
+            start = now - now % width
+            if not buckets or buckets[-1][0] != start:
+                buckets.append((start, DDSketch(self.relative_accuracy)))
+            buckets[-1][1].add(value)
+
+    def window(self, seconds: float, now: float) -> Optional[DDSketch]:
+        """Merged sketch of the last `seconds`, or None when no tier reaches that far back"""
+        for (width, slots), buckets in zip(self.tiers, self._buckets):
+            if width * slots >= seconds:
+                merged = DDSketch(self.relative_accuracy)
+                cutoff = now - seconds
+                for start, sketch in buckets:
+                    if start + width > cutoff:
+                        merged.merge(sketch)
+                return merged
+        return None
+
+
+class StatsBucket:
+    """Count, sum, min and max of the values in one time bucket"""
+    __slots__ = ('start', 'count', 'total', 'min', 'max')
+
+    def __init__(self, start: float):
+        self.start = start
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class StatsRollup:
+    """
+    Count/sum/min/max buckets at several resolutions, with the same tiers as
+    RollupSketch. Used where a time series is wanted rather than quantiles.
+    """
+    __slots__ = ('tiers', '_buckets')
+
+    def __init__(self, tiers: Sequence[Tuple[int, int]]):
+        self.tiers = tuple(tiers)
+        self._buckets: List[Deque[StatsBucket]] = [deque(maxlen=slots) for _, slots in self.tiers]
+
+    @property
+    def max_window(self) -> int:
+        return max(width * slots for width, slots in self.tiers)
+
+    def add(self, value: float, now: float):
+        """
+        Adds a value observed at time `now`. Late values (batched reports)
+        go into their own bucket as long as the tier still keeps that far back.
+        """
+        for (width, _), buckets in zip(self.tiers, self._buckets):
+            start = now - now % width
+            if not buckets or buckets[-1].start < start:
+                buckets.append(StatsBucket(start))
+                buckets[-1].add(value)
+                continue
+            idx = len(buckets)
+            while idx and buckets[idx - 1].start > start:
+                idx -= 1
+            if idx and buckets[idx - 1].start == start:
+                buckets[idx - 1].add(value)
+                continue
+            if len(buckets) == buckets.maxlen:
+                if idx == 0:
+                    continue  # older than anything this tier keeps
+                buckets.popleft()
+                idx -= 1
+            bucket = StatsBucket(start)
+            bucket.add(value)
+            buckets.insert(idx, bucket)
+
+    def window(self, seconds: float, now: float) -> Optional[Tuple[int, List[StatsBucket]]]:
+        """(bucket width, buckets) covering the last `seconds` from the finest tier that reaches that far"""
+        for (width, slots), buckets in zip(self.tiers, self._buckets):
+            if width * slots >= seconds:
+                cutoff = now - seconds
+                return width, [b for b in buckets if b.start + width > cutoff]
+        return None
+
+
+class TopK:
+    """
+    Largest values by key, kept in a max-heap with lazy invalidation.
+
+    Updates push a new heap entry; superseded and discarded entries are
+    skipped when read and the heap is rebuilt once it holds too many of them,
+    so `top(k)` costs O(k log n) instead of a scan over every key.
+    """
+    __slots__ = ('_values', '_heap')
+
+    def __init__(self):
+        self._values: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def update(self, key: Hashable, value: float):
+        if self._values.get(key) == value:
+            return
+        self._values[key] = value
+        heapq.heappush(self._heap, (-value, key))
+        if len(self._heap) > 4 * len(self._values) + 64:
+            self._compact()
+
+    def discard(self, key: Hashable):
+        self._values.pop(key, None)
+
+    def _compact(self):
+        self._heap = [(-value, key) for key, value in self._values.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k: int) -> List[Tuple[Hashable, float]]:
+        """Up to k (key, value) pairs, largest value first"""
+        result, popped, seen = [], [], set()
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            value, key = -entry[0], entry[1]
+            if key in seen or self._values.get(key) != value:
+                continue  # stale entry, dropped for good
+            seen.add(key)
+            popped.append(entry)
+            result.append((key, value))
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return result
@@ -0,0 +1,230 @@
+"""
+Dashboard self-instrumentation
+Counters, gauges and fixed-bucket histograms for the backend's own hot paths
+(Consul calls, metric collection, routers, serialization, stream fan-out),
+rendered in the Prometheus text exposition format at /metrics
+"""
+
+import bisect
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Seconds; covers in-process work (sub-millisecond) up to slow Consul round trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """
+    Named metric with fixed label names. Values are keyed by the label value
+    tuple and updated under a per-metric lock (uncontended in practice).
+    """
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _check(self, labels: Tuple[str, ...]):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield from self._render_value(labels, value)
+
+    def _render_value(self, labels, value) -> Iterator[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: 'Histogram', labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram. An observation is one bisect and one increment;
+    buckets are made cumulative only when rendered.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        self._check(labels)
+        index = bisect.bisect_left(self.buckets, value)  # first bound with value <= le
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[0]) if state else 0
+
+    def _render_value(self, labels, state) -> Iterator[str]:
+        counts, total = state
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+        label_text = _format_labels(self.labelnames, labels)
+        yield f"{self.name}_sum{label_text} {_format_value(total)}"
+        yield f"{self.name}_count{label_text} {cumulative}"
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable:
+    """Decorator observing each call's duration in `histogram`"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels)
+        return wrapper
+    return decorator
+
+
+class Registry:
+    """Ordered set of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def metrics(self) -> List[_Metric]:
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONSUL_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'nexus_consul_request_duration_seconds', 'ConsulService calls by method, including failures', ('method',)))
+CONSUL_ERRORS = REGISTRY.register(Counter(
+    'nexus_consul_errors_total', 'ConsulService calls that failed and returned a fallback value', ('method',)))
+CONSUL_SHORT_CIRCUITS = REGISTRY.register(Counter(
+    'nexus_consul_short_circuits_total', 'Consul requests refused without a round trip while the circuit was open'))
+CONSUL_CIRCUIT_OPEN = REGISTRY.register(Gauge(
+    'nexus_consul_circuit_open', '1 while the Consul circuit breaker is open or half-open'))
+CLUSTER_REFRESH_SECONDS = REGISTRY.register(Histogram(
+    'nexus_cluster_refresh_duration_seconds', 'Rebuilding the cluster snapshot from Consul'))
+METRICS_COLLECT_SECONDS = REGISTRY.register(Histogram(
+    'nexus_metrics_collect_duration_seconds',
+    'MetricsService.collect_system_metrics, including the 1s CPU sample',
+    buckets=(0.5, 1.0, 1.05, 1.1, 1.25, 1.5, 2.0, 3.0, 5.0, 10.0)))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'nexus_http_request_duration_seconds',
+    'Router handling time by route template (response cache hits are not included)', ('route', 'method')))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    'nexus_http_requests_total', 'Requests reaching the routers by route template and status', ('route', 'method', 'status')))
+RESPONSE_CACHE_REQUESTS = REGISTRY.register(Counter(
+    'nexus_response_cache_requests_total', 'Response cache lookups by result (hit, miss, coalesced, bypass)', ('result',)))
+JSON_RENDER_SECONDS = REGISTRY.register(Histogram(
+    'nexus_json_render_duration_seconds', 'Serializing API responses on the fast JSON path'))
+STREAM_PUBLISH_SECONDS = REGISTRY.register(Histogram(
+    'nexus_stream_publish_duration_seconds', 'Serializing and appending one update stream event, by topic scope', ('topic',)))
+STREAM_EVENTS = REGISTRY.register(Counter(
+    'nexus_stream_events_total', 'Update stream events published, by topic scope', ('topic',)))
+STREAM_CLIENTS = REGISTRY.register(Gauge(
+    'nexus_stream_clients', 'Connected update stream clients by transport (websocket, sse)', ('transport',)))
+STREAM_DELIVERIES = REGISTRY.register(Counter(
+    'nexus_stream_deliveries_total', 'Update stream messages sent to clients by transport', ('transport',)))
+WEBSOCKET_SEND_SECONDS = REGISTRY.register(Histogram(
+    'nexus_websocket_send_duration_seconds', 'Sending one message to a /ws/realtime client'))
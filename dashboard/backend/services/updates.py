@@ -0,0 +1,136 @@
+"""
+Update stream service
+Single-producer stream of topic-tagged updates fanned out to WebSocket and
+SSE clients, with a bounded replay buffer for Last-Event-ID resume
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from config import settings
+from .telemetry import STREAM_EVENTS, STREAM_PUBLISH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Topics: overview, metrics, alerts, pool:<pool>, node:<node> ('pool:*' / 'node:*' match all)
+STATIC_TOPICS = {'overview', 'metrics', 'alerts'}
+SCOPED_TOPICS = {'pool', 'node'}
+
+
+class StreamEvent:
+    """Published update, encoded once for every subscriber"""
+    __slots__ = ('id', 'topic', 'data', 'frame')
+
+    def __init__(self, event_id: int, topic: str, data: str):
+        self.id = event_id
+        self.topic = topic
+        self.data = data
+        self.frame = f"id: {event_id}\nevent: {topic}\ndata: {data}\n\n".encode()
+
+
+def topic_matches(topic: str, topics: Iterable[str]) -> bool:
+    if topic in topics:
+        return True
+    scope, _, _ = topic.partition(':')
+    return f"{scope}:*" in topics
+
+
+class UpdateStream:
+    """
+    Ordered, topic-tagged update log.
+
+    Producers call `publish` on the event loop; each event gets the next ID
+    and is serialized once. Subscribers read `since(last_id)` from the replay
+    buffer and `await wait(...)` for more, so a slow client never blocks the
+    producer and many clients cost one serialization per update.
+    """
+
+    def __init__(self, replay_size: int = 4096):
+        self._buffer: Deque[StreamEvent] = deque(maxlen=replay_size)
+        self._latest: Dict[str, StreamEvent] = {}
+        self._last_id = 0
+        self._wake = asyncio.Event()
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, topic: str, data: Any, only_if_changed: bool = False) -> Optional[StreamEvent]:
+        """Appends an update (JSON-serializable `data`); with only_if_changed, skips repeats"""
+        start = time.perf_counter()
+        scope = topic.partition(':')[0]  # node:<node> would be one series per node
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        if only_if_changed:
+            previous = self._latest.get(topic)
+            if previous is not None and previous.data == payload:
+                STREAM_PUBLISH_SECONDS.observe(time.perf_counter() - start, scope)
+                return None
+        self._last_id += 1
+        event = StreamEvent(self._last_id, topic, payload)
+        self._buffer.append(event)
+        self._latest[topic] = event
+        self._wake.set()
+        self._wake = asyncio.Event()
+        STREAM_EVENTS.inc(scope)
+        STREAM_PUBLISH_SECONDS.observe(time.perf_counter() - start, scope)
+        return event
+
+    def mirror(self, event_id: int, topic: str, data: str) -> StreamEvent:
+        """Appends an event relayed from another process's stream, keeping its ID"""
+        if event_id <= self._last_id:
+            self._latest.clear()  # the source restarted and its IDs with it
+        if event_id != self._last_id + 1:
+            self._buffer.clear()  # since() needs contiguous IDs; older cursors get a reset
+        self._last_id = event_id
+        event = StreamEvent(event_id, topic, data)
+        self._buffer.append(event)
+        self._latest[topic] = event
+        self._wake.set()
+        self._wake = asyncio.Event()
+        STREAM_EVENTS.inc(topic.partition(':')[0])
+        return event
+
+    def reset(self):
+        """Drops the replay buffer, so every subscriber cursor resets (the relayed source reset)"""
+        self._buffer.clear()
+
+    def since(self, last_id: int) -> Optional[List[StreamEvent]]:
+        """Events after `last_id`, or None when they are no longer buffered (client must reset)"""
+        if last_id == self._last_id:
+            return []
+        if last_id > self._last_id or not self._buffer:
+            return None  # IDs from before a restart
+        start = last_id - self._buffer[0].id + 1
+        if start < 0:
+            return None
+        return list(itertools.islice(self._buffer, start, None))
+
+    def latest(self, topics: Iterable[str]) -> List[StreamEvent]:
+        """Most recent event of every matching topic, in publish order"""
+        topics = set(topics)
+        return sorted((e for t, e in self._latest.items() if topic_matches(t, topics)), key=lambda e: e.id)
+
+    async def wait(self, last_id: int, timeout: float):
+        """Returns once an event newer than `last_id` exists, or after `timeout` seconds"""
+        if self._last_id > last_id:
+            return
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+_update_stream: Optional[UpdateStream] = None
+
+
+def get_update_stream() -> UpdateStream:
+    """Process-wide UpdateStream (FastAPI dependency)"""
+    global _update_stream
+    if _update_stream is None:
+        _update_stream = UpdateStream(replay_size=settings.stream_replay_size)
+    return _update_stream
@@ -60,28 +60,32 @@ async function loadDashboardData() {
     
     isLoading = true;
     try {
-        await Promise.all([
-            loadOverview(),
-            loadManagers(),
-            loadWorkers()
-        ]);
+        // One request for the whole page: overview, managers and workers
+        const response = await fetch(`${API_BASE}/api/nodes/?include_overview=true`);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const data = await response.json();
+        
+        renderOverview(data.overview);
+        renderManagers(data.managers);
+        renderWorkers(data.workers);
         
         updateLastUpdateTime();
         debouncedLog('info', 'Dashboard data refreshed');
     } catch (error) {
         console.error('[Dashboard] Load error:', error);
         debouncedLog('error', `Failed to load data: ${error.message}`);
+        document.getElementById('managers-grid').innerHTML =
+            '<div class="error-state">Failed to load managers</div>';
+        document.getElementById('workers-grid').innerHTML =
+            '<div class="error-state">Failed to load workers</div>';
     } finally {
         isLoading = false;
     }
 }
 
-// Load overview metrics
-async function loadOverview() {
+// Render overview metrics
+function renderOverview(data) {
     try {
-        const response = await fetch(`${API_BASE}/api/analytics/overview`);
-        const data = await response.json();
-        
         // Update overview cards
         document.getElementById('managers-count').textContent = data.healthy_managers;
         document.getElementById('managers-healthy').textContent = data.healthy_managers;
@@ -99,19 +103,20 @@ async function loadOverview() {
         const healthEl = document.getElementById('cluster-health');
         healthEl.textContent = data.cluster_health.toUpperCase();
         healthEl.className = `metric-large status-indicator ${data.cluster_health}`;
+        // Consul unavailable: the counts are from the last known cluster state
+        if (data.stale) {
+            healthEl.textContent += ` (STALE ${Math.round(data.snapshot_age_seconds)}s)`;
+        }
+        healthEl.title = data.stale ? 'Consul unavailable: showing the last known cluster state' : '';
         
     } catch (error) {
         console.error('[Dashboard] Overview error:', error);
     }
 }
 
-// Load managers
-async function loadManagers() {
+// Render managers
+function renderManagers(managers) {
     try {
-        const response = await fetch(`${API_BASE}/api/managers/`);
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        const managers = await response.json();
-        
         const grid = document.getElementById('managers-grid');
         if (!managers || managers.length === 0) {
             grid.innerHTML = '<div class="empty-state">No managers found</div>';
@@ -136,13 +141,9 @@ async function loadManagers() {
     }
 }
 
-// Load workers
-async function loadWorkers() {
+// Render workers
+function renderWorkers(workers) {
     try {
-        const response = await fetch(`${API_BASE}/api/workers/`);
-        if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        const workers = await response.json();
-        
         const grid = document.getElementById('workers-grid');
         if (!workers || workers.length === 0) {
             grid.innerHTML = '<div class="empty-state">No workers found</div>';
@@ -183,23 +184,23 @@ function createManagerCard(manager) {
             <div class="node-metrics">
                 <div class="metric-item">
                     <div class="metric-label">CPU</div>
-                    <div class="metric-value">${manager.cpu_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(manager.cpu_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${manager.cpu_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${manager.cpu_usage || 0}%"></div>
                     </div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Memory</div>
-                    <div class="metric-value">${manager.memory_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(manager.memory_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${manager.memory_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${manager.memory_usage || 0}%"></div>
                     </div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Disk</div>
-                    <div class="metric-value">${manager.disk_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(manager.disk_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${manager.disk_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${manager.disk_usage || 0}%"></div>
                     </div>
                 </div>
             </div>
@@ -229,23 +230,23 @@ function createWorkerCard(worker) {
             <div class="node-metrics">
                 <div class="metric-item">
                     <div class="metric-label">CPU</div>
-                    <div class="metric-value">${worker.cpu_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(worker.cpu_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${worker.cpu_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${worker.cpu_usage || 0}%"></div>
                     </div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Memory</div>
-                    <div class="metric-value">${worker.memory_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(worker.memory_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${worker.memory_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${worker.memory_usage || 0}%"></div>
                     </div>
                 </div>
                 <div class="metric-item">
                     <div class="metric-label">Disk</div>
-                    <div class="metric-value">${worker.disk_usage.toFixed(1)}%</div>
+                    <div class="metric-value">${formatPercent(worker.disk_usage)}</div>
                     <div class="metric-bar">
-                        <div class="metric-bar-fill" style="width: ${worker.disk_usage}%"></div>
+                        <div class="metric-bar-fill" style="width: ${worker.disk_usage || 0}%"></div>
                     </div>
                 </div>
             </div>
@@ -275,7 +276,13 @@ function applyFilters() {
 }
 
 // Utility functions
+// Node metrics are null until the node reports them
+function formatPercent(value) {
+    return value == null ? '—' : `${value.toFixed(1)}%`;
+}
+
 function formatUptime(seconds) {
+    if (seconds == null) return '—';
     const days = Math.floor(seconds / 86400);
     const hours = Math.floor((seconds % 86400) / 3600);
     const mins = Math.floor((seconds % 3600) / 60);
@@ -1,5 +1,6 @@
-// WebSocket real-time updates
+// WebSocket real-time updates (Server-Sent Events fallback)
 let ws = null;
+let eventSource = null;
 window.wsConnected = false;
 let reconnectTimer = null;
 let reconnectAttempts = 0;
@@ -7,7 +8,7 @@ const MAX_RECONNECT_ATTEMPTS = 5;
 const RECONNECT_DELAY = 5000;
 
 function toggleRealtime() {
-    if (ws && ws.readyState === WebSocket.OPEN) {
+    if ((ws && ws.readyState === WebSocket.OPEN) || eventSource) {
         disconnectWebSocket();
     } else {
         connectWebSocket();
@@ -54,11 +55,41 @@ function connectWebSocket() {
                 connectWebSocket();
             }, delay);
         } else {
-            debouncedLog('error', 'Max reconnection attempts reached');
+            debouncedLog('warn', 'WebSocket unavailable, falling back to Server-Sent Events');
+            connectEventStream();
         }
     };
 }
 
+// Same updates over SSE for proxies that break WebSockets; EventSource
+// reconnects by itself and resumes with Last-Event-ID
+function connectEventStream() {
+    if (eventSource) return;
+    eventSource = new EventSource(`${API_BASE}/api/stream/?topics=metrics,alerts`);
+    
+    eventSource.onopen = () => {
+        window.wsConnected = true;
+        updateConnectionStatus('Connected (SSE)', true);
+    };
+    
+    const onUpdate = (event) => {
+        try {
+            handleRealtimeUpdate(JSON.parse(event.data));
+        } catch (error) {
+            console.error('[SSE] Parse error:', error);
+        }
+    };
+    eventSource.addEventListener('metrics', onUpdate);
+    eventSource.addEventListener('alerts', onUpdate);
+    // Missed more than the server buffers: reload the full page state
+    eventSource.addEventListener('reset', () => loadDashboardData());
+    
+    eventSource.onerror = () => {
+        window.wsConnected = false;
+        updateConnectionStatus('Reconnecting', false);
+    };
+}
+
 function updateConnectionStatus(text, connected) {
     const statusEl = document.getElementById('realtime-status');
     const connEl = document.getElementById('connection-status');
@@ -82,6 +113,12 @@ function disconnectWebSocket() {
         ws.close();
         ws = null;
     }
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+        window.wsConnected = false;
+        updateConnectionStatus('Disconnected', false);
+    }
 }
 
 function handleRealtimeUpdate(data) {
@@ -813,7 +813,7 @@ setup_manager() {
     
     # Copy nexus files
     mkdir -p "$NEXUS_HOME"
-    for f in nexus.py inventory.yml services.yml bootstrap_worker.sh run-services.sh services.py proc_ipc.py; do
+    for f in nexus.py nexus_*.py inventory.yml services.yml bootstrap_worker.sh run-services.sh services.py proc_ipc.py; do
         [ -f "$f" ] && cp "$f" "$NEXUS_HOME/" || warn "$f not found, skipping"
     done
     
@@ -1016,7 +1016,7 @@ setup_both() {
     mkdir -p "$NEXUS_HOME"
     
     # Copy core files
-    for f in nexus.py inventory.yml services.yml bootstrap_worker.sh run-services.sh services.py proc_ipc.py; do
+    for f in nexus.py nexus_*.py inventory.yml services.yml bootstrap_worker.sh run-services.sh services.py proc_ipc.py; do
         [ -f "$f" ] && cp "$f" "$NEXUS_HOME/" || warn "$f not found"
     done
     
@@ -3,34 +3,55 @@
 nexus.py - Krutrim Nexus Ops Manager
 """
 
-import argparse
-import yaml
 import os
-import subprocess
 import sys
 
+# Modules are imported inside the subcommands that need them, so `--help` and
+# short commands stay cheap (see benchmarks/cli_startup.py)
+
 NEXUS_HOME = "/opt/nexus"
-INVENTORY = f"{NEXUS_HOME}/inventory.yml"
+INVENTORY = os.environ.get("NEXUS_INVENTORY", f"{NEXUS_HOME}/inventory.yml")
 
-def load_inventory():
-    if not os.path.exists(INVENTORY):
-        print(f"Error: {INVENTORY} not found.")
+def load_inventory(source=None):
+    """Loads the indexed inventory from a YAML file or, with 'consul', the Consul catalog."""
+    from nexus_inventory import load
+    source = source or INVENTORY
+    if source != "consul" and not os.path.exists(source):
+        print(f"Error: {source} not found.")
+        sys.exit(1)
+    try:
+        return load(source)
+    except (OSError, ValueError) as e:
+        print(f"Error: failed to load inventory from {source}: {e}")
         sys.exit(1)
-    with open(INVENTORY, 'r') as f:
-        return yaml.safe_load(f)
+
+def select_hosts(args, pattern):
+    """Hosts matching `pattern`, narrowed by --limit."""
+    inventory = load_inventory(args.inventory)
+    hosts = inventory.select(pattern)
+    if args.limit:
+        allowed = {h.name for h in inventory.select(args.limit)}
+        hosts = [h for h in hosts if h.name in allowed]
+    return hosts
+
+def ssh_dest(host):
+    return host if "@" in host else f"root@{host}"
 
 def run_remote(host, cmd):
+    import subprocess
+    from nexus_fleet import control_opts
     print(f"[{host}] EXEC: {cmd}")
-    subprocess.run(["ssh", "-o", "StrictHostKeyChecking=no", f"root@{host}", cmd], check=True)
+    subprocess.run(["ssh", "-o", "StrictHostKeyChecking=no", *control_opts(), ssh_dest(host), cmd], check=True)
 
 def push_file(host, src, dest):
+    import subprocess
+    from nexus_fleet import control_opts
     print(f"[{host}] PUSH: {src} -> {dest}")
-    subprocess.run(["scp", "-o", "StrictHostKeyChecking=no", src, f"root@{host}:{dest}"], check=True)
+    subprocess.run(["scp", "-o", "StrictHostKeyChecking=no", *control_opts(), src, f"{ssh_dest(host)}:{dest}"], check=True)
 
 def bootstrap(args):
     """Bootstraps all workers."""
-    data = load_inventory()
-    workers = data.get('workers', [])
+    workers = [h.target for h in select_hosts(args, 'workers')]
     for worker in workers:
         print(f"\n--- Bootstrapping {worker} ---")
         try:
@@ -47,9 +68,19 @@ def bootstrap(args):
         except Exception as e:
             print(f"Error: {e}")
 
+def resolve_targets(args):
+    """Hosts matching the target pattern; an unknown target is taken as a literal host."""
+    if args.inventory == "consul" or os.path.exists(args.inventory or INVENTORY):
+        hosts = select_hosts(args, args.target)
+        if hosts:
+            return hosts
+    from nexus_inventory import Host
+    return [Host(name=args.target, address=args.target)]
+
 def deploy(args):
-    """Deploys a service."""
-    target = args.target
+    """Deploys a service, rolling through the hosts when the target is a group."""
+    from nexus_rollout import RolloutHalted, make_health_check, rolling_deploy
+
     service = args.service
     script = f"setup-{service}.sh"
     src_path = f"{NEXUS_HOME}/{script}"
@@ -58,13 +89,41 @@ def deploy(args):
         print(f"Script {script} not found.")
         return
 
-    print(f"Deploying {service} to {target}...")
+    hosts = resolve_targets(args)
+    targets = {h.address: h.target for h in hosts}
+    cmd_args = " ".join(args.args)
+
+    def deploy_host(address):
+        push_file(targets[address], src_path, f"/tmp/{script}")
+        run_remote(targets[address], f"chmod +x /tmp/{script} && /tmp/{script} {cmd_args}")
+
+    print(f"Deploying {service} to {args.target} ({len(hosts)} host(s))...")
     try:
-        push_file(target, src_path, f"/tmp/{script}")
-        cmd_args = " ".join(args.args)
-        run_remote(target, f"chmod +x /tmp/{script} && /tmp/{script} {cmd_args}")
-    except Exception as e:
+        results = rolling_deploy(
+            list(targets), deploy_host,
+            health_check=make_health_check(args.health_check, service),
+            batch_size=args.batch_size,
+            max_unavailable=args.max_unavailable,
+            max_failures=args.max_failures,
+            health_timeout=args.health_timeout,
+        )
+    except RolloutHalted as e:
+        reason, results = e.args
+        print(f"\nRollout HALTED: {reason}")
+        print_rollout_summary(results)
+        sys.exit(1)
+    except ValueError as e:
         print(f"Error: {e}")
+        sys.exit(1)
+    print_rollout_summary(results)
+    if "failed" in results.values():
+        sys.exit(1)
+
+def print_rollout_summary(results):
+    for state in ("ok", "failed", "skipped"):
+        hosts = [h for h, s in results.items() if s == state]
+        if hosts:
+            print(f"  {state}: {len(hosts)} ({', '.join(hosts)})")
 
 def create_user(args):
     target = args.target
@@ -79,8 +138,7 @@ def create_user(args):
         print(f"Error: {e}")
 
 def sync(args):
-    data = load_inventory()
-    for worker in data.get('workers', []):
+    for worker in [h.target for h in select_hosts(args, 'workers')]:
         try:
             push_file(worker, f"{NEXUS_HOME}/services.yml", "/opt/nexus/services.yml")
             run_remote(worker, "systemctl restart nexus-agent")
@@ -89,14 +147,15 @@ def sync(args):
 
 def monitor(args):
     """Sets up monitoring on Manager and all Workers."""
+    import subprocess
     print(">>> Setting up Manager Monitoring (Parent)...")
     subprocess.run([f"{NEXUS_HOME}/setup-monitoring.sh"], check=False)
     
-    manager_ip = subprocess.getoutput("hostname -I | awk '{print $1}'")
+    from nexus_facts import local_facts
+    manager_ip = local_facts().get("primary_ip") or "127.0.0.1"
     print(f"Manager IP detected as: {manager_ip}")
     
-    data = load_inventory()
-    workers = data.get('workers', [])
+    workers = [h.target for h in select_hosts(args, 'workers')]
     for worker in workers:
         print(f">>> Setting up Worker {worker} (Child)...")
         try:
@@ -107,16 +166,104 @@ def monitor(args):
             
     print(f"\n>>> Dashboard available at: http://{manager_ip}:19999")
 
-def main():
+def exec_command(args):
+    """Runs an ad-hoc command on the selected hosts in parallel."""
+    from nexus_fleet import print_summary, run_parallel
+
+    hosts = select_hosts(args, args.pattern)
+    if not hosts:
+        print(f"No hosts match {args.pattern}.")
+        sys.exit(1)
+    cmd = " ".join(args.command)
+    if not cmd:
+        print("No command given.")
+        sys.exit(1)
+    print(f"Running on {len(hosts)} host(s): {cmd}")
+    results = run_parallel([(h.name, h.target) for h in hosts], cmd,
+                           forks=args.forks, timeout=args.timeout, stream=not args.quiet)
+    print_summary(results)
+    if any(r.returncode != 0 for r in results.values()):
+        sys.exit(1)
+
+def facts(args):
+    """Gathers (or reads cached) facts for the selected hosts."""
+    import json
+    from nexus_facts import gather, local_agent_version
+
+    hosts = select_hosts(args, args.pattern)
+    results = gather([(h.name, h.target) for h in hosts], max_age=args.max_age,
+                     refresh=args.refresh, forks=args.forks)
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    current = local_agent_version(NEXUS_HOME)
+    print(f"{'HOST':<20} {'OS':<28} {'KERNEL':<20} {'CPU':>4} {'MEM GB':>7} {'AGENT':<14}")
+    for name in sorted(results):
+        f = results[name]
+        if "error" in f:
+            print(f"{name:<20} ERROR: {f['error']}")
+            continue
+        mem = f"{(f.get('mem_total_kb') or 0) / 1048576:.1f}"
+        agent_version = f.get("agent_version") or "-"
+        if current and agent_version not in ("-", current):
+            agent_version += " (stale)"
+        print(f"{name:<20} {f.get('os', '-')[:28]:<28} {f.get('kernel', '-')[:20]:<20} "
+              f"{f.get('cpu_count') or '-':>4} {mem:>7} {agent_version:<14}")
+    if any("error" in f for f in results.values()):
+        sys.exit(1)
+
+def agent(args):
+    """Runs the persistent local agent in the foreground."""
+    # Preloaded here so every forked child starts with them imported
+    import nexus_agent
+    import nexus_facts
+    import nexus_fleet
+    import nexus_inventory
+    import nexus_rollout
+
+    def warm():
+        source = args.inventory or INVENTORY
+        if source != "consul" and os.path.exists(source):
+            nexus_inventory.load_file(source)
+
+    warm()
+    nexus_agent.serve(run, prepare=warm, idle_timeout=args.idle_timeout)
+
+# Commands that need a terminal or must not be forwarded to the agent
+LOCAL_ONLY = ('agent', 'create-user')
+# Top-level options that take a value (see build_parser); kept here so the
+# forwarding check does not need to import argparse
+VALUE_OPTIONS = ('-i', '--inventory', '-l', '--limit')
+
+def subcommand(argv):
+    """The subcommand name: the first argument that is not a top-level option or its value"""
+    args = iter(argv)
+    for a in args:
+        if a in VALUE_OPTIONS:
+            next(args, None)
+        elif not a.startswith('-'):
+            return a
+    return None
+
+def build_parser():
+    import argparse
     parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--inventory', default=None, help=f"Inventory file, or 'consul' for the Consul catalog (default: {INVENTORY})")
+    parser.add_argument('-l', '--limit', default=None, help="Restrict hosts with a pattern, e.g. 'web:!db-3'")
     subparsers = parser.add_subparsers()
 
     subparsers.add_parser('bootstrap').set_defaults(func=bootstrap)
     
     p_deploy = subparsers.add_parser('deploy')
     p_deploy.add_argument('service')
-    p_deploy.add_argument('target')
+    p_deploy.add_argument('target', help="Host, inventory group or host pattern")
     p_deploy.add_argument('args', nargs='*')
+    p_deploy.add_argument('--batch-size', default="1", help="Hosts per batch, count or percentage (e.g. 2, 25%%)")
+    p_deploy.add_argument('--max-unavailable', default=None, help="Hosts allowed down at once, count or percentage (default: batch size)")
+    p_deploy.add_argument('--health-check', default=None, help="consul, consul:<service>, tcp:<port> or http://{host}:<port>/path")
+    p_deploy.add_argument('--health-timeout', type=float, default=120, help="Seconds to wait for a host to become healthy")
+    p_deploy.add_argument('--max-failures', type=int, default=0, help="Failed hosts tolerated before the rollout halts")
     p_deploy.set_defaults(func=deploy)
     
     p_user = subparsers.add_parser('create-user')
@@ -127,14 +274,47 @@ def main():
     
     subparsers.add_parser('sync').set_defaults(func=sync)
     
+    p_exec = subparsers.add_parser('exec', help="Run a command on many hosts")
+    p_exec.add_argument('pattern', help="Host pattern, e.g. 'workers' or 'web:!web-2'")
+    p_exec.add_argument('command', nargs=argparse.REMAINDER)
+    p_exec.add_argument('-f', '--forks', type=int, default=20, help="Hosts to run on concurrently")
+    p_exec.add_argument('-t', '--timeout', type=float, default=None, help="Per-host timeout in seconds")
+    p_exec.add_argument('-q', '--quiet', action='store_true', help="Only print the grouped summary")
+    p_exec.set_defaults(func=exec_command)
+
+    p_facts = subparsers.add_parser('facts', help="Show host facts (OS, kernel, CPU, memory, disks, versions)")
+    p_facts.add_argument('pattern', nargs='?', default='all', help="Host pattern (default: all)")
+    p_facts.add_argument('--refresh', action='store_true', help="Ignore the cache and re-gather")
+    p_facts.add_argument('--max-age', type=float, default=3600, help="Seconds cached facts stay valid")
+    p_facts.add_argument('-f', '--forks', type=int, default=20, help="Hosts to query concurrently")
+    p_facts.add_argument('--json', action='store_true', help="Print raw facts as JSON")
+    p_facts.set_defaults(func=facts)
+
     # New Monitor Command
     subparsers.add_parser('monitor').set_defaults(func=monitor)
 
-    args = parser.parse_args()
+    p_agent = subparsers.add_parser('agent', help="Keep inventory and SSH sessions warm for later commands")
+    p_agent.add_argument('--idle-timeout', type=float, default=None, help="Exit after this many idle seconds")
+    p_agent.set_defaults(func=agent)
+
+    return parser
+
+def run(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
     if hasattr(args, 'func'):
         args.func(args)
     else:
         parser.print_help()
 
+def main():
+    argv = sys.argv[1:]
+    if os.environ.get("NEXUS_AGENT") != "0" and subcommand(argv) not in LOCAL_ONLY:
+        from nexus_agent import forward
+        code = forward(argv)
+        if code is not None:
+            sys.exit(code)
+    run(argv)
+
 if __name__ == "__main__":
     main()
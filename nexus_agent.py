@@ -0,0 +1,181 @@
+"""
+nexus_agent.py - Optional persistent local agent for nexus.py
+Keeps modules and the parsed inventory warm in one long-lived process and
+forks a child per invocation, so short commands skip interpreter and
+inventory start-up. SSH sessions stay warm through ControlMaster
+(see nexus_fleet.SSH_CONTROL_OPTS).
+
+    nexus agent &          # start
+    nexus exec web uptime  # forwarded to the agent when its socket exists
+    NEXUS_AGENT=0 nexus …  # bypass the agent
+"""
+
+import json
+import os
+import signal
+import socket
+import sys
+from typing import Callable, List, Optional
+
+NEXUS_CACHE = os.environ.get("NEXUS_CACHE_DIR", os.path.expanduser("~/.cache/nexus"))
+AGENT_SOCKET = os.environ.get("NEXUS_AGENT_SOCKET", os.path.join(NEXUS_CACHE, "agent.sock"))
+EXIT_MARKER = b"\0nexus-exit:"
+TRAILER_MAX = len(EXIT_MARKER) + 24  # marker, exit code and newline
+# Environment forwarded from the client to the forked child
+FORWARD_ENV = ("NEXUS_INVENTORY", "NEXUS_CACHE_DIR", "CONSUL_HTTP_ADDR", "SSH_AUTH_SOCK")
+
+
+def forward(argv: List[str], path: str = AGENT_SOCKET) -> Optional[int]:
+    """
+    Runs argv inside the agent, streaming its output to our stdout.
+    Returns the exit code, or None when no agent is listening.
+    """
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    request = {"argv": argv, "cwd": os.getcwd(),
+               "env": {k: os.environ[k] for k in FORWARD_ENV if k in os.environ}}
+    sock.sendall(json.dumps(request).encode() + b"\n")
+
+    # Output may contain NULs itself: only a NUL near the end of what has
+    # arrived can start the exit trailer, so just that tail is held back
+    out = sys.stdout.buffer
+    pending = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        pending += chunk
+        start = pending.rfind(b"\0", max(0, len(pending) - TRAILER_MAX))
+        if start == -1:
+            start = len(pending)
+        out.write(pending[:start])
+        out.flush()
+        pending = pending[start:]
+    sock.close()
+    if pending.startswith(EXIT_MARKER):
+        try:
+            return int(pending[len(EXIT_MARKER):].strip() or 0)
+        except ValueError:
+            pass
+    # No trailer: the child died before reporting its exit code
+    out.write(pending)
+    out.flush()
+    return 1
+
+
+def _run_child(conn: socket.socket, request: dict, handler: Callable[[List[str]], None]) -> None:
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    code = 0
+    try:
+        os.chdir(request.get("cwd") or "/")
+        os.environ.update(request.get("env") or {})
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(conn.fileno(), 1)
+        os.dup2(conn.fileno(), 2)
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.stderr.reconfigure(line_buffering=True)
+        handler(request["argv"])
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        print(f"Error: {e}", file=sys.stderr)
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(EXIT_MARKER + str(code).encode() + b"\n")
+        except OSError:
+            pass
+        os._exit(code)
+
+
+def _probe(path: str) -> bool:
+    """True when something is accepting connections on `path`."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def serve(handler: Callable[[List[str]], None],
+          prepare: Optional[Callable[[], None]] = None,
+          path: str = AGENT_SOCKET,
+          idle_timeout: Optional[float] = None) -> None:
+    """
+    Accepts requests on a Unix socket and forks a child per request that runs
+    handler(argv) with stdout/stderr connected to the client. `prepare` runs
+    in the agent before each fork, so anything it warms up is inherited.
+    """
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    if os.path.exists(path):
+        if _probe(path):
+            print(f"Agent already running on {path}")
+            return
+        os.unlink(path)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(64)
+    listener.settimeout(idle_timeout)
+    # Children are never waited on; let the kernel reap them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    print(f"Agent listening on {path} (PID: {os.getpid()})")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                print("Agent idle, exiting.")
+                break
+            try:
+                with conn.makefile("rb") as f:
+                    request = json.loads(f.readline() or b"{}")
+                if "argv" not in request:
+                    conn.close()
+                    continue
+                if prepare:
+                    prepare()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+            except (OSError, ValueError) as e:
+                print(f"Agent request failed: {e}", file=sys.stderr)
+                conn.close()
+                continue
+            if pid == 0:
+                listener.close()
+                _run_child(conn, request, handler)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
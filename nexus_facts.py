@@ -0,0 +1,147 @@
+"""
+nexus_facts.py - Remote fact gathering with a local on-disk cache
+One SSH round trip per host collects OS, kernel, CPU, memory, disks,
+service versions and the agent version; results are cached per host under
+~/.cache/nexus/facts with a TTL so later commands can skip re-querying.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+NEXUS_CACHE = os.environ.get("NEXUS_CACHE_DIR", os.path.expanduser("~/.cache/nexus"))
+FACTS_DIR = os.path.join(NEXUS_CACHE, "facts")
+DEFAULT_MAX_AGE = 3600
+LOCAL = "local"
+
+# Files whose content defines the worker agent version (pushed by `bootstrap`)
+AGENT_FILES = ("services.py", "proc_ipc.py")
+
+FACTS_SCRIPT = r"""
+echo "hostname=$(hostname)"
+echo "primary_ip=$(hostname -I 2>/dev/null | awk '{print $1}')"
+[ -r /etc/os-release ] && . /etc/os-release
+echo "os=${PRETTY_NAME:-$(uname -s)}"
+echo "kernel=$(uname -r)"
+echo "arch=$(uname -m)"
+echo "cpu_count=$(nproc 2>/dev/null || getconf _NPROCESSORS_ONLN)"
+awk '/^MemTotal:/{print "mem_total_kb="$2} /^MemAvailable:/{print "mem_available_kb="$2}' /proc/meminfo
+echo "uptime_seconds=$(cut -d. -f1 /proc/uptime)"
+df -P -k -x tmpfs -x devtmpfs -x overlay -x squashfs 2>/dev/null | awk 'NR>1{print "disk="$6":"$2":"$3}'
+v() { command -v "$1" >/dev/null 2>&1 && echo "version.$1=$("$@" 2>&1 | head -n1)"; }
+v consul version; v docker --version; v nginx -v; v python3 --version; v unbound -V; v tor --version
+cd /opt/nexus 2>/dev/null && [ -f services.py ] && echo "agent_version=$(cat services.py proc_ipc.py 2>/dev/null | sha256sum | cut -c1-12)"
+echo "agent_state=$(systemctl is-active nexus-agent 2>/dev/null || echo unknown)"
+"""
+
+INT_FACTS = ("cpu_count", "mem_total_kb", "mem_available_kb", "uptime_seconds")
+
+
+def parse_facts(output: str) -> Dict:
+    """Parses the key=value lines printed by FACTS_SCRIPT."""
+    facts: Dict = {"disks": [], "versions": {}}
+    for line in output.splitlines():
+        key, sep, value = line.partition("=")
+        if not sep:
+            continue
+        value = value.strip()
+        if key == "disk":
+            mount, size_kb, used_kb = value.rsplit(":", 2)
+            facts["disks"].append({"mount": mount, "size_kb": int(size_kb), "used_kb": int(used_kb)})
+        elif key.startswith("version."):
+            facts["versions"][key[len("version."):]] = value
+        elif key in INT_FACTS:
+            try:
+                facts[key] = int(value)
+            except ValueError:
+                facts[key] = None
+        else:
+            facts[key] = value
+    return facts
+
+
+def local_agent_version(nexus_home: str = "/opt/nexus") -> Optional[str]:
+    """Agent version of the copy on this manager, comparable with the agent_version fact."""
+    h = hashlib.sha256()
+    try:
+        for name in AGENT_FILES:
+            with open(os.path.join(nexus_home, name), "rb") as f:
+                h.update(f.read())
+    except OSError:
+        return None
+    return h.hexdigest()[:12]
+
+
+def _path(name: str) -> str:
+    return os.path.join(FACTS_DIR, name.replace("/", "_") + ".json")
+
+
+def read_cached(name: str, max_age: float = DEFAULT_MAX_AGE) -> Optional[Dict]:
+    """Cached facts for `name`, or None when missing or older than max_age seconds."""
+    try:
+        with open(_path(name)) as f:
+            facts = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - facts.get("gathered_at", 0) > max_age:
+        return None
+    return facts
+
+
+def write_cached(name: str, facts: Dict) -> None:
+    try:
+        os.makedirs(FACTS_DIR, exist_ok=True)
+        tmp = f"{_path(name)}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(facts, f)
+        os.replace(tmp, _path(name))
+    except OSError:
+        pass
+
+
+def gather(hosts: List[Tuple[str, str]], max_age: float = DEFAULT_MAX_AGE,
+           refresh: bool = False, forks: int = 20, timeout: float = 60) -> Dict[str, Dict]:
+    """
+    Facts for every (name, ssh_target) pair. Hosts with fresh cached facts are
+    served from the cache; the rest are gathered in parallel. Hosts that could
+    not be reached map to {"error": ...} and are not cached.
+    """
+    from nexus_fleet import run_parallel
+
+    facts: Dict[str, Dict] = {}
+    stale = []
+    for name, target in hosts:
+        cached = None if refresh else read_cached(name, max_age)
+        if cached:
+            facts[name] = cached
+        else:
+            stale.append((name, target))
+
+    if stale:
+        results = run_parallel(stale, "sh -s", forks=forks, timeout=timeout,
+                               stream=False, stdin=FACTS_SCRIPT.encode())
+        for name, result in results.items():
+            if result.returncode != 0 or result.timed_out:
+                reason = "timed out" if result.timed_out else result.output.strip() or f"rc={result.returncode}"
+                facts[name] = {"error": reason}
+                continue
+            host_facts = parse_facts(result.output)
+            host_facts["gathered_at"] = time.time()
+            write_cached(name, host_facts)
+            facts[name] = host_facts
+    return facts
+
+
+def local_facts(max_age: float = DEFAULT_MAX_AGE, refresh: bool = False) -> Dict:
+    """Facts for this machine, gathered with the same script without SSH."""
+    cached = None if refresh else read_cached(LOCAL, max_age)
+    if cached:
+        return cached
+    proc = subprocess.run(["sh", "-s"], input=FACTS_SCRIPT, capture_output=True, text=True)
+    facts = parse_facts(proc.stdout)
+    facts["gathered_at"] = time.time()
+    write_cached(LOCAL, facts)
+    return facts
@@ -0,0 +1,130 @@
+"""
+nexus_fleet.py - Parallel SSH execution for nexus.py
+Runs one command on many hosts, streams host-prefixed output and groups
+identical results.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+NEXUS_CACHE = os.environ.get("NEXUS_CACHE_DIR", os.path.expanduser("~/.cache/nexus"))
+# Reuse one SSH connection per host across commands; NEXUS_SSH_PERSIST=no disables it
+SSH_PERSIST = os.environ.get("NEXUS_SSH_PERSIST", "10m")
+SSH_CONTROL_DIR = os.path.join(NEXUS_CACHE, "ssh")
+SSH_CONTROL_OPTS = [] if SSH_PERSIST == "no" else [
+    "-o", "ControlMaster=auto",
+    "-o", f"ControlPath={SSH_CONTROL_DIR}/%C",
+    "-o", f"ControlPersist={SSH_PERSIST}",
+]
+SSH_OPTS = ["-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes", "-o", "ConnectTimeout=10", *SSH_CONTROL_OPTS]
+
+
+@dataclass
+class HostResult:
+    host: str
+    returncode: int
+    output: str
+    timed_out: bool = False
+
+
+def control_opts() -> List[str]:
+    """ControlMaster options, creating the control socket directory on first use."""
+    if SSH_CONTROL_OPTS:
+        os.makedirs(SSH_CONTROL_DIR, mode=0o700, exist_ok=True)
+    return SSH_CONTROL_OPTS
+
+
+def ssh_command(target: str, cmd: str) -> List[str]:
+    control_opts()
+    return ["ssh", *SSH_OPTS, target, cmd]
+
+
+def run_host(name: str, target: str, cmd: str,
+             timeout: Optional[float] = None,
+             on_line: Optional[Callable[[str, str], None]] = None,
+             stdin: Optional[bytes] = None) -> HostResult:
+    """Runs `cmd` over SSH, calling on_line(name, line) as stdout/stderr lines arrive."""
+    try:
+        proc = subprocess.Popen(ssh_command(target, cmd),
+                                stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except OSError as e:
+        return HostResult(name, 255, f"{e}\n")
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+    try:
+        if stdin is not None:
+            try:
+                proc.stdin.write(stdin)
+                proc.stdin.close()
+            except BrokenPipeError:
+                # ssh exited early (e.g. host unreachable); its output says why
+                pass
+        lines = []
+        for raw in proc.stdout:
+            line = raw.decode(errors="replace")
+            lines.append(line)
+            if on_line:
+                on_line(name, line.rstrip("\n"))
+        proc.wait()
+    finally:
+        if timer:
+            timer.cancel()
+    return HostResult(name, proc.returncode, "".join(lines), timed_out.is_set())
+
+
+def run_parallel(hosts: List[Tuple[str, str]], cmd: str,
+                 forks: int = 20,
+                 timeout: Optional[float] = None,
+                 stream: bool = True,
+                 stdin: Optional[bytes] = None) -> Dict[str, HostResult]:
+    """
+    Runs `cmd` on every (name, ssh_target) pair, at most `forks` at a time.
+    With `stream`, output lines are printed live as '[name] line'.
+    """
+    lock = threading.Lock()
+
+    def printer(name: str, line: str) -> None:
+        with lock:
+            sys.stdout.write(f"[{name}] {line}\n")
+            sys.stdout.flush()
+
+    on_line = printer if stream else None
+    with ThreadPoolExecutor(max_workers=max(1, min(forks, len(hosts) or 1))) as pool:
+        futures = [pool.submit(run_host, name, target, cmd, timeout, on_line, stdin) for name, target in hosts]
+        results = [f.result() for f in futures]
+    return {r.host: r for r in results}
+
+
+def group_results(results: Dict[str, HostResult]) -> List[Tuple[HostResult, List[str]]]:
+    """Groups hosts with identical (exit code, output), largest group first."""
+    groups: Dict[Tuple[int, bool, str], List[str]] = {}
+    samples: Dict[Tuple[int, bool, str], HostResult] = {}
+    for name, result in results.items():
+        key = (result.returncode, result.timed_out, result.output)
+        groups.setdefault(key, []).append(name)
+        samples.setdefault(key, result)
+    ordered = sorted(groups.items(), key=lambda kv: (-len(kv[1]), kv[0][0]))
+    return [(samples[key], sorted(names)) for key, names in ordered]
+
+
+def print_summary(results: Dict[str, HostResult], max_hosts: int = 10) -> None:
+    for sample, names in group_results(results):
+        shown = ", ".join(names[:max_hosts]) + (f", ... (+{len(names) - max_hosts})" if len(names) > max_hosts else "")
+        state = "timed out" if sample.timed_out else f"rc={sample.returncode}"
+        print(f"\n=== {len(names)} host(s) returned {state}: {shown}")
+        output = sample.output.rstrip("\n")
+        print(output if output else "(no output)")
@@ -0,0 +1,240 @@
+"""
+nexus_inventory.py - Structured inventory for nexus.py
+Groups, host variables, host patterns and a Consul-backed dynamic inventory.
+The parsed and indexed inventory is cached on disk, keyed on the source file.
+
+inventory.yml:
+
+    manager: [localhost]              # flat lists are groups (legacy format)
+    workers: [192.168.1.101]
+    groups:
+      web:
+        vars: {ssh_user: deploy}
+        hosts:
+          web-1: {address: 10.0.0.11}
+          web-2: {address: 10.0.0.12, ssh_user: root}
+          web-3: 10.0.0.13            # a plain value is the address
+      database:
+        hosts: [10.0.0.31]
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import pickle
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+NEXUS_CACHE = os.environ.get("NEXUS_CACHE_DIR", os.path.expanduser("~/.cache/nexus"))
+CONSUL_ADDR = os.environ.get("CONSUL_HTTP_ADDR", "http://127.0.0.1:8500")
+if "://" not in CONSUL_ADDR:
+    CONSUL_ADDR = f"http://{CONSUL_ADDR}"
+
+# Pools understood by the dashboard (WorkerPool); Consul service tags map onto them
+POOL_TAGS = ("web", "api", "database", "worker")
+CACHE_VERSION = 1
+CONSUL_TTL = 60
+
+# In-process memo, so a long-lived agent (nexus_agent) skips even the pickle
+_loaded: Dict[str, tuple] = {}
+
+
+@dataclass
+class Host:
+    name: str
+    address: str
+    vars: Dict = field(default_factory=dict)
+    groups: FrozenSet[str] = frozenset()
+
+    @property
+    def target(self) -> str:
+        """SSH destination, honouring the ssh_user variable."""
+        return f"{self.vars.get('ssh_user', 'root')}@{self.address}"
+
+
+class Inventory:
+    """Hosts plus a group -> host-name index used for pattern selection."""
+
+    def __init__(self, hosts: Dict[str, Host], groups: Dict[str, FrozenSet[str]]):
+        self.hosts = hosts
+        self.groups = groups
+        self._by_address = {h.address: h.name for h in hosts.values()}
+
+    def group(self, name: str) -> List[Host]:
+        return [self.hosts[n] for n in sorted(self.groups.get(name, ()))]
+
+    def _match(self, term: str) -> FrozenSet[str]:
+        if term in ("all", "*"):
+            return frozenset(self.hosts)
+        if term in self.groups:
+            return self.groups[term]
+        if term in self.hosts:
+            return frozenset((term,))
+        if term in self._by_address:
+            return frozenset((self._by_address[term],))
+        if any(c in term for c in "*?["):
+            names = {n for n in self.groups if fnmatch.fnmatchcase(n, term)}
+            matched = set().union(*(self.groups[n] for n in names)) if names else set()
+            matched.update(n for n, h in self.hosts.items()
+                           if fnmatch.fnmatchcase(n, term) or fnmatch.fnmatchcase(h.address, term))
+            return frozenset(matched)
+        return frozenset()
+
+    def select(self, pattern: str) -> List[Host]:
+        """
+        Selects hosts with an Ansible-style pattern: terms separated by ':' or ','
+        are unioned, '&term' intersects and '!term' excludes, e.g. 'web:api:!db-3'.
+        Terms are group names, host names, addresses or globs.
+        """
+        include, intersect, exclude = set(), [], set()
+        for term in pattern.replace(",", ":").split(":"):
+            term = term.strip()
+            if not term:
+                continue
+            if term.startswith("!"):
+                exclude |= self._match(term[1:])
+            elif term.startswith("&"):
+                intersect.append(self._match(term[1:]))
+            else:
+                include |= self._match(term)
+        for names in intersect:
+            include &= names
+        return [self.hosts[n] for n in sorted(include - exclude)]
+
+
+def _add(hosts, members, group, name, address=None, host_vars=None, group_vars=None):
+    host = hosts.get(name)
+    if host is None:
+        host = hosts[name] = Host(name=name, address=name)
+    merged = dict(group_vars or {})
+    merged.update(host.vars)
+    merged.update(host_vars or {})
+    host.vars = merged
+    host.address = str(merged.pop("address", address or host.address))
+    members.setdefault(group, set()).add(name)
+
+
+def build(data: Dict) -> Inventory:
+    """Builds an indexed Inventory from parsed inventory.yml data."""
+    hosts: Dict[str, Host] = {}
+    members: Dict[str, set] = {}
+    for key, value in (data or {}).items():
+        if isinstance(value, list):
+            for name in value:
+                if name:
+                    _add(hosts, members, key, str(name))
+    for group, spec in ((data or {}).get("groups") or {}).items():
+        spec = spec or {}
+        group_vars = spec.get("vars") or {}
+        entries = spec.get("hosts") or {}
+        if isinstance(entries, list):
+            entries = {str(n): None for n in entries if n}
+        for name, host_vars in entries.items():
+            address = None
+            if isinstance(host_vars, (str, int, float)) and not isinstance(host_vars, bool):
+                address, host_vars = str(host_vars), None
+            elif host_vars is not None and not isinstance(host_vars, dict):
+                raise ValueError(f"inventory: host '{name}' in group '{group}' must map to an address "
+                                 f"or to host variables, not {type(host_vars).__name__}")
+            _add(hosts, members, group, str(name), address=address, host_vars=host_vars, group_vars=group_vars)
+    groups = {g: frozenset(names) for g, names in members.items()}
+    for name, host in hosts.items():
+        host.groups = frozenset(g for g, names in groups.items() if name in names)
+    return Inventory(hosts, groups)
+
+
+def _cache_path(name: str) -> str:
+    return os.path.join(NEXUS_CACHE, name)
+
+
+def _read_cache(path: str):
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        return None
+
+
+def _write_cache(path: str, payload) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_file(path: str) -> Inventory:
+    """
+    Loads inventory.yml. The built Inventory is pickled next to a
+    (mtime, size) stamp and content hash: an unchanged stat skips reading the
+    file, an unchanged hash skips YAML parsing.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    memo = _loaded.get(path)
+    if memo and memo[0] == stamp:
+        return memo[1]
+    cache_file = _cache_path("inventory-" + hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12] + ".pickle")
+    cached = _read_cache(cache_file)
+    if cached and cached.get("version") == CACHE_VERSION and cached.get("stamp") == stamp:
+        _loaded[path] = (stamp, cached["inventory"])
+        return cached["inventory"]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached.get("version") == CACHE_VERSION and cached.get("digest") == digest:
+        inventory = cached["inventory"]
+    else:
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        inventory = build(yaml.load(raw, Loader=loader) or {})
+    _write_cache(cache_file, {"version": CACHE_VERSION, "stamp": stamp, "digest": digest, "inventory": inventory})
+    _loaded[path] = (stamp, inventory)
+    return inventory
+
+
+def _consul_get(path: str, timeout: int = 10):
+    import urllib.request
+    with urllib.request.urlopen(f"{CONSUL_ADDR}{path}", timeout=timeout) as resp:
+        return json.load(resp)
+
+
+def load_consul(ttl: int = CONSUL_TTL) -> Inventory:
+    """
+    Dynamic inventory from the Consul catalog: one group per service name,
+    one per pool tag (web/api/database/worker) and 'managers' for Consul
+    servers. Cached for `ttl` seconds.
+    """
+    cache_file = _cache_path("inventory-consul.pickle")
+    cached = _read_cache(cache_file)
+    if cached and cached.get("version") == CACHE_VERSION and time.time() - cached["fetched"] < ttl:
+        return cached["inventory"]
+
+    data: Dict[str, list] = {}
+    host_vars: Dict[str, Dict] = {}
+    for node in _consul_get("/v1/catalog/nodes"):
+        host_vars[node["Node"]] = {"address": node["Address"], "datacenter": node.get("Datacenter")}
+    for service, tags in _consul_get("/v1/catalog/services").items():
+        for entry in _consul_get(f"/v1/catalog/service/{service}"):
+            node = entry["Node"]
+            group = "managers" if service == "consul" else service
+            data.setdefault(group, []).append(node)
+            for tag in set(entry.get("ServiceTags") or ()) & set(POOL_TAGS):
+                data.setdefault(tag, []).append(node)
+    data["groups"] = {"all": {"hosts": host_vars}}
+    inventory = build(data)
+    _write_cache(cache_file, {"version": CACHE_VERSION, "fetched": time.time(), "inventory": inventory})
+    return inventory
+
+
+def load(source: str) -> Inventory:
+    """Loads the inventory from a YAML path, or from Consul when source is 'consul'."""
+    if source == "consul":
+        return load_consul()
+    return load_file(source)
@@ -0,0 +1,166 @@
+"""
+nexus_rollout.py - Rolling deploy orchestration for nexus.py
+Batches hosts, gates each batch on a health check and halts on failures.
+"""
+
+import json
+import os
+import socket
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+CONSUL_ADDR = os.environ.get("CONSUL_HTTP_ADDR", "http://127.0.0.1:8500")
+if "://" not in CONSUL_ADDR:
+    CONSUL_ADDR = f"http://{CONSUL_ADDR}"
+
+
+class RolloutHalted(Exception):
+    """Raised when a rollout stops before every host was deployed."""
+
+
+def parse_count(value: str, total: int) -> int:
+    """Turns '3' or '25%' into a host count (at least 1) for a pool of `total`."""
+    value = str(value).strip()
+    if value.endswith("%"):
+        pct = float(value[:-1])
+        if not 0 < pct <= 100:
+            raise ValueError(f"Percentage out of range: {value}")
+        return max(1, int(total * pct / 100))
+    count = int(value)
+    if count < 1:
+        raise ValueError(f"Count must be at least 1: {value}")
+    return count
+
+
+def consul_check(service: str, timeout: int = 5) -> Callable[[str], bool]:
+    """Healthy when every Consul check for `service` on the host is passing."""
+    def check(host: str) -> bool:
+        url = f"{CONSUL_ADDR}/v1/health/service/{service}"
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as resp:
+                entries = json.load(resp)
+        except (OSError, ValueError):
+            return False
+        for entry in entries:
+            addrs = {entry["Node"].get("Address"), entry["Node"].get("Node"),
+                     entry["Service"].get("Address")}
+            if host in addrs:
+                return all(c.get("Status") == "passing" for c in entry.get("Checks", []))
+        return False
+    return check
+
+
+def tcp_check(port: int, timeout: int = 5) -> Callable[[str], bool]:
+    """Healthy when a TCP connection to host:port succeeds."""
+    def check(host: str) -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+    return check
+
+
+def http_check(url_template: str, timeout: int = 5) -> Callable[[str], bool]:
+    """Healthy when the URL ('{host}' is substituted) answers with a 2xx/3xx."""
+    def check(host: str) -> bool:
+        try:
+            with urllib.request.urlopen(url_template.format(host=host), timeout=timeout) as resp:
+                return resp.status < 400
+        except (OSError, ValueError):
+            return False
+    return check
+
+
+def make_health_check(spec: Optional[str], service: str) -> Optional[Callable[[str], bool]]:
+    """
+    Builds a health check from a CLI spec:
+      consul              - Consul health of the deployed service
+      consul:<name>       - Consul health of another service
+      tcp:<port>          - TCP connect probe
+      http(s)://...{host} - HTTP probe
+    """
+    if not spec or spec == "none":
+        return None
+    if spec == "consul":
+        return consul_check(service)
+    if spec.startswith("consul:"):
+        return consul_check(spec.split(":", 1)[1])
+    if spec.startswith("tcp:"):
+        return tcp_check(int(spec.split(":", 1)[1]))
+    if spec.startswith(("http://", "https://")):
+        return http_check(spec)
+    raise ValueError(f"Unknown health check: {spec}")
+
+
+def wait_healthy(host: str, check: Callable[[str], bool], timeout: float, interval: float = 2.0) -> bool:
+    """Polls `check` until it passes or `timeout` seconds elapse."""
+    deadline = time.time() + timeout
+    while True:
+        if check(host):
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+def rolling_deploy(hosts: List[str],
+                   deploy_host: Callable[[str], None],
+                   health_check: Optional[Callable[[str], bool]] = None,
+                   batch_size: str = "1",
+                   max_unavailable: Optional[str] = None,
+                   max_failures: int = 0,
+                   health_timeout: float = 120) -> Dict[str, str]:
+    """
+    Deploys to `hosts` in batches. Hosts in a batch are deployed in parallel,
+    then the batch must pass `health_check` before the next one starts.
+
+    A host that fails to deploy or never becomes healthy stays unavailable, so
+    it shrinks the room left under `max_unavailable`. The rollout halts once
+    more than `max_failures` hosts failed or no room is left.
+
+    Returns {host: "ok" | "failed" | "skipped"}; raises RolloutHalted (with the
+    same mapping in .args[1]) when halted.
+    """
+    total = len(hosts)
+    batch = parse_count(batch_size, total)
+    unavailable = parse_count(max_unavailable, total) if max_unavailable else batch
+    results = {host: "skipped" for host in hosts}
+    failed: List[str] = []
+
+    def deploy_and_check(host: str) -> bool:
+        try:
+            deploy_host(host)
+        except Exception as e:
+            print(f"[{host}] DEPLOY FAILED: {e}")
+            return False
+        if health_check is None:
+            return True
+        if wait_healthy(host, health_check, health_timeout):
+            print(f"[{host}] HEALTHY")
+            return True
+        print(f"[{host}] UNHEALTHY after {health_timeout}s")
+        return False
+
+    pending = list(hosts)
+    with ThreadPoolExecutor(max_workers=max(1, min(batch, unavailable))) as pool:
+        while pending:
+            room = min(batch, unavailable - len(failed))
+            if room <= 0:
+                raise RolloutHalted(f"{len(failed)} host(s) unavailable, max-unavailable is {unavailable}", results)
+
+            current, pending = pending[:room], pending[room:]
+            done = total - len(pending) - len(current)
+            print(f"\n--- Batch {done + 1}-{done + len(current)} of {total}: {', '.join(current)} ---")
+
+            for host, ok in zip(current, pool.map(deploy_and_check, current)):
+                results[host] = "ok" if ok else "failed"
+                if not ok:
+                    failed.append(host)
+
+            if len(failed) > max_failures:
+                raise RolloutHalted(f"{len(failed)} failure(s) exceeds threshold of {max_failures}", results)
+
+    return results
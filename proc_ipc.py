@@ -12,12 +12,22 @@ import fcntl
 import errno
 import logging
 import select
+import struct
+import termios
 from typing import List, Optional, Tuple, Dict, Callable
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [PROC] %(message)s')
 logger = logging.getLogger(__name__)
 
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+PIPE_SIZE = 65536  # Linux default pipe capacity, when F_GETPIPE_SZ is unavailable
+
+def exit_code_from_status(status: int) -> int:
+    """Exit code from a waitpid() status, or -signal number (os.waitstatus_to_exitcode needs Python 3.9)."""
+    return -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+
 class Process:
     def __init__(self, command: List[str], name: str = "worker"):
         self.command = command
@@ -27,14 +37,25 @@ class Process:
         self.stdout_fd: Optional[int] = None # Parent reads from this
         self.stderr_fd: Optional[int] = None # Parent reads from this
         self.start_time: float = 0.0
+        self.restarts: int = 0
+        # Counters for the supervisor's metrics; written only by the supervising thread
+        self.exit_code: Optional[int] = None  # last exit: status code, or -signal number
+        self.spawn_seconds: float = 0.0       # time the last start() blocked the parent
+        self.bytes_out: int = 0
+        self.bytes_err: int = 0
+        self.pipe_full: int = 0               # reads that found a pipe at capacity (child blocked on write)
+        self.pipe_size: int = PIPE_SIZE
 
     def start(self):
         """Starts the process using fork/exec and sets up pipes."""
+        begin = time.perf_counter()
         # Create pipes: (read_end, write_end)
         p_stdin_r, p_stdin_w = os.pipe()
         p_stdout_r, p_stdout_w = os.pipe()
         p_stderr_r, p_stderr_w = os.pipe()
 
+        if self.start_time:
+            self.restarts += 1
         self.start_time = time.time()
         pid = os.fork()
 
@@ -81,11 +102,23 @@ class Process:
             # Set non-blocking read
             self._set_nonblocking(self.stdout_fd)
             self._set_nonblocking(self.stderr_fd)
+            if hasattr(fcntl, "F_GETPIPE_SZ"):
+                self.pipe_size = fcntl.fcntl(self.stdout_fd, fcntl.F_GETPIPE_SZ)
+            self.spawn_seconds = time.perf_counter() - begin
 
     def _set_nonblocking(self, fd: int):
         flags = fcntl.fcntl(fd, fcntl.F_GETFL)
         fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
 
+    def _check_full(self, fd: int):
+        """Counts a pipe-full event when the unread bytes in `fd` reach the pipe capacity."""
+        try:
+            pending = struct.unpack("i", fcntl.ioctl(fd, termios.FIONREAD, b"\0\0\0\0"))[0]
+        except OSError:
+            return
+        if pending >= self.pipe_size:
+            self.pipe_full += 1
+
     def read_output(self) -> Tuple[bytes, bytes]:
         """Reads available data from stdout/stderr without blocking."""
         out_data = b""
@@ -95,16 +128,22 @@ class Process:
         rlist, _, _ = select.select([self.stdout_fd, self.stderr_fd], [], [], 0)
 
         if self.stdout_fd in rlist:
+            self._check_full(self.stdout_fd)
             try:
                 chunk = os.read(self.stdout_fd, 4096)
-                if chunk: out_data = chunk
+                if chunk:
+                    out_data = chunk
+                    self.bytes_out += len(chunk)
             except OSError as e:
                 if e.errno != errno.EAGAIN: raise
 
         if self.stderr_fd in rlist:
+            self._check_full(self.stderr_fd)
             try:
                 chunk = os.read(self.stderr_fd, 4096)
-                if chunk: err_data = chunk
+                if chunk:
+                    err_data = chunk
+                    self.bytes_err += len(chunk)
             except OSError as e:
                 if e.errno != errno.EAGAIN: raise
 
@@ -127,6 +166,7 @@ class Process:
             pid, status = os.waitpid(self.pid, os.WNOHANG)
             if pid != 0:
                 logger.info(f"{self.name} exited with status {status}")
+                self.exit_code = exit_code_from_status(status)
                 self.pid = None
                 return
             time.sleep(0.1)
@@ -135,16 +175,33 @@ class Process:
         logger.warning(f"{self.name} did not exit. Sending SIGKILL.")
         try:
             os.kill(self.pid, signal.SIGKILL)
-            os.waitpid(self.pid, 0)
+            _, status = os.waitpid(self.pid, 0)
+            self.exit_code = exit_code_from_status(status)
         except OSError:
             pass
         self.pid = None
 
+    def usage(self) -> Optional[Tuple[float, int]]:
+        """(CPU seconds, resident bytes) of the running process from /proc, or None."""
+        if self.pid is None: return None
+        try:
+            with open(f"/proc/{self.pid}/stat", "rb") as f:
+                stat = f.read()
+            with open(f"/proc/{self.pid}/statm", "rb") as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        # Fields after the parenthesised command name; utime and stime are the 12th and 13th
+        fields = stat.rsplit(b")", 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        return cpu_seconds, rss_pages * PAGE_SIZE
+
     def is_running(self) -> bool:
         if self.pid is None: return False
         pid, status = os.waitpid(self.pid, os.WNOHANG)
         if pid == 0:
             return True
+        self.exit_code = exit_code_from_status(status)
         self.pid = None
         return False
 
@@ -2,6 +2,11 @@
 """
 services.py - Tier 2 Service Orchestrator
 Reads services.yml and manages application services using proc_ipc.
+Optionally samples each service's CPU, memory, restarts and uptime and pushes
+them to the dashboard in batches, along with the host's current CPU, memory,
+disk and network usage (see `reporting` in services.example.yml).
+Serves per-service and supervisor metrics in the Prometheus text format on a
+local port (see `metrics` in services.example.yml).
 """
 
 import yaml
@@ -9,6 +14,14 @@ import time
 import signal
 import sys
 import os
+import json
+import bisect
+import resource
+import shutil
+import socket
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from proc_ipc import Process, logger
 
 # Global registry
@@ -21,6 +34,271 @@ def load_config(path: str = "services.yml"):
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
+class ServiceReporter:
+    """
+    Samples every service each `interval` seconds and POSTs `batch` samples at
+    a time to the dashboard as compact rows:
+    {"services": {name: [[ts, cpu %, memory MB, restarts, uptime s], ...]}}
+    Every sample also POSTs the host's current CPU, memory, disk and network
+    usage with the services' latest CPU and memory to .../nodes/{node}/metrics
+    (not batched: the dashboard only keeps a node's current metrics).
+    Sending happens on background threads so a slow dashboard never stalls
+    supervision; unsent rows are kept (up to `max_pending` per service) and
+    go out with the next batch, while a node report that fails is dropped.
+    """
+
+    def __init__(self, url: str, node: str, interval: float = 10.0, batch: int = 6,
+                 max_pending: int = 360):
+        self.endpoint = f"{url.rstrip('/')}/api/analytics/nodes/{node}/services"
+        self.metrics_endpoint = f"{url.rstrip('/')}/api/analytics/nodes/{node}/metrics"
+        self.interval = interval
+        self.batch = batch
+        self.max_pending = max_pending
+        self.pending: dict = {}
+        self.samples = 0
+        self.next_sample = 0.0
+        self.last_cpu: dict = {}  # name -> (pid, cpu seconds, wall time)
+        self.sending = None  # thread posting the current batch
+        self.unsent = None   # batch whose POST failed, merged back by sample()
+        self.last_host = None  # (cpu busy ticks, cpu total ticks, net rx bytes, net tx bytes, wall time)
+        self.reporting = None  # thread posting the current node metrics
+
+    def sample(self, services: list, now: float):
+        if now < self.next_sample:
+            return
+        self.next_sample = now + self.interval
+        usage_by_name = {}
+        for svc in services:
+            cpu_usage, memory_mb, uptime = 0.0, 0.0, 0
+            usage = svc.usage()
+            if usage is not None:
+                cpu_seconds, rss = usage
+                last = self.last_cpu.get(svc.name)
+                if last is not None and last[0] == svc.pid and now > last[2]:
+                    cpu_usage = max(0.0, (cpu_seconds - last[1]) / (now - last[2]) * 100)
+                self.last_cpu[svc.name] = (svc.pid, cpu_seconds, now)
+                memory_mb = rss / (1024 * 1024)
+                uptime = max(1, int(now - svc.start_time))  # 0 means not running
+            usage_by_name[svc.name] = {"cpu_usage": round(cpu_usage, 2), "memory_mb": round(memory_mb, 2)}
+            rows = self.pending.setdefault(svc.name, [])
+            rows.append([round(now, 3), round(cpu_usage, 2), round(memory_mb, 2), svc.restarts, uptime])
+            del rows[:-self.max_pending]
+        report = self.host_metrics(now)
+        if report is not None and not (self.reporting and self.reporting.is_alive()):
+            report["services"] = usage_by_name
+            self.reporting = threading.Thread(target=self.send_metrics, args=(report,), daemon=True)
+            self.reporting.start()
+        self.samples += 1
+        if self.samples >= self.batch and not (self.sending and self.sending.is_alive()):
+            if self.unsent:
+                # Put the failed rows back in front of anything sampled since
+                for name, rows in self.unsent.items():
+                    self.pending[name] = (rows + self.pending.get(name, []))[-self.max_pending:]
+                self.unsent = None
+            payload, self.pending, self.samples = self.pending, {}, 0
+            self.sending = threading.Thread(target=self.send, args=(payload,), daemon=True)
+            self.sending.start()
+
+    def send(self, payload: dict):
+        body = json.dumps({"services": payload}, separators=(",", ":")).encode()
+        request = urllib.request.Request(self.endpoint, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except Exception as e:
+            logger.warning(f"Failed to report service metrics: {e}")
+            self.unsent = payload
+
+    def host_metrics(self, now: float):
+        """
+        NodeMetricsReport fields from /proc, or None where /proc is missing.
+        CPU and network are rates since the previous sample, so the first
+        sample only records the counters.
+        """
+        try:
+            with open("/proc/stat") as f:
+                ticks = [int(v) for v in f.readline().split()[1:]]
+            meminfo = {}
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    meminfo[key] = int(value.split()[0])
+            rx = tx = 0
+            with open("/proc/net/dev") as f:
+                for line in f.readlines()[2:]:
+                    iface, _, counters = line.partition(":")
+                    if iface.strip() != "lo":
+                        counters = counters.split()
+                        rx += int(counters[0])
+                        tx += int(counters[8])
+            with open("/proc/uptime") as f:
+                uptime = int(float(f.read().split()[0]))
+            disk = shutil.disk_usage("/")
+        except (OSError, ValueError, IndexError, KeyError):
+            return None
+        total = sum(ticks[:8])  # user .. steal; guest time is already counted in user
+        busy = total - ticks[3] - ticks[4]  # minus idle and iowait
+        last, self.last_host = self.last_host, (busy, total, rx, tx, now)
+        if last is None or now <= last[4]:
+            return None
+        elapsed = now - last[4]
+        mem_total = meminfo["MemTotal"]
+        mem_available = meminfo.get("MemAvailable", meminfo.get("MemFree", mem_total))
+        return {
+            "cpu_usage": round(min(100.0, max(0.0, (busy - last[0]) / max(1, total - last[1]) * 100)), 2),
+            "memory_usage": round((mem_total - mem_available) / mem_total * 100, 2) if mem_total else 0.0,
+            "disk_usage": round(disk.used / disk.total * 100, 2) if disk.total else 0.0,
+            "network_in": round(max(0, rx - last[2]) / elapsed / (1024 * 1024), 3),
+            "network_out": round(max(0, tx - last[3]) / elapsed / (1024 * 1024), 3),
+            "uptime_seconds": uptime,
+        }
+
+    def send_metrics(self, report: dict):
+        body = json.dumps(report, separators=(",", ":")).encode()
+        request = urllib.request.Request(self.metrics_endpoint, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except Exception as e:
+            logger.warning(f"Failed to report node metrics: {e}")
+
+def make_reporter(config: dict):
+    """ServiceReporter from the optional `reporting` section of services.yml."""
+    reporting = config.get("reporting") or {}
+    if not reporting.get("url"):
+        return None
+    return ServiceReporter(
+        reporting["url"],
+        reporting.get("node") or socket.gethostname(),
+        interval=float(reporting.get("interval", 10)),
+        batch=int(reporting.get("batch", 6)),
+    )
+
+class SupervisorStats:
+    """
+    The supervision loop's own timings. Only the loop writes these plain
+    attributes (no locks); the metrics server thread reads them.
+    Lag is how much later than planned a pass started after its sleep.
+    """
+
+    LAG_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.passes = 0
+        self.pass_seconds = 0.0      # total time spent in passes
+        self.last_pass_seconds = 0.0
+        self.lag_counts = [0] * (len(self.LAG_BUCKETS) + 1)
+        self.lag_sum = 0.0
+        self.due = None              # when the next pass should start
+
+    def record(self, begin: float, end: float):
+        """Records a pass that ran from `begin` to `end` (time.monotonic())"""
+        if self.due is not None:
+            lag = max(0.0, begin - self.due)
+            self.lag_counts[bisect.bisect_left(self.LAG_BUCKETS, lag)] += 1
+            self.lag_sum += lag
+        self.due = end + self.interval
+        self.last_pass_seconds = end - begin
+        self.pass_seconds += end - begin
+        self.passes += 1
+
+def render_metrics(services: list, stats: SupervisorStats) -> str:
+    """Prometheus text exposition of every service and the supervisor itself."""
+    now = time.time()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    def per_service(value_of):
+        return [(f'{{service="{svc.name}"}}', value_of(svc)) for svc in services]
+
+    metric("nexus_service_up", "gauge", "1 while the service process is running",
+           per_service(lambda s: int(s.pid is not None)))
+    metric("nexus_service_restarts_total", "counter", "Restarts by the supervisor",
+           per_service(lambda s: s.restarts))
+    metric("nexus_service_uptime_seconds", "gauge", "Seconds since the current process started (0 when down)",
+           per_service(lambda s: round(now - s.start_time, 3) if s.pid is not None else 0))
+    metric("nexus_service_last_exit_code", "gauge", "Exit status of the last exit (negative: killed by that signal)",
+           [(labels, value) for labels, value in per_service(lambda s: s.exit_code) if value is not None])
+    metric("nexus_service_output_bytes_total", "counter", "Bytes read from the service's pipes",
+           [(f'{{service="{s.name}",stream="{stream}"}}', getattr(s, attr))
+            for s in services for stream, attr in (("stdout", "bytes_out"), ("stderr", "bytes_err"))])
+    metric("nexus_service_pipe_full_total", "counter",
+           "Reads that found a pipe at capacity, i.e. the service was blocked writing output",
+           per_service(lambda s: s.pipe_full))
+    metric("nexus_service_spawn_seconds", "gauge", "Time the last start (fork, exec, pipe setup) blocked the supervisor",
+           per_service(lambda s: round(s.spawn_seconds, 6)))
+
+    metric("nexus_supervisor_passes_total", "counter", "Supervision passes", [("", stats.passes)])
+    metric("nexus_supervisor_pass_seconds_total", "counter", "Time spent in supervision passes",
+           [("", round(stats.pass_seconds, 6))])
+    metric("nexus_supervisor_last_pass_seconds", "gauge", "Duration of the latest supervision pass",
+           [("", round(stats.last_pass_seconds, 6))])
+    lag, cumulative = [], 0
+    for bound, count in zip(stats.LAG_BUCKETS + (float("inf"),), stats.lag_counts):
+        cumulative += count
+        lag.append((f'_bucket{{le="{"+Inf" if bound == float("inf") else bound}"}}', cumulative))
+    lag += [("_sum", round(stats.lag_sum, 6)), ("_count", cumulative)]
+    metric("nexus_supervisor_loop_lag_seconds", "histogram", "How late each pass started after its sleep", lag)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    metric("nexus_supervisor_cpu_seconds_total", "counter", "Supervisor CPU time (user + system)",
+           [("", round(usage.ru_utime + usage.ru_stime, 3))])
+    metric("nexus_supervisor_max_rss_bytes", "gauge", "Supervisor peak resident memory",
+           [("", usage.ru_maxrss * 1024)])
+    return "\n".join(lines) + "\n"
+
+def start_metrics_server(listen: str, services: list, stats: SupervisorStats):
+    """Serves render_metrics() at http://<listen>/metrics on a daemon thread; None if the port is taken."""
+    host, _, port = listen.rpartition(":")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics(services, stats).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Metrics endpoint disabled, cannot listen on {listen}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Metrics at http://{listen}/metrics")
+    return server
+
+def supervise_once(services: list):
+    """One supervision pass: restarts services that died and drains their output."""
+    for svc in services:
+        if not svc.is_running():
+            logger.warning(f"Service {svc.name} died. Restarting...")
+            svc.start()
+        
+        # Drain logs
+        out, err = svc.read_output()
+        if out:
+            for line in out.splitlines():
+                logger.info(f"[{svc.name}] {line.decode(errors='replace')}")
+        if err:
+            for line in err.splitlines():
+                logger.error(f"[{svc.name}] {line.decode(errors='replace')}")
+
 def signal_handler(sig, frame):
     logger.info("Received shutdown signal. Stopping services...")
     for svc in SERVICES:
@@ -33,6 +311,8 @@ def main():
 
     config = load_config()
     apps = config.get("services", {})
+    reporter = make_reporter(config)
+    stats = SupervisorStats(interval=1.0)
 
     for name, cmd_list in apps.items():
         if not cmd_list: continue
@@ -41,25 +321,22 @@ def main():
         svc.start()
         SERVICES.append(svc)
 
+    listen = (config.get("metrics") or {}).get("listen", "127.0.0.1:9101")
+    if listen:
+        start_metrics_server(listen, SERVICES, stats)
+
     logger.info("Orchestrator running. Press Ctrl+C to stop.")
 
     # Supervision Loop
     while True:
-        for svc in SERVICES:
-            if not svc.is_running():
-                logger.warning(f"Service {svc.name} died. Restarting...")
-                svc.start()
-            
-            # Drain logs
-            out, err = svc.read_output()
-            if out:
-                for line in out.splitlines():
-                    logger.info(f"[{svc.name}] {line.decode(errors='replace')}")
-            if err:
-                for line in err.splitlines():
-                    logger.error(f"[{svc.name}] {line.decode(errors='replace')}")
-
-        time.sleep(1)
+        begin = time.monotonic()
+        supervise_once(SERVICES)
+
+        if reporter:
+            reporter.sample(SERVICES, time.time())
+
+        stats.record(begin, time.monotonic())
+        time.sleep(stats.interval)
 
 if __name__ == "__main__":
     main()